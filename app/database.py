@@ -1,14 +1,71 @@
+import time
+from typing import Dict, Optional
+import uuid
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True
-)
+class PoolStats:
+    """Tiempos de espera al pedir una conexión al pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self, pool) -> dict:
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3)
+        }
+
+def timed_pool(stats: PoolStats):
+    """Clase de pool que mide la espera de cada checkout (recreate() conserva la clase)"""
+
+    class TimedQueuePool(AsyncAdaptedQueuePool):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                stats.timeouts += 1
+                raise
+            stats.record(time.perf_counter() - start)
+            return connection
+
+    return TimedQueuePool
+
+def create_engine(url: str, stats: PoolStats):
+    return create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=timed_pool(stats),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING
+    )
+
+primary_stats = PoolStats()
+engine = create_engine(settings.DATABASE_URL, primary_stats)
 
 AsyncSessionLocal = sessionmaker(
     engine,
@@ -16,8 +73,54 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+replica_stats = PoolStats()
+replica_engine = create_engine(settings.DATABASE_REPLICA_URL, replica_stats) if settings.DATABASE_REPLICA_URL else None
+
+ReplicaSessionLocal = sessionmaker(
+    replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+) if replica_engine is not None else None
+
 Base = declarative_base()
 
+class StickyReads:
+    """
+    Read-your-writes: tras una escritura que afecta a un usuario, sus lecturas
+    van al primario durante unos segundos (más que el lag de la réplica)
+    Se marca en publish_change y en los eventos que llegan de otros workers
+    """
+
+    def __init__(self, window: float, max_users: int = 10000):
+        self.window = window
+        self.max_users = max_users
+        self._until: Dict[uuid.UUID, float] = {}
+
+    def mark(self, *user_ids: uuid.UUID) -> None:
+        now = time.monotonic()
+        if len(self._until) >= self.max_users:
+            self._until = {user_id: until for user_id, until in self._until.items() if until > now}
+        for user_id in user_ids:
+            self._until[user_id] = now + self.window
+
+    def is_sticky(self, user_id: uuid.UUID) -> bool:
+        until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+sticky_reads = StickyReads(settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+def read_session_factory(user_id: Optional[uuid.UUID] = None):
+    """Réplica si está configurada y el usuario no escribió hace poco; si no, el primario"""
+    if ReplicaSessionLocal is None or (user_id is not None and sticky_reads.is_sticky(user_id)):
+        return AsyncSessionLocal
+    return ReplicaSessionLocal
+
+def pool_stats() -> dict:
+    stats = {"primary": primary_stats.snapshot(engine.sync_engine.pool)}
+    if replica_engine is not None:
+        stats["replica"] = replica_stats.snapshot(replica_engine.sync_engine.pool)
+    return stats
+
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -1,23 +1,30 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app import database
 from app.database import AsyncSessionLocal
-from app.models import User
+from app.models import User, Item
+import hmac
 import jwt
+import uuid
 from app.config import Settings
+from app.utils.principal import Principal, principal_cache
+from app.utils.access import ConnectionRef, Memberships, get_memberships, resolve_connection, resolve_collection, resolve_item
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 settings = Settings()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
 
-async def get_current_user(
+async def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Validar token JWT y retornar usuario actual"""
+) -> Principal:
+    """Validar token JWT y retornar el usuario actual (cacheado, sin el modelo ORM)"""
     
     if not credentials:
         raise HTTPException(
@@ -54,8 +61,70 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    from sqlalchemy import select
-    result = await db.execute(select(User).filter(User.id == user_id))
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
+    try:
+        user_uuid = uuid.UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    result = await db.execute(
+        select(User.id, User.username, User.email).filter(User.id == user_uuid)
+    )
+    row = result.first()
+    
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuario no encontrado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    principal = Principal(*row)
+    principal_cache.put(user_id, principal)
+    return principal
+
+async def require_stats_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security)
+) -> None:
+    """
+    /stats expone el estado de pools y caches: solo con STATS_TOKEN
+    configurado y presentado como Bearer; sin configurar no existe
+    """
+    if not settings.STATS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    token = credentials.credentials if credentials else ""
+    if not hmac.compare_digest(token.encode(), settings.STATS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def get_read_db(
+    current_user: Principal = Depends(get_current_principal)
+) -> AsyncSession:
+    """
+    Sesión para endpoints de solo lectura: réplica si está configurada,
+    salvo que el usuario tenga escrituras recientes (read-your-writes)
+    """
+    async with database.read_session_factory(current_user.id)() as session:
+        yield session
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Usuario actual como modelo ORM completo, para handlers que lo necesiten"""
+    
+    result = await db.execute(select(User).filter(User.id == principal.id))
     user = result.scalar_one_or_none()
     
     if user is None:
@@ -65,4 +134,35 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
\ No newline at end of file
+    return user
+
+async def get_user_memberships(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(database.get_db)
+) -> Memberships:
+    """Conexiones y carpetas accesibles para el usuario actual (cacheadas)"""
+    return await get_memberships(db, current_user.id)
+
+async def get_connection_access(
+    connection_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(database.get_db)
+) -> ConnectionRef:
+    """Verificar que el usuario sea parte de la conexión"""
+    return await resolve_connection(db, current_user.id, connection_id)
+
+async def get_collection_access(
+    collection_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(database.get_db)
+) -> ConnectionRef:
+    """Verificar acceso a la carpeta; retorna su conexión"""
+    return await resolve_collection(db, current_user.id, collection_id)
+
+async def get_item_access(
+    item_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(database.get_db)
+) -> tuple[Item, ConnectionRef]:
+    """Cargar el item verificando acceso con un solo JOIN"""
+    return await resolve_item(db, current_user.id, item_id)
\ No newline at end of file
@@ -1,18 +1,41 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine
+from app.config import get_settings
+from app.database import engine, replica_engine, pool_stats
+from app.deps import require_stats_token
 from app.models import User, Connection, Collection, Item
-from app.routes import auth, connections, collections, items, sync
+from app.routes import auth, connections, collections, items, sync, events, imports, search
+from app.utils.broker import broker
+from app.utils.compression import CompressionMiddleware
+from app.utils.enrichment import enrichment_worker
+from app.utils.idempotency import replay_cache
+from app.utils.imports import import_runner, fail_stale_imports
+from app.utils.sync_log import sync_log_maintenance
+from app.utils.http_client import start_http_client, close_http_client, http_pool_stats
+from app.utils.principal import principal_cache
+from app.utils.security import password_pool
 
 @asynccontextmanager
 async def lifespan(app):
-    # Startup: crear tablas
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup: el esquema lo crean las migraciones (alembic upgrade head),
+    # una vez por despliegue y no en cada worker
+    await broker.start()
+    await start_http_client()
+    await enrichment_worker.start()
+    await sync_log_maintenance.start()
+    await fail_stale_imports()
     yield
     # Shutdown: cerrar conexiones
+    await sync_log_maintenance.stop()
+    await import_runner.stop()
+    await enrichment_worker.stop()
+    await close_http_client()
+    password_pool.shutdown()
+    await broker.stop()
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 app = FastAPI(
     title="Share Links API",
@@ -30,12 +53,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresión brotli/gzip de respuestas grandes (listados, feed de sync)
+settings = get_settings()
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
 # Rutas
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(connections.router, prefix="/api/connections", tags=["connections"])
 app.include_router(collections.router, prefix="/api/collections", tags=["collections"])
 app.include_router(items.router, prefix="/api/items", tags=["items"])
 app.include_router(sync.router, prefix="/api/sync", tags=["sync"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
+app.include_router(imports.router, prefix="/api/imports", tags=["imports"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 
 @app.get("/")
 async def root():
@@ -49,6 +84,17 @@ async def root():
 async def health():
     return {"status": "ok"}
 
+@app.get("/stats", dependencies=[Depends(require_stats_token)], include_in_schema=False)
+async def stats():
+    return {
+        "db_pool": pool_stats(),
+        "http_pool": http_pool_stats(),
+        "principal_cache": principal_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "sync_replay_cache": replay_cache.stats(),
+        "sync_log": sync_log_maintenance.stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
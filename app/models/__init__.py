@@ -2,6 +2,11 @@ from app.models.user import User
 from app.models.connection import Connection
 from app.models.collection import Collection
 from app.models.item import Item
-from app.models.sync import SyncLog
+from app.models.sync import SyncLog, SyncLogCursor
+from app.models.sync_operation import SyncOperation
+from app.models.enrichment import EnrichmentJob
+from app.models.link_metadata import LinkMetadata
+from app.models.import_job import ImportJob
+from app.models.refresh_token import RefreshToken
 
-__all__ = ["User", "Connection", "Collection", "Item", "SyncLog"]
\ No newline at end of file
+__all__ = ["User", "Connection", "Collection", "Item", "SyncLog", "SyncLogCursor", "SyncOperation", "EnrichmentJob", "LinkMetadata", "ImportJob", "RefreshToken"]
\ No newline at end of file
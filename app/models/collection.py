@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, BigInteger, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.database import Base
+from app.models.sync import change_sequence, CURRENT_TXID
 import uuid
 
 class Collection(Base):
@@ -14,6 +15,17 @@ class Collection(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     version = Column(Integer, default=0)
+    deleted_at = Column(DateTime, nullable=True)  # soft delete: tombstone para el feed de sync
+    field_versions = Column(JSONB, nullable=True)  # versión en la que cambió cada campo editable (merge de sync)
+    change_seq = Column(BigInteger, nullable=False, server_default=change_sequence.next_value(), onupdate=change_sequence.next_value())
+    change_txid = Column(BigInteger, nullable=False, server_default=text(CURRENT_TXID), onupdate=text(CURRENT_TXID))
+    
+    __table_args__ = (
+        # Paginación keyset de las carpetas de una conexión
+        Index("ix_collections_connection_created", "connection_id", "created_at", "id"),
+        # Feed de sync: orden (transacción, secuencia)
+        Index("ix_collections_change_txid_seq", "change_txid", "change_seq"),
+    )
     
     def __repr__(self):
         return f"<Collection {self.name}>"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, func, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, func, CheckConstraint, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
 import uuid
@@ -16,6 +16,8 @@ class Connection(Base):
     __table_args__ = (
         CheckConstraint("user_id_1 < user_id_2", name="different_users"),
         UniqueConstraint("user_id_1", "user_id_2", name="unique_connection"),
+        # user_id_1 = X OR user_id_2 = X: la segunda rama no puede usar unique_connection
+        Index("ix_connections_user_id_2", "user_id_2"),
     )
     
     def __repr__(self):
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+import uuid
+
+class EnrichmentJob(Base):
+    __tablename__ = "enrichment_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    item_id = Column(UUID(as_uuid=True), ForeignKey("items.id", ondelete="CASCADE"), nullable=False, unique=True)
+    url = Column(String(2048), nullable=False)
+    status = Column(String(50), default="pending", nullable=False)  # pending, running, done, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=func.now(), nullable=False)  # en running: fin del lease
+    last_error = Column(Text, nullable=True)
+    import_job_id = Column(UUID(as_uuid=True), ForeignKey("import_jobs.id", ondelete="SET NULL"), nullable=True, index=True)  # progreso de importaciones
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_enrichment_jobs_status_next_attempt", "status", "next_attempt_at"),
+    )
+    
+    def __repr__(self):
+        return f"<EnrichmentJob {self.item_id} {self.status}>"
\ No newline at end of file
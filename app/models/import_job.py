@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+import uuid
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE"), nullable=False)
+    format = Column(String(10), nullable=False)  # html, json, csv
+    filename = Column(String(255), nullable=True)
+    status = Column(String(50), default="pending", nullable=False)  # pending, running, done, failed
+    total = Column(Integer, default=0, nullable=False)  # links leídos del archivo
+    inserted = Column(Integer, default=0, nullable=False)
+    duplicates = Column(Integer, default=0, nullable=False)
+    invalid = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<ImportJob {self.id} {self.status}>"
\ No newline at end of file
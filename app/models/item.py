@@ -1,14 +1,17 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text, func
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, BigInteger, Text, Index, Computed, func, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.sync import change_sequence, CURRENT_TXID
 import uuid
 
 class Item(Base):
     __tablename__ = "items"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE"), nullable=False, index=True)
+    collection_id = Column(UUID(as_uuid=True), ForeignKey("collections.id", ondelete="CASCADE"), nullable=False)
     url = Column(String(2048), nullable=False)
+    url_hash = Column(String(64), nullable=True)  # sha256 de la URL canónica, para detectar duplicados
     title = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
     thumbnail_url = Column(String(2048), nullable=True)
@@ -18,7 +21,52 @@ class Item(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime, nullable=True)  # soft delete
     version = Column(Integer, default=0)
-    item_metadata = Column(JSONB, nullable=True)  # ← Cambié de 'metadata' a 'item_metadata'
+    change_seq = Column(BigInteger, nullable=False, server_default=change_sequence.next_value(), onupdate=change_sequence.next_value())
+    change_txid = Column(BigInteger, nullable=False, server_default=text(CURRENT_TXID), onupdate=text(CURRENT_TXID))
+    own_metadata = Column("item_metadata", JSONB, nullable=True)  # solo items anteriores al store compartido
+    link_metadata_id = Column(UUID(as_uuid=True), ForeignKey("link_metadata.id", ondelete="SET NULL"), nullable=True, index=True)
+    enrichment_status = Column(String(50), nullable=True)  # pending, done, failed
+    field_versions = Column(JSONB, nullable=True)  # versión en la que cambió cada campo editable (merge de sync)
+    # Columna generada: Postgres la mantiene en cada INSERT/UPDATE
+    # Configuración 'simple' porque los links mezclan idiomas
+    search_vector = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(platform, '') || ' ' || url), 'C')",
+        persisted=True
+    ))
+    
+    link_metadata = relationship("LinkMetadata", lazy="joined")
+    
+    __table_args__ = (
+        # Duplicados por URL, solo entre items activos
+        Index(
+            "ix_items_active_url_hash",
+            "collection_id", "url_hash",
+            postgresql_where=deleted_at.is_(None)
+        ),
+        # Versión agregada de la carpeta (último change_seq) para ETags
+        # También cubre las búsquedas por collection_id solo (borrado en cascada)
+        Index("ix_items_collection_change_seq", "collection_id", "change_seq"),
+        # Feed de sync: orden (transacción, secuencia)
+        Index("ix_items_change_txid_seq", "change_txid", "change_seq"),
+        # Búsqueda: texto completo y trigramas (pg_trgm) para errores de tipeo
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_items_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        # Paginación keyset de la carpeta, solo sobre items activos
+        Index(
+            "ix_items_collection_created",
+            "collection_id", "created_at", "id",
+            postgresql_where=deleted_at.is_(None)
+        ),
+    )
+    
+    @property
+    def item_metadata(self):
+        """Metadata compartida por URL canónica (o la copia propia en items antiguos)"""
+        if self.link_metadata is not None:
+            return self.link_metadata.data
+        return self.own_metadata
     
     def __repr__(self):
         return f"<Item {self.title}>"
\ No newline at end of file
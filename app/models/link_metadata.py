@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, Boolean, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+import uuid
+
+class LinkMetadata(Base):
+    __tablename__ = "link_metadata"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    url_hash = Column(String(64), unique=True, nullable=False)  # sha256 de la URL canónica
+    canonical_url = Column(String(2048), nullable=False)
+    data = Column(JSONB, nullable=False)
+    ok = Column(Boolean, default=True, nullable=False)  # False = fallo cacheado (negative caching)
+    fetched_at = Column(DateTime, default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<LinkMetadata {self.canonical_url}>"
\ No newline at end of file
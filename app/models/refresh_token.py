@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+import uuid
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # todos los tokens rotados desde un mismo login
+    token_hash = Column(String(64), unique=True, nullable=False)  # HMAC-SHA256 del token, nunca el token
+    created_at = Column(DateTime, default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # rotado, cerrado o revocado por reuso
+    replaced_by = Column(UUID(as_uuid=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<RefreshToken {self.family_id}>"
\ No newline at end of file
@@ -1,21 +1,58 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, BigInteger, Boolean, func
+from sqlalchemy import Column, String, DateTime, ForeignKey, BigInteger, Boolean, Index, PrimaryKeyConstraint, Sequence, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.database import Base
 import uuid
 
+# Secuencia global del servidor para el feed de cambios: cada insert/update de
+# items y collections toma un valor nuevo, así un solo cursor cubre ambas tablas
+change_sequence = Sequence("change_seq", metadata=Base.metadata)
+
+# Transacción que escribió la fila (xid8 como bigint, junto con change_seq): el
+# feed solo entrega filas de transacciones que ya terminaron (ver get_changes)
+CURRENT_TXID = "pg_current_xact_id()::text::bigint"
+
 class SyncLog(Base):
+    """
+    Particionada por rango de server_timestamp (una partición por mes, ver
+    app/utils/sync_log.py): las particiones viejas se borran o archivan enteras
+    """
     __tablename__ = "sync_log"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     entity_type = Column(String(100), nullable=False)  # collection, item
     entity_id = Column(UUID(as_uuid=True), nullable=False)
     operation = Column(String(50), nullable=False)  # create, update, delete
     data = Column(JSONB, nullable=False)
-    timestamp = Column(BigInteger, nullable=False, index=True)  # client timestamp en ms
-    server_timestamp = Column(DateTime, default=func.now())
-    synced = Column(Boolean, default=False, index=True)
+    timestamp = Column(BigInteger, nullable=False)  # client timestamp en ms
+    server_timestamp = Column(DateTime, nullable=False, default=func.now())  # clave de partición
+    synced = Column(Boolean, default=False)
     conflict_resolved = Column(Boolean, default=False)
     
+    __table_args__ = (
+        # La PK debe incluir la clave de partición; en este orden también sirve
+        # al recorrido por tiempo de la compactación
+        PrimaryKeyConstraint("server_timestamp", "id", name="sync_log_pkey"),
+        # Historial por usuario y por entidad, en orden de llegada al servidor
+        Index("ix_sync_log_user_server_ts", "user_id", "server_timestamp"),
+        Index("ix_sync_log_entity_server_ts", "entity_id", "server_timestamp"),
+        {"postgresql_partition_by": "RANGE (server_timestamp)"},
+    )
+    
+    def __repr__(self):
+        return f"<SyncLog {self.entity_type} {self.operation}>"
+
+class SyncLogCursor(Base):
+    """
+    Última fila de sync_log recorrida por una tarea de mantenimiento por lotes
+    (la compactación), para retomarla tras un reinicio o desde otro worker
+    """
+    __tablename__ = "sync_log_cursors"
+    
+    name = Column(String(50), primary_key=True)
+    server_timestamp = Column(DateTime, nullable=False)
+    row_id = Column(UUID(as_uuid=True), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
     def __repr__(self):
-        return f"<SyncLog {self.entity_type} {self.operation}>"
\ No newline at end of file
+        return f"<SyncLogCursor {self.name}>"
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.database import Base
+import uuid
+
+class SyncOperation(Base):
+    """Resultado de cada operación de sync con op_id, para responder reintentos sin re-ejecutarla"""
+    __tablename__ = "sync_operations"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    op_id = Column(UUID(as_uuid=True), nullable=False)  # generado por el cliente; los reintentos lo repiten
+    response = Column(JSONB, nullable=False)  # SyncResponse tal como se devolvió
+    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "op_id", name="unique_sync_operation"),
+    )
+    
+    def __repr__(self):
+        return f"<SyncOperation {self.op_id}>"
\ No newline at end of file
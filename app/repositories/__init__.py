@@ -0,0 +1,25 @@
+from app.repositories.user import get_user_by_id, get_user_by_email, get_user_by_username, user_exists
+from app.repositories.connection import get_connection, get_connection_between, list_connections_for_user
+from app.repositories.collection import (
+    get_collection, get_collections_by_ids, list_collections_by_connection,
+    get_collection_state, get_connection_collections_state
+)
+from app.repositories.item import (
+    get_item, get_items_by_ids, delete_collection_items, list_items_by_collection,
+    find_duplicate_item, find_duplicate_items, get_item_state, get_collection_items_state, existing_url_hashes, search_items
+)
+from app.repositories.import_job import get_import_job, count_import_enrichment
+from app.repositories.refresh_token import get_refresh_token_for_update, revoke_refresh_family
+from app.repositories.sync_operation import get_sync_operation, get_sync_operations
+
+__all__ = [
+    "get_user_by_id", "get_user_by_email", "get_user_by_username", "user_exists",
+    "get_connection", "get_connection_between", "list_connections_for_user",
+    "get_collection", "get_collections_by_ids", "list_collections_by_connection",
+    "get_collection_state", "get_connection_collections_state",
+    "get_item", "get_items_by_ids", "delete_collection_items", "list_items_by_collection",
+    "find_duplicate_item", "find_duplicate_items", "get_item_state", "get_collection_items_state", "existing_url_hashes", "search_items",
+    "get_import_job", "count_import_enrichment",
+    "get_refresh_token_for_update", "revoke_refresh_family",
+    "get_sync_operation", "get_sync_operations"
+]
\ No newline at end of file
@@ -0,0 +1,58 @@
+from sqlalchemy import select, tuple_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Collection
+from app.utils.serialization import COLLECTION_LAYOUT
+from datetime import datetime
+import uuid
+
+async def get_collection(db: AsyncSession, collection_id: uuid.UUID) -> Collection | None:
+    result = await db.execute(select(Collection).where(Collection.id == collection_id))
+    return result.scalar_one_or_none()
+
+async def get_collections_by_ids(db: AsyncSession, collection_ids) -> dict[uuid.UUID, Collection]:
+    if not collection_ids:
+        return {}
+    result = await db.execute(select(Collection).where(Collection.id.in_(collection_ids)))
+    return {collection.id: collection for collection in result.scalars()}
+
+async def list_collections_by_connection(
+    db: AsyncSession,
+    connection_id: uuid.UUID,
+    limit: int,
+    before: tuple[datetime, uuid.UUID] | None = None
+) -> list[dict]:
+    """
+    Carpetas activas de la conexión, de la más nueva a la más vieja, como dicts con
+    la forma de CollectionResponse (filas Core, sin ORM)
+    Keyset sobre (created_at, id): `before` es la última fila de la página anterior
+    """
+    query = COLLECTION_LAYOUT.select().where(
+        Collection.connection_id == connection_id,
+        Collection.deleted_at.is_(None)
+    )
+    if before is not None:
+        query = query.where(tuple_(Collection.created_at, Collection.id) < before)
+    result = await db.execute(
+        query.order_by(Collection.created_at.desc(), Collection.id.desc()).limit(limit)
+    )
+    return COLLECTION_LAYOUT.to_dicts(result)
+
+async def get_collection_state(db: AsyncSession, collection_id: uuid.UUID):
+    """Solo los validadores de la carpeta activa (sin cargar la fila completa)"""
+    result = await db.execute(
+        select(Collection.connection_id, Collection.change_seq, Collection.updated_at)
+        .where(Collection.id == collection_id, Collection.deleted_at.is_(None))
+    )
+    return result.first()
+
+async def get_connection_collections_state(db: AsyncSession, connection_id: uuid.UUID) -> tuple[int, int | None, datetime | None]:
+    """
+    Versión agregada de las carpetas activas de la conexión
+    Una carpeta borrada sale del listado, así que además del último
+    change_seq se cuenta cuántas quedan
+    """
+    result = await db.execute(
+        select(func.count(), func.max(Collection.change_seq), func.max(Collection.updated_at))
+        .where(Collection.connection_id == connection_id, Collection.deleted_at.is_(None))
+    )
+    return tuple(result.one())
\ No newline at end of file
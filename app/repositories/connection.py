@@ -0,0 +1,25 @@
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Connection
+import uuid
+
+async def get_connection(db: AsyncSession, connection_id: uuid.UUID) -> Connection | None:
+    result = await db.execute(select(Connection).where(Connection.id == connection_id))
+    return result.scalar_one_or_none()
+
+async def get_connection_between(db: AsyncSession, user_id_1: uuid.UUID, user_id_2: uuid.UUID) -> Connection | None:
+    result = await db.execute(
+        select(Connection).where(
+            Connection.user_id_1 == user_id_1,
+            Connection.user_id_2 == user_id_2
+        )
+    )
+    return result.scalar_one_or_none()
+
+async def list_connections_for_user(db: AsyncSession, user_id: uuid.UUID) -> list[Connection]:
+    result = await db.execute(
+        select(Connection).where(
+            or_(Connection.user_id_1 == user_id, Connection.user_id_2 == user_id)
+        )
+    )
+    return list(result.scalars())
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import ImportJob, EnrichmentJob
+import uuid
+
+async def get_import_job(db: AsyncSession, job_id: uuid.UUID) -> ImportJob | None:
+    result = await db.execute(select(ImportJob).where(ImportJob.id == job_id))
+    return result.scalar_one_or_none()
+
+async def count_import_enrichment(db: AsyncSession, job_id: uuid.UUID) -> dict[str, int]:
+    """Estado del enriquecimiento de los items de una importación"""
+    result = await db.execute(
+        select(EnrichmentJob.status, func.count())
+        .where(EnrichmentJob.import_job_id == job_id)
+        .group_by(EnrichmentJob.status)
+    )
+    counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+    counts.update(dict(result.all()))
+    return counts
\ No newline at end of file
@@ -0,0 +1,182 @@
+from sqlalchemy import select, update, tuple_, func, literal, or_, cast, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Item, LinkMetadata
+from app.utils.serialization import ITEM_LAYOUT
+from datetime import datetime
+import re
+import uuid
+
+async def get_item(db: AsyncSession, item_id: uuid.UUID) -> Item | None:
+    result = await db.execute(select(Item).where(Item.id == item_id))
+    return result.scalar_one_or_none()
+
+async def get_items_by_ids(db: AsyncSession, item_ids) -> dict[uuid.UUID, Item]:
+    if not item_ids:
+        return {}
+    result = await db.execute(select(Item).where(Item.id.in_(item_ids)))
+    return {item.id: item for item in result.scalars()}
+
+async def delete_collection_items(db: AsyncSession, collection_ids, deleted_at: datetime) -> None:
+    """
+    Tombstones de los items activos de carpetas borradas, en la transacción
+    del borrado de la carpeta: cada uno sube de versión y de change_seq y
+    llega al feed de sync como borrado
+    """
+    if not collection_ids:
+        return
+    await db.execute(
+        update(Item)
+        .where(Item.collection_id.in_(collection_ids), Item.deleted_at.is_(None))
+        .values(deleted_at=deleted_at, updated_at=deleted_at, version=Item.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+async def list_items_by_collection(
+    db: AsyncSession,
+    collection_id: uuid.UUID,
+    limit: int,
+    before: tuple[datetime, uuid.UUID] | None = None
+) -> list[dict]:
+    """
+    Items activos de la carpeta, del más nuevo al más viejo, como dicts con
+    la forma de ItemResponse (filas Core, sin ORM)
+    Keyset sobre (created_at, id): `before` es la última fila de la página anterior
+    """
+    query = ITEM_LAYOUT.select().outerjoin(
+        LinkMetadata, LinkMetadata.id == Item.link_metadata_id
+    ).where(
+        Item.collection_id == collection_id,
+        Item.deleted_at.is_(None)
+    )
+    if before is not None:
+        query = query.where(tuple_(Item.created_at, Item.id) < before)
+    result = await db.execute(
+        query.order_by(Item.created_at.desc(), Item.id.desc()).limit(limit)
+    )
+    return ITEM_LAYOUT.to_dicts(result)
+
+async def find_duplicate_item(db: AsyncSession, collection_id: uuid.UUID, url_hash: str) -> Item | None:
+    """Item activo de la carpeta con la misma URL canónica"""
+    result = await db.execute(
+        select(Item).where(
+            Item.collection_id == collection_id,
+            Item.url_hash == url_hash,
+            Item.deleted_at.is_(None)
+        ).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+async def find_duplicate_items(db: AsyncSession, keys) -> dict[tuple, Item]:
+    """Duplicados para varios pares (collection_id, url_hash) en una sola query"""
+    if not keys:
+        return {}
+    result = await db.execute(
+        select(Item).where(
+            tuple_(Item.collection_id, Item.url_hash).in_(keys),
+            Item.deleted_at.is_(None)
+        )
+    )
+    return {(item.collection_id, item.url_hash): item for item in result.scalars()}
+
+async def get_item_state(db: AsyncSession, item_id: uuid.UUID):
+    """
+    Solo los validadores del item (sin cargar la fila completa), incluida la
+    última actualización de su metadata compartida
+    """
+    result = await db.execute(
+        select(
+            Item.collection_id, Item.change_seq, Item.updated_at, Item.deleted_at,
+            LinkMetadata.fetched_at.label("metadata_fetched_at")
+        )
+        .outerjoin(LinkMetadata, LinkMetadata.id == Item.link_metadata_id)
+        .where(Item.id == item_id)
+    )
+    return result.first()
+
+async def get_collection_items_state(
+    db: AsyncSession,
+    collection_id: uuid.UUID
+) -> tuple[int | None, datetime | None, datetime | None]:
+    """
+    Versión agregada de los items de la carpeta: (último change_seq, último
+    fetched_at de su metadata compartida, última modificación)
+    Cualquier escritura de un item (incluido el borrado lógico) toma un
+    change_seq nuevo y basta una lectura del índice (collection_id, change_seq);
+    la metadata compartida se refresca sin tocar los items, por eso va aparte
+    """
+    metadata_fetched_at = (
+        select(func.max(LinkMetadata.fetched_at))
+        .join(Item, Item.link_metadata_id == LinkMetadata.id)
+        .where(Item.collection_id == collection_id, Item.deleted_at.is_(None))
+        .correlate(None)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(Item.change_seq, Item.updated_at, metadata_fetched_at.label("metadata_fetched_at"))
+        .where(Item.collection_id == collection_id)
+        .order_by(Item.change_seq.desc())
+        .limit(1)
+    )
+    row = result.first()
+    if row is None:
+        return None, None, None
+    last_modified = max(filter(None, (row.updated_at, row.metadata_fetched_at)), default=None)
+    return row.change_seq, row.metadata_fetched_at, last_modified
+
+async def existing_url_hashes(db: AsyncSession, collection_id: uuid.UUID, url_hashes) -> set[str]:
+    """Cuáles de estos url_hash ya tienen un item activo en la carpeta"""
+    if not url_hashes:
+        return set()
+    result = await db.execute(
+        select(Item.url_hash).where(
+            Item.collection_id == collection_id,
+            Item.url_hash.in_(url_hashes),
+            Item.deleted_at.is_(None)
+        )
+    )
+    return set(result.scalars())
+
+async def search_items(
+    db: AsyncSession,
+    collection_ids,
+    query: str,
+    limit: int,
+    after: tuple[float, uuid.UUID] | None = None,
+    platform: str | None = None
+) -> list:
+    """
+    Items activos de esas carpetas que coinciden con la búsqueda, por relevancia
+    Coincide por texto completo (prefijos de cada palabra, índice GIN sobre
+    search_vector) o por similitud de trigramas con el título (índice GIN
+    trgm); el puntaje suma ambos
+    Retorna filas con la forma de ITEM_LAYOUT y el puntaje al final
+    Keyset sobre (puntaje, id): `after` es la última fila de la página anterior
+    """
+    if not collection_ids:
+        return []
+
+    words = re.findall(r"\w+", query.lower())
+    ts_query = func.to_tsquery("simple", " & ".join(f"{word}:*" for word in words)) if words else None
+    fuzzy = literal(query).op("<%")(Item.title)
+
+    score = func.word_similarity(query, func.coalesce(Item.title, ""))
+    match = fuzzy
+    if ts_query is not None:
+        score = func.ts_rank_cd(Item.search_vector, ts_query) + score
+        match = or_(Item.search_vector.op("@@")(ts_query), fuzzy)
+    score = cast(score, Float)
+
+    statement = ITEM_LAYOUT.select(score).outerjoin(
+        LinkMetadata, LinkMetadata.id == Item.link_metadata_id
+    ).where(
+        Item.collection_id.in_(collection_ids),
+        Item.deleted_at.is_(None),
+        match
+    )
+    if platform:
+        statement = statement.where(Item.platform == platform)
+    if after is not None:
+        statement = statement.where(tuple_(score, Item.id) < after)
+
+    result = await db.execute(statement.order_by(score.desc(), Item.id.desc()).limit(limit))
+    return result.all()
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import RefreshToken
+from datetime import datetime
+import uuid
+
+async def get_refresh_token_for_update(db: AsyncSession, token_hash: str) -> RefreshToken | None:
+    """Token por su hash (índice único), bloqueado para rotarlo sin carreras"""
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == token_hash).with_for_update()
+    )
+    return result.scalar_one_or_none()
+
+async def revoke_refresh_family(db: AsyncSession, family_id: uuid.UUID, now: datetime) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
\ No newline at end of file
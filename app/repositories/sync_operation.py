@@ -0,0 +1,24 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import SyncOperation
+import uuid
+
+async def get_sync_operation(db: AsyncSession, user_id: uuid.UUID, op_id: uuid.UUID) -> dict | None:
+    """Respuesta guardada de una operación ya aplicada (índice único user_id, op_id)"""
+    return await db.scalar(
+        select(SyncOperation.response).where(
+            SyncOperation.user_id == user_id,
+            SyncOperation.op_id == op_id
+        )
+    )
+
+async def get_sync_operations(db: AsyncSession, user_id: uuid.UUID, op_ids) -> dict[uuid.UUID, dict]:
+    if not op_ids:
+        return {}
+    result = await db.execute(
+        select(SyncOperation.op_id, SyncOperation.response).where(
+            SyncOperation.user_id == user_id,
+            SyncOperation.op_id.in_(op_ids)
+        )
+    )
+    return {op_id: response for op_id, response in result}
\ No newline at end of file
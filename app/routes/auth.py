@@ -1,21 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
 from app.database import get_db
-from app.models import User
-from app.schemas import UserCreate, UserLogin, UserResponse, Token
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.models import User, RefreshToken
+from app.repositories import get_user_by_email, get_user_by_username, get_refresh_token_for_update, revoke_refresh_family
+from app.schemas import UserCreate, UserLogin, UserResponse, Token, RefreshRequest
+from app.utils.security import hash_password, verify_password, create_access_token, generate_refresh_token, hash_refresh_token
 from app.config import get_settings
+import uuid
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
 
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Registrar nuevo usuario"""
     
     # Verificar que el email no exista
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    existing_email = await get_user_by_email(db, user_data.email)
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -23,7 +25,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Verificar que el username no exista
-    existing_username = db.query(User).filter(User.username == user_data.username).first()
+    existing_username = await get_user_by_username(db, user_data.username)
     if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -34,33 +36,119 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=hash_password(user_data.password)
+        password_hash=await hash_password(user_data.password)
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login de usuario"""
     
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await get_user_by_email(db, user_data.email)
     
-    if not user or not verify_password(user_data.password, user.password_hash):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email o password incorrecto"
         )
     
+    valid, new_hash = await verify_password(user_data.password, user.password_hash)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email o password incorrecto"
+        )
+    
+    # Hash con un costo distinto al configurado: se reemplaza de forma transparente
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+    
+    _, tokens = issue_tokens(db, user.id)
+    await db.commit()
+    
+    return tokens
+
+@router.post("/refresh", response_model=Token)
+async def refresh(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Rotar el refresh token: entrega un access token y un refresh token nuevos
+    Sin bcrypt: una búsqueda por índice único y un HMAC
+    """
+    
+    now = datetime.utcnow()
+    record = await get_refresh_token_for_update(db, hash_refresh_token(data.refresh_token))
+    
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido"
+        )
+    
+    if record.revoked_at is not None:
+        # Reuso de un token ya rotado: puede haber sido robado, se revoca toda la familia
+        await revoke_refresh_family(db, record.family_id, now)
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revocado"
+        )
+    
+    if record.expires_at <= now:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token expirado"
+        )
+    
+    new_record, tokens = issue_tokens(db, record.user_id, record.family_id)
+    record.revoked_at = now
+    record.replaced_by = new_record.id
+    await db.commit()
+    
+    return tokens
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Revocar el refresh token y todos los rotados desde el mismo login"""
+    
+    record = await get_refresh_token_for_update(db, hash_refresh_token(data.refresh_token))
+    if record:
+        await revoke_refresh_family(db, record.family_id, datetime.utcnow())
+        await db.commit()
+
+def issue_tokens(db: AsyncSession, user_id: uuid.UUID, family_id: uuid.UUID | None = None) -> tuple[RefreshToken, dict]:
+    """
+    Access token + refresh token nuevo (familia nueva en el login, la misma al
+    rotar); el registro queda agregado a la sesión, sin commit
+    """
+    refresh_token, token_hash = generate_refresh_token()
+    now = datetime.utcnow()
+    record = RefreshToken(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4(),
+        token_hash=token_hash,
+        created_at=now,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    db.add(record)
+    
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": str(user_id)},
         expires_delta=access_token_expires
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return record, {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": int(access_token_expires.total_seconds())
+    }
\ No newline at end of file
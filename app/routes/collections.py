@@ -1,66 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.deps import get_current_user
-from app.models import User, Connection, Collection
-from app.schemas import CollectionCreate, CollectionResponse, CollectionUpdate
+from app.deps import get_current_principal, get_connection_access, get_collection_access, get_read_db
+from app.utils.principal import Principal
+from app.models import Collection
+from app.repositories import (
+    get_collection, list_collections_by_connection,
+    get_collection_state, get_connection_collections_state, delete_collection_items
+)
+from app.schemas import CollectionCreate, CollectionResponse, CollectionUpdate, CollectionPage
+from app.utils.access import ConnectionRef, invalidate_connection_members
+from app.utils.conditional import make_etag, check_not_modified
+from app.utils.serialization import encoded_response
+from app.utils.wire import MsgPackRoute
+from app.utils.broker import publish_change
+from app.utils.merge import COLLECTION_MERGE_FIELDS, record_changes
+from app.utils.pagination import encode_keyset_cursor, decode_keyset_cursor
+from app.config import get_settings
+from datetime import datetime
 import uuid
 
-router = APIRouter(prefix="/collections", tags=["collections"])
+router = APIRouter(prefix="/collections", tags=["collections"], route_class=MsgPackRoute)
+settings = get_settings()
 
-@router.get("/connection/{connection_id}", response_model=list[CollectionResponse])
-def get_collections_by_connection(
+@router.get("/connection/{connection_id}", response_model=CollectionPage)
+async def get_collections_by_connection(
     connection_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(settings.LIST_PAGE_SIZE, ge=1, le=settings.LIST_MAX_PAGE_SIZE),
+    connection: ConnectionRef = Depends(get_connection_access),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Obtener todas las carpetas de una conexión"""
-    
-    connection = db.query(Connection).filter(Connection.id == connection_id).first()
-    
-    if not connection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conexión no encontrada"
-        )
-    
-    # Verificar que el usuario sea parte de la conexión
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
-        )
-    
-    collections = db.query(Collection).filter(
-        Collection.connection_id == connection_id
-    ).all()
-    
-    return collections
+    """
+    Obtener las carpetas de una conexión, paginadas de la más nueva a la más vieja
+    El cursor es la posición (created_at, id) de la última carpeta recibida
+    Responde 304 si If-None-Match coincide, sin leer las carpetas
+    """
+    
+    before = None
+    if cursor:
+        try:
+            before = decode_keyset_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido"
+            )
+    
+    count, change_seq, last_modified = await get_connection_collections_state(db, connection_id)
+    etag = make_etag("collections", connection_id, count, change_seq, cursor, limit)
+    not_modified = check_not_modified(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    collections = await list_collections_by_connection(db, connection_id, limit + 1, before)
+    has_more = len(collections) > limit
+    collections = collections[:limit]
+    
+    # Camino de lectura liviano: filas Core codificadas directo a JSON (o MessagePack)
+    return encoded_response({
+        "collections": collections,
+        "next_cursor": encode_keyset_cursor(collections[-1]["created_at"], collections[-1]["id"]) if has_more else None,
+        "has_more": has_more
+    }, response)
 
 @router.post("/connection/{connection_id}", response_model=CollectionResponse)
-def create_collection(
+async def create_collection(
     connection_id: uuid.UUID,
     collection_data: CollectionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    connection: ConnectionRef = Depends(get_connection_access),
+    db: AsyncSession = Depends(get_db)
 ):
     """Crear nueva carpeta en una conexión"""
     
-    connection = db.query(Connection).filter(Connection.id == connection_id).first()
-    
-    if not connection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conexión no encontrada"
-        )
-    
-    # Verificar que el usuario sea parte de la conexión
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
-        )
-    
     new_collection = Collection(
         connection_id=connection_id,
         name=collection_data.name,
@@ -69,69 +84,98 @@ def create_collection(
     )
     
     db.add(new_collection)
-    db.commit()
-    db.refresh(new_collection)
+    await db.commit()
+    await db.refresh(new_collection)
+    
+    invalidate_connection_members(connection)
+    publish_change("collection", "create", new_collection.id, connection, version=new_collection.version)
     
     return new_collection
 
+@router.get("/{collection_id}", response_model=CollectionResponse)
+async def get_collection_detail(
+    collection_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    connection: ConnectionRef = Depends(get_collection_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """Obtener una carpeta; responde 304 si If-None-Match coincide"""
+    
+    state = await get_collection_state(db, collection_id)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Carpeta no encontrada"
+        )
+    
+    etag = make_etag("collection", collection_id, state.change_seq)
+    not_modified = check_not_modified(request, response, etag, state.updated_at)
+    if not_modified:
+        return not_modified
+    
+    return await get_collection(db, collection_id)
+
 @router.put("/{collection_id}", response_model=CollectionResponse)
-def update_collection(
+async def update_collection(
     collection_id: uuid.UUID,
     collection_data: CollectionUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    connection: ConnectionRef = Depends(get_collection_access),
+    db: AsyncSession = Depends(get_db)
 ):
     """Actualizar carpeta"""
     
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
+    # Cualquiera de los dos usuarios puede editar (verificado en get_collection_access)
+    collection = await get_collection(db, collection_id)
     
-    if not collection:
+    if not collection or collection.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Carpeta no encontrada"
         )
     
-    # Cualquiera de los dos usuarios puede editar
-    connection = db.query(Connection).filter(Connection.id == collection.connection_id).first()
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
-        )
-    
+    changed = []
     if collection_data.name:
         collection.name = collection_data.name
+        changed.append("name")
     if collection_data.icon:
         collection.icon = collection_data.icon
+        changed.append("icon")
     
     collection.version += 1
-    db.commit()
-    db.refresh(collection)
+    # Historial por campo para el merge de sync
+    record_changes(collection, changed, COLLECTION_MERGE_FIELDS)
+    await db.commit()
+    await db.refresh(collection)
+    
+    publish_change("collection", "update", collection.id, connection, version=collection.version)
     
     return collection
 
 @router.delete("/{collection_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_collection(
+async def delete_collection(
     collection_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    connection: ConnectionRef = Depends(get_collection_access),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Eliminar carpeta"""
+    """
+    Eliminar carpeta (soft delete): la carpeta y sus items quedan como
+    tombstones para que el feed de sync entregue el borrado
+    """
     
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
+    collection = await get_collection(db, collection_id)
     
-    if not collection:
+    if not collection or collection.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Carpeta no encontrada"
         )
     
-    connection = db.query(Connection).filter(Connection.id == collection.connection_id).first()
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
-        )
+    now = datetime.utcnow()
+    collection.deleted_at = now
+    collection.version += 1
+    await delete_collection_items(db, [collection_id], now)
+    await db.commit()
     
-    db.delete(collection)
-    db.commit()
\ No newline at end of file
+    invalidate_connection_members(connection)
+    publish_change("collection", "delete", collection_id, connection, version=collection.version)
\ No newline at end of file
@@ -1,31 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.deps import get_current_user
-from app.models import User, Connection
+from app.deps import get_current_principal, get_connection_access
+from app.utils.principal import Principal
+from app.models import Connection
+from app.repositories import get_connection, get_connection_between, list_connections_for_user, user_exists
 from app.schemas import ConnectionCreate, ConnectionResponse
+from app.utils.access import ConnectionRef, invalidate_connection_members
 import uuid
 
 router = APIRouter(prefix="/connections", tags=["connections"])
 
 @router.get("/", response_model=list[ConnectionResponse])
-def get_connections(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_connections(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Obtener todas las conexiones del usuario"""
     
-    connections = db.query(Connection).filter(
-        (Connection.user_id_1 == current_user.id) | (Connection.user_id_2 == current_user.id)
-    ).all()
-    
-    return connections
+    return await list_connections_for_user(db, current_user.id)
 
 @router.post("/", response_model=ConnectionResponse)
-def create_connection(
+async def create_connection(
     connection_data: ConnectionCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """Crear solicitud de conexión"""
     
@@ -36,8 +35,7 @@ def create_connection(
         )
     
     # Verificar que el otro usuario existe
-    other_user = db.query(User).filter(User.id == connection_data.user_id_2).first()
-    if not other_user:
+    if not await user_exists(db, connection_data.user_id_2):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuario no encontrado"
@@ -48,10 +46,7 @@ def create_connection(
     user_2 = max(current_user.id, connection_data.user_id_2)
     
     # Verificar que no exista ya
-    existing = db.query(Connection).filter(
-        Connection.user_id_1 == user_1,
-        Connection.user_id_2 == user_2
-    ).first()
+    existing = await get_connection_between(db, user_1, user_2)
     
     if existing:
         raise HTTPException(
@@ -66,20 +61,22 @@ def create_connection(
     )
     
     db.add(new_connection)
-    db.commit()
-    db.refresh(new_connection)
+    await db.commit()
+    await db.refresh(new_connection)
+    
+    invalidate_connection_members(new_connection)
     
     return new_connection
 
 @router.put("/{connection_id}/accept", response_model=ConnectionResponse)
-def accept_connection(
+async def accept_connection(
     connection_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    access: ConnectionRef = Depends(get_connection_access),
+    db: AsyncSession = Depends(get_db)
 ):
     """Aceptar solicitud de conexión"""
     
-    connection = db.query(Connection).filter(Connection.id == connection_id).first()
+    connection = await get_connection(db, connection_id)
     
     if not connection:
         raise HTTPException(
@@ -87,15 +84,10 @@ def accept_connection(
             detail="Conexión no encontrada"
         )
     
-    # Verificar que el usuario sea parte de la conexión
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para aceptar esta conexión"
-        )
-    
     connection.status = "accepted"
-    db.commit()
-    db.refresh(connection)
+    await db.commit()
+    await db.refresh(connection)
+    
+    invalidate_connection_members(connection)
     
     return connection
\ No newline at end of file
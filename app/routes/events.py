@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.deps import get_current_principal, get_db
+from app.utils.principal import Principal
+from app.utils.broker import broker
+from app.config import get_settings
+import asyncio
+import json
+
+router = APIRouter(prefix="/events", tags=["events"])
+settings = get_settings()
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream SSE con los cambios de las conexiones del usuario
+    Un evento "resync" indica que se perdieron eventos y hay que leer /sync/changes
+    """
+    
+    # Es la misma sesión que usó get_current_principal: liberar la conexión del
+    # pool para que un socket inactivo no la retenga
+    await db.close()
+    
+    subscription = broker.subscribe(current_user.id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiadas suscripciones abiertas"
+        )
+    
+    async def release():
+        broker.unsubscribe(subscription)
+    
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(),
+                        timeout=settings.REALTIME_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+    
+    # Si el cliente se desconecta antes de que arranque el generador su finally
+    # nunca corre: la tarea de fondo libera la suscripción al terminar la respuesta
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release)
+    )
\ No newline at end of file
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.deps import get_current_principal, get_collection_access
+from app.utils.principal import Principal
+from app.models import ImportJob
+from app.repositories import get_import_job, count_import_enrichment
+from app.schemas import ImportJobResponse
+from app.utils.access import ConnectionRef
+from app.utils.import_parsers import detect_format
+from app.utils.imports import spool_upload, import_runner
+import uuid
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+@router.post("/collection/{collection_id}", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import(
+    collection_id: uuid.UUID,
+    file: UploadFile = File(...),
+    format: str | None = Query(None, pattern="^(html|json|csv)$"),
+    current_user: Principal = Depends(get_current_principal),
+    connection: ConnectionRef = Depends(get_collection_access),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Importar links a una carpeta desde un export de marcadores (HTML), JSON o CSV
+    La importación sigue en segundo plano; el progreso se consulta en GET /imports/{id}
+    """
+    
+    import_format = format or detect_format(file.filename, file.content_type)
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato no soportado: usa html, json o csv"
+        )
+    
+    spool = await spool_upload(file)
+    
+    job = ImportJob(
+        user_id=current_user.id,
+        collection_id=collection_id,
+        format=import_format,
+        filename=(file.filename or "")[:255] or None,
+        status="pending"
+    )
+    db.add(job)
+    try:
+        await db.commit()
+        await db.refresh(job)
+    except Exception:
+        spool.close()
+        raise
+    
+    import_runner.submit(job.id, spool, import_format, collection_id, current_user.id, connection)
+    
+    return job
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+async def get_import(
+    job_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progreso y reporte final de una importación"""
+    
+    job = await get_import_job(db, job_id)
+    
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Importación no encontrada"
+        )
+    
+    enrichment = await count_import_enrichment(db, job_id)
+    return ImportJobResponse.model_validate(job).model_copy(update={"enrichment": enrichment})
\ No newline at end of file
@@ -1,154 +1,185 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.deps import get_current_user
-from app.models import User, Collection, Item, Connection
-from app.schemas import ItemCreate, ItemResponse, ItemUpdate
-from app.utils.metadata import extract_metadata, detect_platform
+from app.deps import get_current_principal, get_collection_access, get_item_access, get_read_db
+from app.utils.principal import Principal
+from app.models import Item
+from app.repositories import (
+    get_item, list_items_by_collection, find_duplicate_item,
+    get_item_state, get_collection_items_state
+)
+from app.schemas import ItemCreate, ItemResponse, ItemUpdate, ItemPage
+from app.utils.metadata import detect_platform, url_hash
+from app.utils.enrichment import enqueue_enrichment, enrichment_worker
+from app.utils.access import ConnectionRef, resolve_collection
+from app.utils.conditional import make_etag, check_not_modified
+from app.utils.serialization import encoded_response
+from app.utils.wire import MsgPackRoute
+from app.utils.broker import publish_change
+from app.utils.merge import ITEM_MERGE_FIELDS, record_changes
+from app.utils.pagination import encode_keyset_cursor, decode_keyset_cursor
+from app.config import get_settings
+from datetime import datetime
 import uuid
-import asyncio
 
-router = APIRouter(prefix="/items", tags=["items"])
+router = APIRouter(prefix="/items", tags=["items"], route_class=MsgPackRoute)
+settings = get_settings()
 
-@router.get("/collection/{collection_id}", response_model=list[ItemResponse])
-def get_items_by_collection(
+@router.get("/collection/{collection_id}", response_model=ItemPage)
+async def get_items_by_collection(
     collection_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(settings.LIST_PAGE_SIZE, ge=1, le=settings.LIST_MAX_PAGE_SIZE),
+    connection: ConnectionRef = Depends(get_collection_access),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Obtener todos los items de una carpeta"""
-    
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
+    """
+    Obtener los items de una carpeta, paginados del más nuevo al más viejo
+    El cursor es la posición (created_at, id) del último item recibido
+    Responde 304 si If-None-Match coincide, sin leer los items
+    """
+    
+    before = None
+    if cursor:
+        try:
+            before = decode_keyset_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido"
+            )
+    
+    change_seq, metadata_fetched_at, last_modified = await get_collection_items_state(db, collection_id)
+    etag = make_etag("items", collection_id, change_seq, metadata_fetched_at, cursor, limit)
+    not_modified = check_not_modified(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    items = await list_items_by_collection(db, collection_id, limit + 1, before)
+    has_more = len(items) > limit
+    items = items[:limit]
+    
+    # Camino de lectura liviano: filas Core codificadas directo a JSON (o MessagePack)
+    return encoded_response({
+        "items": items,
+        "next_cursor": encode_keyset_cursor(items[-1]["created_at"], items[-1]["id"]) if has_more else None,
+        "has_more": has_more
+    }, response)
+
+@router.get("/{item_id}", response_model=ItemResponse)
+async def get_item_detail(
+    item_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Obtener un item; responde 304 si If-None-Match coincide"""
     
-    if not collection:
+    state = await get_item_state(db, item_id)
+    if state is None or state.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Carpeta no encontrada"
-        )
-    
-    # Verificar acceso
-    connection = db.query(Connection).filter(Connection.id == collection.connection_id).first()
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
+            detail="Item no encontrado"
         )
+    await resolve_collection(db, current_user.id, state.collection_id)
     
-    items = db.query(Item).filter(
-        Item.collection_id == collection_id,
-        Item.deleted_at == None
-    ).all()
+    etag = make_etag("item", item_id, state.change_seq, state.metadata_fetched_at)
+    last_modified = max(filter(None, (state.updated_at, state.metadata_fetched_at)), default=None)
+    not_modified = check_not_modified(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
     
-    return items
+    return await get_item(db, item_id)
 
 @router.post("/collection/{collection_id}", response_model=ItemResponse)
 async def create_item(
     collection_id: uuid.UUID,
     item_data: ItemCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    allow_duplicate: bool = False,
+    current_user: Principal = Depends(get_current_principal),
+    connection: ConnectionRef = Depends(get_collection_access),
+    db: AsyncSession = Depends(get_db)
 ):
     """Crear nuevo item en una carpeta"""
     
-    collection = db.query(Collection).filter(Collection.id == collection_id).first()
-    
-    if not collection:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Carpeta no encontrada"
-        )
-    
-    # Verificar acceso
-    connection = db.query(Connection).filter(Connection.id == collection.connection_id).first()
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
-        )
-    
-    # Extraer metadata
-    metadata = await extract_metadata(item_data.url)
-    
+    # Detectar duplicados por URL canónica (índice collection_id + url_hash)
+    item_url_hash = url_hash(item_data.url)
+    if not allow_duplicate:
+        duplicate = await find_duplicate_item(db, collection_id, item_url_hash)
+        if duplicate:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "El link ya está en la carpeta", "item_id": str(duplicate.id)}
+            )
+    
+    # La metadata se extrae en segundo plano (ver app/utils/enrichment.py)
     new_item = Item(
+        id=uuid.uuid4(),
         collection_id=collection_id,
         url=item_data.url,
-        title=item_data.title or metadata.get("title"),
-        description=item_data.description or metadata.get("description"),
-        thumbnail_url=metadata.get("thumbnail_url"),
-        platform=metadata.get("platform"),
-        created_by=current_user.id,
-        item_metadata=metadata 
+        url_hash=item_url_hash,
+        title=item_data.title,
+        description=item_data.description,
+        platform=detect_platform(item_data.url),
+        created_by=current_user.id
     )
     
     db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
+    enqueue_enrichment(db, new_item)
+    await db.commit()
+    await db.refresh(new_item)
+    enrichment_worker.notify()
+    
+    publish_change("item", "create", new_item.id, connection, collection_id=collection_id, version=new_item.version)
     
     return new_item
 
 @router.put("/{item_id}", response_model=ItemResponse)
-def update_item(
+async def update_item(
     item_id: uuid.UUID,
     item_data: ItemUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    access: tuple[Item, ConnectionRef] = Depends(get_item_access),
+    db: AsyncSession = Depends(get_db)
 ):
     """Actualizar item"""
     
-    item = db.query(Item).filter(Item.id == item_id).first()
-    
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Item no encontrado"
-        )
-    
-    # Verificar acceso
-    collection = db.query(Collection).filter(Collection.id == item.collection_id).first()
-    connection = db.query(Connection).filter(Connection.id == collection.connection_id).first()
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
-        )
+    # Item cargado y acceso verificado con un solo JOIN
+    item, connection = access
     
+    changed = []
     if item_data.title:
         item.title = item_data.title
+        changed.append("title")
     if item_data.description:
         item.description = item_data.description
+        changed.append("description")
     
     item.version += 1
-    db.commit()
-    db.refresh(item)
+    # Historial por campo para el merge de sync
+    record_changes(item, changed, ITEM_MERGE_FIELDS)
+    await db.commit()
+    await db.refresh(item)
+    
+    publish_change("item", "update", item.id, connection, collection_id=item.collection_id, version=item.version)
     
     return item
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(
+async def delete_item(
     item_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    access: tuple[Item, ConnectionRef] = Depends(get_item_access),
+    db: AsyncSession = Depends(get_db)
 ):
     """Eliminar item (soft delete)"""
     
-    item = db.query(Item).filter(Item.id == item_id).first()
+    # Item cargado y acceso verificado con un solo JOIN
+    item, connection = access
     
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Item no encontrado"
-        )
-    
-    # Verificar acceso
-    collection = db.query(Collection).filter(Collection.id == item.collection_id).first()
-    connection = db.query(Connection).filter(Connection.id == collection.connection_id).first()
-    if connection.user_id_1 != current_user.id and connection.user_id_2 != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso"
-        )
-    
-    from datetime import datetime
     item.deleted_at = datetime.utcnow()
     item.version += 1
-    db.commit()
\ No newline at end of file
+    await db.commit()
+    
+    publish_change("item", "delete", item.id, connection, collection_id=item.collection_id, version=item.version)
\ No newline at end of file
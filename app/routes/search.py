@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.deps import get_user_memberships, get_read_db
+from app.repositories import search_items
+from app.schemas import ItemPage
+from app.config import get_settings
+from app.utils.access import Memberships
+from app.utils.pagination import encode_score_cursor, decode_score_cursor
+from app.utils.serialization import ITEM_LAYOUT, encoded_response
+from app.utils.wire import MsgPackRoute
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=MsgPackRoute)
+settings = get_settings()
+
+@router.get("/items", response_model=ItemPage)
+async def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    platform: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(settings.SEARCH_PAGE_SIZE, ge=1, le=settings.SEARCH_MAX_PAGE_SIZE),
+    memberships: Memberships = Depends(get_user_memberships),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Buscar en título, descripción, URL y plataforma de los items de todas las
+    carpetas del usuario, ordenados por relevancia
+    """
+    
+    after = None
+    if cursor:
+        try:
+            after = decode_score_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido"
+            )
+    
+    rows = await search_items(db, list(memberships.collections), q, limit + 1, after, platform)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_score_cursor(last[-1], last[0])
+    
+    return encoded_response({
+        "items": ITEM_LAYOUT.to_dicts(rows),
+        "next_cursor": next_cursor,
+        "has_more": has_more
+    })
\ No newline at end of file
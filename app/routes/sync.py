@@ -1,66 +1,220 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, insert, or_, text, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.deps import get_current_user
-from app.models import User, Item, Collection, SyncLog
-from app.schemas import SyncDataRequest, SyncResponse
+from app.deps import get_current_principal, get_read_db
+from app.utils.principal import Principal
+from app.models import Item, Collection, Connection, SyncLog, SyncOperation
+from app.repositories import (
+    get_item, get_collection, find_duplicate_item,
+    get_items_by_ids, get_collections_by_ids, find_duplicate_items, delete_collection_items,
+    get_sync_operation, get_sync_operations
+)
+from app.schemas import SyncDataRequest, SyncResponse, SyncBatchRequest, SyncBatchResponse, SyncChangesResponse
+from app.config import get_settings
+from app.utils.pagination import encode_cursor, decode_change_cursor
+from app.utils.access import Memberships, get_memberships, reload_memberships, invalidate_connection_members
+from app.utils.broker import publish_change
+from app.utils.idempotency import replay_cache
+from app.utils.merge import ITEM_MERGE_FIELDS, COLLECTION_MERGE_FIELDS, merge_fields
+from app.utils.metadata import url_hash
+from app.utils.serialization import ITEM_SYNC_LAYOUT, COLLECTION_LAYOUT, EncodedResponse, encoded_response
+from app.utils.wire import MsgPackRoute
 from datetime import datetime
+from typing import Iterable, Tuple
 import uuid
 
-router = APIRouter(prefix="/sync", tags=["sync"])
+# JSON o MessagePack según Content-Type/Accept; los dicts que devuelven apply
+# y batch también salen por EncodedResponse
+router = APIRouter(prefix="/sync", tags=["sync"], route_class=MsgPackRoute, default_response_class=EncodedResponse)
+settings = get_settings()
+
+# Resultados que se guardan por op_id; un error (sin permiso, entidad que
+# todavía no llegó...) se vuelve a ejecutar en el reintento
+REPLAYABLE_STATUSES = ("success", "conflict")
+
+# Campos de texto que el cliente manda al crear cada tipo de entidad
+ITEM_CREATE_FIELDS = ("url", "title", "description")
+COLLECTION_CREATE_FIELDS = ("name", "icon")
 
 @router.post("/apply", response_model=SyncResponse)
-def apply_sync(
+async def apply_sync(
     sync_data: SyncDataRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Aplicar cambios offline al servidor
     Resuelve conflictos si existen
+    Con op_id, un reintento devuelve la respuesta guardada sin volver a aplicar nada
     """
     
+    replay = await find_replay(db, current_user.id, sync_data.op_id)
+    if replay is not None:
+        return replay
+    
     try:
+        memberships = await get_memberships(db, current_user.id)
         if sync_data.entity_type == "item":
-            return handle_item_sync(sync_data, current_user, db)
+            return await handle_item_sync(sync_data, current_user, memberships, db)
         elif sync_data.entity_type == "collection":
-            return handle_collection_sync(sync_data, current_user, db)
+            return await handle_collection_sync(sync_data, current_user, memberships, db)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Tipo de entidad no válido"
             )
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        # Un reintento concurrente con el mismo op_id se guardó primero
+        replay = await find_replay(db, current_user.id, sync_data.op_id)
+        if replay is not None:
+            return replay
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e.orig)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
 
-def handle_item_sync(sync_data: SyncDataRequest, current_user: User, db: Session) -> dict:
+async def find_replay(db: AsyncSession, user_id: uuid.UUID, op_id: uuid.UUID | None) -> dict | None:
+    """Respuesta guardada de una operación ya aplicada: primero el LRU, después la tabla"""
+    if op_id is None:
+        return None
+    response = replay_cache.get(user_id, op_id)
+    if response is None:
+        response = await get_sync_operation(db, user_id, op_id)
+        if response is not None:
+            replay_cache.put(user_id, op_id, response)
+    return response
+
+async def find_replays(db: AsyncSession, user_id: uuid.UUID, op_ids: set) -> dict:
+    """find_replay para varias operaciones, con una sola query para las que no están en el LRU"""
+    replays = {}
+    missing = []
+    for op_id in op_ids:
+        response = replay_cache.get(user_id, op_id)
+        if response is None:
+            missing.append(op_id)
+        else:
+            replays[op_id] = response
+    for op_id, response in (await get_sync_operations(db, user_id, missing)).items():
+        replay_cache.put(user_id, op_id, response)
+        replays[op_id] = response
+    return replays
+
+async def commit_result(db: AsyncSession, user_id: uuid.UUID, op_id: uuid.UUID | None, response: dict) -> dict:
+    """
+    Guardar la respuesta junto con los cambios, en la misma transacción
+    Si el mismo op_id ya se guardó, el índice único hace fallar el commit y
+    los cambios se descartan
+    """
+    if op_id is not None:
+        db.add(SyncOperation(user_id=user_id, op_id=op_id, response=response))
+    await db.commit()
+    if op_id is not None:
+        replay_cache.put(user_id, op_id, response)
+    return response
+
+def sync_result(server_data: dict, concurrent: bool, conflicts: list) -> dict:
+    """
+    Resultado de una operación aplicada (o sin nada que aplicar)
+    Con cambios concurrentes en otros campos el merge los resuelve solo
+    (resolved_conflict); solo los campos en `conflicts` quedan para el cliente
+    """
+    if conflicts:
+        return {
+            "status": "conflict",
+            "resolved_conflict": True,
+            "server_data": server_data,
+            "conflicts": conflicts,
+            "message": f"Conflicto en: {', '.join(conflicts)}"
+        }
+    return {
+        "status": "success",
+        "resolved_conflict": concurrent,
+        "server_data": server_data
+    }
+
+def applied_data(data: dict, conflicts: list) -> dict:
+    """
+    Datos de la operación para el sync log: sin los campos en conflicto (no
+    aplicados) ni los que el cliente no editó (iguales a su valor en "base")
+    """
+    base = data.get("base") or {}
+    if not conflicts and not base:
+        return data
+    skipped = set(conflicts or ())
+    return {
+        key: value for key, value in data.items()
+        if key != "base" and key not in skipped and not (key in base and base[key] == value)
+    }
+
+async def handle_item_sync(sync_data: SyncDataRequest, current_user: Principal, memberships: Memberships, db: AsyncSession) -> dict:
     """Manejar sincronización de items"""
     
-    existing = db.query(Item).filter(Item.id == sync_data.entity_id).first()
+    existing = await get_item(db, sync_data.entity_id)
+    
+    # Verificar acceso a la carpeta (del item existente o la indicada al crear)
+    collection_id = existing.collection_id if existing else parse_uuid(sync_data.data.get("collection_id"))
+    connection = memberships.connection_for_collection(collection_id)
+    if connection is None and collection_id is not None:
+        # Carpeta que no está en el cache (creada desde otro worker): se recarga una vez
+        memberships = await reload_memberships(db, current_user.id)
+        connection = memberships.connection_for_collection(collection_id)
+    if connection is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso"
+        )
+    
+    invalid = invalid_data(Item, sync_data)
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=invalid
+        )
     
-    # Detectar conflicto
+    # Cambios concurrentes desde la versión que vio el cliente; en un update
+    # solo son conflicto los campos editados en ambos lados (merge por campo)
     conflict = False
     if existing and existing.version > sync_data.data.get("version", 0):
         conflict = True
+    conflicts = []
     
     if sync_data.operation == "create":
         if existing:
-            return {
+            return await commit_result(db, current_user.id, sync_data.op_id, {
                 "status": "conflict",
                 "resolved_conflict": True,
                 "server_data": serialize_item(existing),
                 "message": "Item ya existe en el servidor"
-            }
+            })
+        
+        url = sync_data.data.get("url")
+        item_url_hash = url_hash(url) if url else None
+        duplicate = await find_duplicate_item(db, collection_id, item_url_hash) if item_url_hash else None
+        if duplicate:
+            return await commit_result(db, current_user.id, sync_data.op_id, {
+                "status": "conflict",
+                "resolved_conflict": True,
+                "server_data": serialize_item(duplicate),
+                "message": "Link duplicado en la carpeta"
+            })
         
         new_item = Item(
             id=sync_data.entity_id,
-            url=sync_data.data.get("url"),
+            url=url,
+            url_hash=item_url_hash,
             title=sync_data.data.get("title"),
             description=sync_data.data.get("description"),
-            collection_id=sync_data.data.get("collection_id"),
+            collection_id=collection_id,
             created_by=current_user.id,
             version=0
         )
@@ -73,17 +227,11 @@ def handle_item_sync(sync_data: SyncDataRequest, current_user: User, db: Session
                 detail="Item no encontrado"
             )
         
-        if conflict:
-            return {
-                "status": "conflict",
-                "resolved_conflict": True,
-                "server_data": serialize_item(existing),
-                "message": "Conflicto: versión del servidor es más nueva"
-            }
-        
-        existing.title = sync_data.data.get("title", existing.title)
-        existing.description = sync_data.data.get("description", existing.description)
-        existing.version += 1
+        merge = merge_fields(existing, sync_data.data, ITEM_MERGE_FIELDS)
+        conflicts = merge.conflicts
+        if not merge.changed:
+            # Nada que aplicar: sin versión nueva, sin sync log ni evento
+            return await commit_result(db, current_user.id, sync_data.op_id, sync_result(serialize_item(existing), conflict, conflicts))
     
     elif sync_data.operation == "delete":
         if not existing:
@@ -95,111 +243,550 @@ def handle_item_sync(sync_data: SyncDataRequest, current_user: User, db: Session
         existing.deleted_at = datetime.utcnow()
         existing.version += 1
     
-    db.commit()
-    
-    # Registrar en sync log
+    # Registrar en sync log, en la misma transacción que el cambio
     sync_log = SyncLog(
         user_id=current_user.id,
         entity_type=sync_data.entity_type,
         entity_id=sync_data.entity_id,
         operation=sync_data.operation,
-        data=sync_data.data,
+        data=applied_data(sync_data.data, conflicts),
         timestamp=sync_data.timestamp,
         synced=True
     )
     db.add(sync_log)
-    db.commit()
     
-    if existing:
-        db.refresh(existing)
-        return {
-            "status": "success",
-            "resolved_conflict": conflict,
-            "server_data": serialize_item(existing)
-        }
-    else:
-        db.refresh(new_item)
-        return {
-            "status": "success",
-            "resolved_conflict": False,
-            "server_data": serialize_item(new_item)
-        }
+    entity = existing if existing else new_item
+    await db.flush()
+    await db.refresh(entity)
+    response = await commit_result(db, current_user.id, sync_data.op_id, sync_result(serialize_item(entity), conflict, conflicts))
+    
+    publish_change("item", sync_data.operation, entity.id, connection, collection_id=collection_id, version=entity.version)
+    return response
 
-def handle_collection_sync(sync_data: SyncDataRequest, current_user: User, db: Session) -> dict:
+async def handle_collection_sync(sync_data: SyncDataRequest, current_user: Principal, memberships: Memberships, db: AsyncSession) -> dict:
     """Manejar sincronización de collections"""
     
-    existing = db.query(Collection).filter(Collection.id == sync_data.entity_id).first()
+    existing = await get_collection(db, sync_data.entity_id)
+    
+    # Verificar acceso a la conexión (de la carpeta existente o la indicada al crear)
+    connection_id = existing.connection_id if existing else parse_uuid(sync_data.data.get("connection_id"))
+    connection = memberships.connections.get(connection_id)
+    if connection is None and connection_id is not None:
+        memberships = await reload_memberships(db, current_user.id)
+        connection = memberships.connections.get(connection_id)
+    if connection is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permiso"
+        )
+    
+    invalid = invalid_data(Collection, sync_data)
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=invalid
+        )
     
     conflict = False
     if existing and existing.version > sync_data.data.get("version", 0):
         conflict = True
+    conflicts = []
     
     if sync_data.operation == "create":
         if existing:
-            return {
+            return await commit_result(db, current_user.id, sync_data.op_id, {
                 "status": "conflict",
                 "resolved_conflict": True,
                 "server_data": serialize_collection(existing),
                 "message": "Collection ya existe"
-            }
+            })
         
         new_collection = Collection(
             id=sync_data.entity_id,
             name=sync_data.data.get("name"),
             icon=sync_data.data.get("icon"),
-            connection_id=sync_data.data.get("connection_id"),
+            connection_id=connection_id,
             created_by=current_user.id,
             version=0
         )
         db.add(new_collection)
     
-    elif sync_data.operation == "update":
-        if not existing:
+    elif sync_data.operation in ("update", "delete"):
+        if not existing or existing.deleted_at is not None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Collection no encontrada"
             )
         
-        if conflict:
-            return {
-                "status": "conflict",
-                "resolved_conflict": True,
-                "server_data": serialize_collection(existing),
-                "message": "Conflicto: versión del servidor es más nueva"
-            }
-        
-        existing.name = sync_data.data.get("name", existing.name)
-        existing.icon = sync_data.data.get("icon", existing.icon)
-        existing.version += 1
-    
-    db.commit()
+        if sync_data.operation == "update":
+            merge = merge_fields(existing, sync_data.data, COLLECTION_MERGE_FIELDS)
+            conflicts = merge.conflicts
+            if not merge.changed:
+                return await commit_result(db, current_user.id, sync_data.op_id, sync_result(serialize_collection(existing), conflict, conflicts))
+        else:
+            # Soft delete: la carpeta y sus items quedan como tombstones en el feed
+            existing.deleted_at = datetime.utcnow()
+            existing.version += 1
+            await delete_collection_items(db, [existing.id], existing.deleted_at)
     
     sync_log = SyncLog(
         user_id=current_user.id,
         entity_type=sync_data.entity_type,
         entity_id=sync_data.entity_id,
         operation=sync_data.operation,
-        data=sync_data.data,
+        data=applied_data(sync_data.data, conflicts),
         timestamp=sync_data.timestamp,
         synced=True
     )
     db.add(sync_log)
-    db.commit()
     
-    if existing:
-        db.refresh(existing)
+    entity = existing if existing else new_collection
+    await db.flush()
+    await db.refresh(entity)
+    response = await commit_result(db, current_user.id, sync_data.op_id, sync_result(serialize_collection(entity), conflict, conflicts))
+    
+    if sync_data.operation in ("create", "delete"):
+        invalidate_connection_members(connection)
+    publish_change("collection", sync_data.operation, entity.id, connection, version=entity.version)
+    return response
+
+@router.post("/batch", response_model=SyncBatchResponse)
+async def apply_sync_batch(
+    batch: SyncBatchRequest,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Aplicar un lote ordenado de cambios offline en una sola transacción
+    Carga todas las entidades referenciadas de una vez y devuelve un resultado por operación
+    Las operaciones con op_id ya aplicadas devuelven su resultado guardado
+    """
+    
+    if len(batch.operations) > settings.SYNC_BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.SYNC_BATCH_MAX_OPERATIONS} operaciones por lote"
+        )
+    
+    # Reintentos: una sola query (o ninguna, si están en el LRU) para todo el lote
+    replays = await find_replays(db, current_user.id, {op.op_id for op in batch.operations if op.op_id})
+    
+    item_ids = set()
+    collection_ids = set()
+    connection_ids = set()
+    url_keys = set()
+    for op in batch.operations:
+        if op.op_id in replays:
+            continue
+        if op.entity_type == "item":
+            item_ids.add(op.entity_id)
+            parent_id = parse_uuid(op.data.get("collection_id"))
+            if op.operation == "create" and parent_id:
+                collection_ids.add(parent_id)
+                if op.data.get("url") and isinstance(op.data["url"], str):
+                    url_keys.add((parent_id, url_hash(op.data["url"])))
+        elif op.entity_type == "collection":
+            collection_ids.add(op.entity_id)
+            if op.operation == "create" and parse_uuid(op.data.get("connection_id")):
+                connection_ids.add(parse_uuid(op.data["connection_id"]))
+    
+    # Permisos cacheados + una query por tipo de entidad, sin importar el tamaño del lote
+    memberships = await get_memberships(db, current_user.id)
+    items = await get_items_by_ids(db, item_ids)
+    collections = await get_collections_by_ids(db, collection_ids)
+    duplicates = await find_duplicate_items(db, url_keys)
+    
+    # Entidades que existen pero no están en el cache (creadas o compartidas
+    # desde otro worker): se recargan las membresías una vez antes de negar acceso
+    if (
+        any(item.collection_id not in memberships.collections for item in items.values())
+        or collections.keys() - memberships.collections.keys()
+        or connection_ids - memberships.connections.keys()
+    ):
+        memberships = await reload_memberships(db, current_user.id)
+    accessible = dict(memberships.collections)  # se amplía con las carpetas creadas en el lote
+    
+    now = datetime.utcnow()
+    results = []
+    logs = []
+    changes = []
+    operations = []
+    
+    for op in batch.operations:
+        if op.op_id in replays:
+            results.append(replays[op.op_id])
+            continue
+        
+        if op.entity_type == "item":
+            result, applied = apply_item_operation(op, items, collections, duplicates, accessible, current_user, db, now)
+        elif op.entity_type == "collection":
+            result, applied = apply_collection_operation(op, collections, memberships, accessible, current_user, db, now)
+        else:
+            result, applied = {"status": "error", "message": "Tipo de entidad no válido"}, False
+        
+        if applied:
+            changes.append((op, result["server_data"]))
+            logs.append({
+                "user_id": current_user.id,
+                "entity_type": op.entity_type,
+                "entity_id": op.entity_id,
+                "operation": op.operation,
+                "data": applied_data(op.data, result.get("conflicts")),
+                "timestamp": op.timestamp,
+                "synced": True
+            })
+        if op.op_id is not None and result["status"] in REPLAYABLE_STATUSES:
+            # Un op_id repetido dentro del mismo lote también es un reintento
+            replays[op.op_id] = result
+            operations.append({"user_id": current_user.id, "op_id": op.op_id, "response": result})
+        results.append(result)
+    
+    deleted_collections = [
+        op.entity_id for op, _ in changes if op.entity_type == "collection" and op.operation == "delete"
+    ]
+    try:
+        # Items de las carpetas borradas: un solo UPDATE para todo el lote
+        await delete_collection_items(db, deleted_collections, now)
+        # Un solo INSERT multi-fila para todo el sync log, y otro para los resultados
+        if logs:
+            await db.execute(insert(SyncLog), logs)
+        if operations:
+            await db.execute(insert(SyncOperation), operations)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # El mismo lote reintentado en paralelo ya se guardó: devolver sus resultados
+        # Las operaciones con error no se guardan ni cambiaron nada: vale el resultado de aquí
+        op_ids = [op.op_id for op in batch.operations]
+        if all(op_ids):
+            stored = await find_replays(db, current_user.id, set(op_ids))
+            replayed = [
+                stored.get(op_id, result if result["status"] == "error" else None)
+                for op_id, result in zip(op_ids, results)
+            ]
+            if all(replayed):
+                return {"results": replayed}
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Lote inválido: {e.orig}"
+        )
+    finally:
+        # Carpetas creadas o borradas en el lote: invalidar permisos cacheados de esas conexiones
+        for collection_id in (accessible.keys() - memberships.collections.keys()) | set(deleted_collections):
+            invalidate_connection_members(memberships.connections[accessible[collection_id]])
+    
+    for operation in operations:
+        replay_cache.put(current_user.id, operation["op_id"], operation["response"])
+    
+    for op, data in changes:
+        if op.entity_type == "item":
+            collection_id = uuid.UUID(data["collection_id"])
+            connection = memberships.connections[accessible[collection_id]]
+            publish_change("item", op.operation, op.entity_id, connection, collection_id=collection_id, version=data["version"])
+        else:
+            connection = memberships.connections[accessible[op.entity_id]]
+            publish_change("collection", op.operation, op.entity_id, connection, version=data["version"])
+    
+    return {"results": results}
+
+def apply_item_operation(
+    op: SyncDataRequest,
+    items: dict,
+    collections: dict,
+    duplicates: dict,
+    accessible: dict,
+    current_user: Principal,
+    db: AsyncSession,
+    now: datetime
+) -> Tuple[dict, bool]:
+    """
+    Aplicar una operación de item sobre las entidades ya cargadas (sin I/O)
+    Devuelve (resultado, si se modificó la entidad)
+    """
+    
+    existing = items.get(op.entity_id)
+    
+    collection_id = existing.collection_id if existing else parse_uuid(op.data.get("collection_id"))
+    if collection_id is None and op.operation == "create":
+        return {"status": "error", "message": "collection_id no válido"}, False
+    if collection_id not in accessible:
+        return {"status": "error", "message": "No tienes permiso"}, False
+    parent = collections.get(collection_id)
+    if parent is not None and parent.deleted_at is not None:
+        return {"status": "error", "message": "Carpeta no encontrada"}, False
+    
+    # Una operación mal formada falla sola, antes de tocar la sesión
+    invalid = invalid_data(Item, op)
+    if invalid:
+        return {"status": "error", "message": invalid}, False
+    
+    conflict = False
+    if existing and existing.version > op.data.get("version", 0):
+        conflict = True
+    
+    if op.operation == "create":
+        if existing:
+            return {
+                "status": "conflict",
+                "resolved_conflict": True,
+                "server_data": serialize_item(existing),
+                "message": "Item ya existe en el servidor"
+            }, False
+        
+        if collection_id not in collections:
+            return {"status": "error", "message": "Carpeta no encontrada"}, False
+        
+        url = op.data.get("url")
+        item_url_hash = url_hash(url) if url else None
+        duplicate = duplicates.get((collection_id, item_url_hash))
+        if duplicate:
+            return {
+                "status": "conflict",
+                "resolved_conflict": True,
+                "server_data": serialize_item(duplicate),
+                "message": "Link duplicado en la carpeta"
+            }, False
+        
+        new_item = Item(
+            id=op.entity_id,
+            url=url,
+            url_hash=item_url_hash,
+            title=op.data.get("title"),
+            description=op.data.get("description"),
+            collection_id=collection_id,
+            created_by=current_user.id,
+            created_at=now,
+            updated_at=now,
+            version=0
+        )
+        db.add(new_item)
+        items[new_item.id] = new_item
+        if item_url_hash:
+            duplicates[(collection_id, item_url_hash)] = new_item
         return {
             "status": "success",
-            "resolved_conflict": conflict,
-            "server_data": serialize_collection(existing)
-        }
+            "resolved_conflict": False,
+            "server_data": serialize_item(new_item)
+        }, True
+    
+    if op.operation not in ("update", "delete"):
+        return {"status": "error", "message": "Operación no válida"}, False
+    
+    if not existing:
+        return {"status": "error", "message": "Item no encontrado"}, False
+    
+    conflicts = []
+    if op.operation == "update":
+        merge = merge_fields(existing, op.data, ITEM_MERGE_FIELDS)
+        conflicts = merge.conflicts
+        if not merge.changed:
+            return sync_result(serialize_item(existing), conflict, conflicts), False
     else:
-        db.refresh(new_collection)
+        existing.deleted_at = now
+        existing.version += 1
+    
+    existing.updated_at = now
+    return sync_result(serialize_item(existing), conflict, conflicts), True
+
+def apply_collection_operation(
+    op: SyncDataRequest,
+    collections: dict,
+    memberships: Memberships,
+    accessible: dict,
+    current_user: Principal,
+    db: AsyncSession,
+    now: datetime
+) -> Tuple[dict, bool]:
+    """
+    Aplicar una operación de collection sobre las entidades ya cargadas (sin I/O)
+    Devuelve (resultado, si se modificó la entidad)
+    """
+    
+    existing = collections.get(op.entity_id)
+    
+    connection_id = existing.connection_id if existing else parse_uuid(op.data.get("connection_id"))
+    if connection_id is None and op.operation == "create":
+        return {"status": "error", "message": "connection_id no válido"}, False
+    if connection_id not in memberships.connections:
+        return {"status": "error", "message": "No tienes permiso"}, False
+    
+    invalid = invalid_data(Collection, op)
+    if invalid:
+        return {"status": "error", "message": invalid}, False
+    
+    if op.operation == "create":
+        if existing:
+            return {
+                "status": "conflict",
+                "resolved_conflict": True,
+                "server_data": serialize_collection(existing),
+                "message": "Collection ya existe"
+            }, False
+        
+        new_collection = Collection(
+            id=op.entity_id,
+            name=op.data.get("name"),
+            icon=op.data.get("icon"),
+            connection_id=connection_id,
+            created_by=current_user.id,
+            created_at=now,
+            updated_at=now,
+            version=0
+        )
+        db.add(new_collection)
+        collections[new_collection.id] = new_collection
+        accessible[new_collection.id] = connection_id
         return {
             "status": "success",
             "resolved_conflict": False,
             "server_data": serialize_collection(new_collection)
-        }
+        }, True
+    
+    if op.operation not in ("update", "delete"):
+        return {"status": "error", "message": "Operación no válida"}, False
+    
+    if not existing or existing.deleted_at is not None:
+        return {"status": "error", "message": "Collection no encontrada"}, False
+    
+    concurrent = existing.version > op.data.get("version", 0)
+    if op.operation == "delete":
+        # Los items se marcan borrados con un solo UPDATE al final del lote
+        existing.deleted_at = now
+        existing.version += 1
+        existing.updated_at = now
+        return sync_result(serialize_collection(existing), concurrent, []), True
+    
+    merge = merge_fields(existing, op.data, COLLECTION_MERGE_FIELDS)
+    if not merge.changed:
+        return sync_result(serialize_collection(existing), concurrent, merge.conflicts), False
+    
+    existing.updated_at = now
+    return sync_result(serialize_collection(existing), concurrent, merge.conflicts), True
+
+def invalid_data(model, op: SyncDataRequest) -> str | None:
+    """
+    Motivo por el que los datos de la operación no entran en la tabla, o None
+    Al crear se exigen las columnas NOT NULL; en un update solo se revisan los
+    campos que se van a aplicar
+    """
+    version = op.data.get("version", 0)
+    if not isinstance(version, int) or isinstance(version, bool):
+        return "Versión no válida"
+    if not isinstance(op.data.get("base", {}), dict):
+        return "Base no válida"
+    
+    creating = op.operation == "create"
+    if creating:
+        fields: Iterable[str] = ITEM_CREATE_FIELDS if model is Item else COLLECTION_CREATE_FIELDS
+    elif op.operation == "update":
+        fields = ITEM_MERGE_FIELDS if model is Item else COLLECTION_MERGE_FIELDS
+    else:
+        return None
+    for field in fields:
+        column = model.__table__.c[field]
+        if field not in op.data and not (creating and not column.nullable):
+            continue
+        value = op.data.get(field)
+        if value is None and column.nullable:
+            continue
+        if not isinstance(value, str) or (not column.nullable and not value.strip()):
+            return f"Campo {field} vacío o no válido"
+        if column.type.length and len(value) > column.type.length:
+            return f"Campo {field} supera {column.type.length} caracteres"
+    return None
+
+def parse_uuid(value) -> uuid.UUID | None:
+    if isinstance(value, uuid.UUID) or value is None:
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+@router.get("/changes", response_model=SyncChangesResponse)
+async def get_changes(
+    cursor: str | None = None,
+    limit: int = Query(settings.SYNC_CHANGES_PAGE_SIZE, ge=1, le=settings.SYNC_CHANGES_MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Feed incremental de cambios visibles para el usuario
+    Paginado por (change_txid, change_seq) del servidor, no por el timestamp del cliente
+    
+    Garantía: cada escritura confirmada se entrega en alguna página posterior
+    al cursor, también leyendo de la réplica. Solo se devuelven filas de
+    transacciones anteriores al xmin del snapshot (todas terminadas); una
+    transacción todavía abierta, o no replicada, queda por encima del cursor
+    y llega en un pull siguiente. Una fila puede llegar más de una vez (cada
+    escritura la mueve al final del feed): el cliente aplica por versión
+    """
+    
+    after = (0, 0)
+    if cursor:
+        try:
+            after = decode_change_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido"
+            )
+    
+    # Marca de visibilidad: las transacciones con id menor ya terminaron y sus
+    # filas son visibles para las queries siguientes (cada una con su snapshot)
+    watermark = await db.scalar(select(text("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")))
+    
+    # Aquí no se usa el cache de permisos: con membresías desactualizadas el
+    # cursor avanzaría sobre cambios que el cliente nunca recibió
+    is_member = or_(
+        Connection.user_id_1 == current_user.id,
+        Connection.user_id_2 == current_user.id
+    )
+    
+    # Ambas tablas comparten el mismo orden: basta pedir limit + 1 de cada
+    # una y quedarse con los `limit` cambios más antiguos de la unión
+    # Filas Core con (change_txid, change_seq) al final (no se serializan)
+    collections_result = await db.execute(
+        COLLECTION_LAYOUT.select(Collection.change_txid, Collection.change_seq)
+        .join(Connection, Connection.id == Collection.connection_id)
+        .where(
+            is_member,
+            tuple_(Collection.change_txid, Collection.change_seq) > after,
+            Collection.change_txid < watermark
+        )
+        .order_by(Collection.change_txid, Collection.change_seq)
+        .limit(limit + 1)
+    )
+    items_result = await db.execute(
+        ITEM_SYNC_LAYOUT.select(Item.change_txid, Item.change_seq)
+        .join(Collection, Collection.id == Item.collection_id)
+        .join(Connection, Connection.id == Collection.connection_id)
+        .where(
+            is_member,
+            tuple_(Item.change_txid, Item.change_seq) > after,
+            Item.change_txid < watermark
+        )
+        .order_by(Item.change_txid, Item.change_seq)
+        .limit(limit + 1)
+    )
+    
+    changes = sorted(
+        [(tuple(row[-2:]), "collection", row) for row in collections_result]
+        + [(tuple(row[-2:]), "item", row) for row in items_result],
+        key=lambda change: change[0]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    
+    if changes:
+        after = changes[-1][0]
+    
+    return encoded_response({
+        "collections": COLLECTION_LAYOUT.to_dicts(row for _, kind, row in changes if kind == "collection"),
+        "items": ITEM_SYNC_LAYOUT.to_dicts(row for _, kind, row in changes if kind == "item"),
+        "next_cursor": encode_cursor(list(after)),
+        "has_more": has_more
+    })
 
 def serialize_item(item: Item) -> dict:
     return {
@@ -226,5 +813,6 @@ def serialize_collection(collection: Collection) -> dict:
         "created_by": str(collection.created_by),
         "version": collection.version,
         "created_at": collection.created_at.isoformat(),
-        "updated_at": collection.updated_at.isoformat()
+        "updated_at": collection.updated_at.isoformat(),
+        "deleted_at": collection.deleted_at.isoformat() if collection.deleted_at else None
     }
\ No newline at end of file
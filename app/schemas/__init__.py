@@ -1,13 +1,16 @@
-from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
+from app.schemas.user import UserCreate, UserResponse, UserLogin, Token, RefreshRequest
 from app.schemas.connection import ConnectionCreate, ConnectionResponse
-from app.schemas.collection import CollectionCreate, CollectionResponse, CollectionUpdate
-from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate
-from app.schemas.sync import SyncDataRequest, SyncResponse
+from app.schemas.collection import CollectionCreate, CollectionResponse, CollectionUpdate, CollectionPage
+from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate, ItemPage
+from app.schemas.import_job import ImportJobResponse
+from app.schemas.sync import SyncDataRequest, SyncResponse, SyncBatchRequest, SyncBatchResponse, SyncChangesResponse
 
 __all__ = [
-    "UserCreate", "UserResponse", "UserLogin", "Token",
+    "UserCreate", "UserResponse", "UserLogin", "Token", "RefreshRequest",
     "ConnectionCreate", "ConnectionResponse",
-    "CollectionCreate", "CollectionResponse", "CollectionUpdate",
-    "ItemCreate", "ItemResponse", "ItemUpdate",
-    "SyncDataRequest", "SyncResponse"
+    "CollectionCreate", "CollectionResponse", "CollectionUpdate", "CollectionPage",
+    "ItemCreate", "ItemResponse", "ItemUpdate", "ItemPage",
+    "SyncDataRequest", "SyncResponse", "SyncBatchRequest", "SyncBatchResponse",
+    "SyncChangesResponse",
+    "ImportJobResponse"
 ]
\ No newline at end of file
@@ -19,6 +19,12 @@ class CollectionResponse(BaseModel):
     version: int
     created_at: datetime
     updated_at: datetime
+    deleted_at: datetime | None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CollectionPage(BaseModel):
+    collections: list[CollectionResponse]
+    next_cursor: str | None  # None cuando no hay más páginas
+    has_more: bool
\ No newline at end of file
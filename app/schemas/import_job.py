@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+
+class ImportJobResponse(BaseModel):
+    id: UUID
+    collection_id: UUID
+    format: str  # html, json, csv
+    filename: str | None
+    status: str  # pending, running, done, failed
+    total: int
+    inserted: int
+    duplicates: int
+    invalid: int
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None
+    enrichment: dict[str, int] | None = None  # pending/running/done/failed de los items importados
+    
+    class Config:
+        from_attributes = True
\ No newline at end of file
@@ -26,6 +26,12 @@ class ItemResponse(BaseModel):
     updated_at: datetime
     deleted_at: datetime | None
     item_metadata: Optional[dict] = None  # ← Cambié de 'metadata' a 'item_metadata'
+    enrichment_status: str | None = None  # pending, done, failed
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ItemPage(BaseModel):
+    items: list[ItemResponse]
+    next_cursor: str | None  # None cuando no hay más páginas
+    has_more: bool
\ No newline at end of file
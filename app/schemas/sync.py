@@ -7,10 +7,24 @@ class SyncDataRequest(BaseModel):
     entity_id: UUID
     operation: str  # create, update, delete
     timestamp: int  # client timestamp en ms
-    data: dict[str, Any]
+    data: dict[str, Any]  # en update: "version" vista y los campos editados, o todos más "base" con los valores vistos
+    op_id: UUID | None = None  # id de la operación generado por el cliente; un reintento repite el mismo
 
 class SyncResponse(BaseModel):
-    status: str  # success, conflict
+    status: str  # success, conflict, error
     resolved_conflict: bool = False
     server_data: dict[str, Any] | None = None
-    message: str | None = None
\ No newline at end of file
+    message: str | None = None
+    conflicts: list[str] | None = None  # campos editados en ambos lados con valores distintos, no aplicados
+
+class SyncBatchRequest(BaseModel):
+    operations: list[SyncDataRequest]  # en el orden en que se hicieron offline
+
+class SyncBatchResponse(BaseModel):
+    results: list[SyncResponse]  # un resultado por operación, mismo orden
+
+class SyncChangesResponse(BaseModel):
+    collections: list[dict[str, Any]]
+    items: list[dict[str, Any]]  # incluye tombstones (deleted_at != null)
+    next_cursor: str  # opaco; solo avanza sobre transacciones ya terminadas (ver get_changes)
+    has_more: bool
\ No newline at end of file
@@ -0,0 +1,161 @@
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models import Connection, Collection, Item
+
+settings = get_settings()
+
+class ConnectionRef(NamedTuple):
+    """Lo mínimo de una conexión para autorizar y publicar eventos"""
+    id: uuid.UUID
+    user_id_1: uuid.UUID
+    user_id_2: uuid.UUID
+
+class Memberships:
+    """Conexiones y carpetas a las que un usuario tiene acceso"""
+
+    def __init__(self, connections: Dict[uuid.UUID, ConnectionRef], collections: Dict[uuid.UUID, uuid.UUID]):
+        self.connections = connections
+        self.collections = collections  # collection_id -> connection_id
+
+    def connection_for_collection(self, collection_id) -> Optional[ConnectionRef]:
+        connection_id = self.collections.get(collection_id)
+        if connection_id is None:
+            return None
+        return self.connections[connection_id]
+
+class MembershipCache:
+    """
+    Cache por worker (LRU + TTL) de las membresías de cada usuario
+    Se invalida al crear/aceptar conexiones y al crear/eliminar carpetas;
+    en los demás workers el dato puede quedar viejo como máximo el TTL
+    """
+
+    def __init__(self, ttl: int, max_users: int):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries: "OrderedDict[uuid.UUID, Tuple[float, Memberships]]" = OrderedDict()
+
+    def get(self, user_id: uuid.UUID) -> Optional[Memberships]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, memberships = entry
+        if expires < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return memberships
+
+    def put(self, user_id: uuid.UUID, memberships: Memberships) -> None:
+        self._entries[user_id] = (time.monotonic() + self.ttl, memberships)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids: uuid.UUID) -> None:
+        for user_id in user_ids:
+            self._entries.pop(user_id, None)
+
+membership_cache = MembershipCache(
+    ttl=settings.ACCESS_CACHE_TTL_SECONDS,
+    max_users=settings.ACCESS_CACHE_MAX_USERS
+)
+
+def invalidate_connection_members(connection) -> None:
+    membership_cache.invalidate(connection.user_id_1, connection.user_id_2)
+
+async def get_memberships(db: AsyncSession, user_id: uuid.UUID) -> Memberships:
+    """
+    Conexiones y carpetas activas del usuario, con una sola query si no están en cache
+    """
+    memberships = membership_cache.get(user_id)
+    if memberships is not None:
+        return memberships
+
+    result = await db.execute(
+        select(Connection.id, Connection.user_id_1, Connection.user_id_2, Collection.id)
+        .outerjoin(Collection, and_(Collection.connection_id == Connection.id, Collection.deleted_at.is_(None)))
+        .where(or_(Connection.user_id_1 == user_id, Connection.user_id_2 == user_id))
+    )
+    connections = {}
+    collections = {}
+    for connection_id, user_id_1, user_id_2, collection_id in result:
+        connections[connection_id] = ConnectionRef(connection_id, user_id_1, user_id_2)
+        if collection_id is not None:
+            collections[collection_id] = connection_id
+
+    memberships = Memberships(connections, collections)
+    membership_cache.put(user_id, memberships)
+    return memberships
+
+async def reload_memberships(db: AsyncSession, user_id: uuid.UUID) -> Memberships:
+    """
+    Membresías leídas de nuevo de la base, para cuando una entidad que existe
+    no está en el cache: pudo crearse o compartirse desde otro worker dentro del TTL
+    """
+    membership_cache.invalidate(user_id)
+    return await get_memberships(db, user_id)
+
+def forbidden(detail: str = "No tienes permiso") -> HTTPException:
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+def not_found(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+async def resolve_connection(db: AsyncSession, user_id: uuid.UUID, connection_id: uuid.UUID) -> ConnectionRef:
+    """Conexión del usuario, o 404/403"""
+    memberships = await get_memberships(db, user_id)
+    connection = memberships.connections.get(connection_id)
+    if connection is not None:
+        return connection
+
+    # Solo en el caso de error se distingue "no existe" de "no es tuya"
+    exists = await db.scalar(select(Connection.id).where(Connection.id == connection_id))
+    if exists is None:
+        raise not_found("Conexión no encontrada")
+    connection = (await reload_memberships(db, user_id)).connections.get(connection_id)
+    if connection is None:
+        raise forbidden()
+    return connection
+
+async def resolve_collection(db: AsyncSession, user_id: uuid.UUID, collection_id: uuid.UUID) -> ConnectionRef:
+    """Conexión de una carpeta accesible para el usuario, o 404/403"""
+    memberships = await get_memberships(db, user_id)
+    connection = memberships.connection_for_collection(collection_id)
+    if connection is not None:
+        return connection
+
+    exists = await db.scalar(
+        select(Collection.id).where(Collection.id == collection_id, Collection.deleted_at.is_(None))
+    )
+    if exists is None:
+        raise not_found("Carpeta no encontrada")
+    connection = (await reload_memberships(db, user_id)).connection_for_collection(collection_id)
+    if connection is None:
+        raise forbidden()
+    return connection
+
+async def resolve_item(db: AsyncSession, user_id: uuid.UUID, item_id: uuid.UUID) -> Tuple[Item, ConnectionRef]:
+    """Item y su conexión con un solo JOIN, o 404/403"""
+    result = await db.execute(
+        select(Item, Connection.id, Connection.user_id_1, Connection.user_id_2)
+        .join(Collection, Collection.id == Item.collection_id)
+        .join(Connection, Connection.id == Collection.connection_id)
+        .where(Item.id == item_id)
+    )
+    row = result.first()
+    if row is None:
+        raise not_found("Item no encontrado")
+
+    item, connection_id, user_id_1, user_id_2 = row
+    if user_id not in (user_id_1, user_id_2):
+        raise forbidden()
+    return item, ConnectionRef(connection_id, user_id_1, user_id_2)
\ No newline at end of file
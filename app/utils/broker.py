@@ -0,0 +1,293 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+import uuid
+
+from app.config import get_settings
+from app.database import sticky_reads
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """
+    Cola acotada de eventos para un cliente conectado
+    Si el cliente no consume a tiempo, se descartan los eventos pendientes y
+    se le envía un único evento "resync" para que vuelva a leer /sync/changes
+    """
+
+    def __init__(self, user_id: uuid.UUID, max_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self) -> None:
+        """Descartar lo pendiente: el cliente relee todo desde /sync/changes"""
+        self.dropped += self.queue.qsize()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait({"type": "resync"})
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+class LocalBackend:
+    """Backend en memoria: solo entrega a los clientes de este worker"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[str], None]] = None
+
+    async def start(self, deliver: Callable[[str], None], resync: Callable[[], None]) -> None:
+        self._deliver = deliver
+
+    async def publish(self, payload: str) -> None:
+        if self._deliver:
+            self._deliver(payload)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+class PostgresNotifyBackend:
+    """
+    Backend entre workers con LISTEN/NOTIFY de Postgres
+    Cada worker escucha el canal y también recibe sus propias notificaciones
+    Si la conexión de LISTEN se cae se reconecta con backoff exponencial; las
+    notificaciones del corte se pierden, así que se pide resync a todos
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        health_check_seconds: float,
+        reconnect_min_seconds: float,
+        reconnect_max_seconds: float
+    ):
+        self.dsn = dsn.replace("postgresql+asyncpg://", "postgresql://")
+        self.channel = channel
+        self.health_check_seconds = health_check_seconds
+        self.reconnect_min_seconds = reconnect_min_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self._deliver: Optional[Callable[[str], None]] = None
+        self._resync: Optional[Callable[[], None]] = None
+        self._listen_conn = None
+        self._publish_conn = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    async def start(self, deliver: Callable[[str], None], resync: Callable[[], None]) -> None:
+        self._deliver = deliver
+        self._resync = resync
+        # La primera conexión falla en el arranque, como antes; las siguientes se reintentan
+        self._listen_conn = await self._listen()
+        self._publish_conn = await self._connect()
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def _connect(self):
+        import asyncpg
+
+        return await asyncpg.connect(self.dsn)
+
+    async def _listen(self):
+        conn = await self._connect()
+        try:
+            await conn.add_listener(self.channel, self._on_notify)
+        except BaseException:
+            conn.terminate()
+            raise
+        return conn
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        self._deliver(payload)
+
+    async def _watch(self) -> None:
+        """Esperar a que se caiga la conexión de LISTEN y rehacerla"""
+        while True:
+            await self._wait_lost(self._listen_conn)
+            logger.warning("Conexión de LISTEN perdida, reconectando")
+            self._listen_conn.terminate()
+            delay = self.reconnect_min_seconds
+            while True:
+                try:
+                    self._listen_conn = await self._listen()
+                    break
+                except Exception as exc:
+                    logger.warning("No se pudo reconectar LISTEN (%s), reintento en %.1fs", exc, delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.reconnect_max_seconds)
+            self.reconnects += 1
+            logger.info("LISTEN reconectado")
+            self._resync()
+
+    async def _wait_lost(self, conn) -> None:
+        """
+        Retorna cuando asyncpg avisa que la conexión terminó o cuando un ping
+        falla (corte de red sin cierre del socket)
+        """
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda conn: lost.set())
+        while not conn.is_closed():
+            try:
+                await asyncio.wait_for(lost.wait(), timeout=self.health_check_seconds)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await conn.fetchval("SELECT 1", timeout=self.health_check_seconds)
+            except Exception:
+                return
+
+    async def publish(self, payload: str) -> None:
+        # Reconexión perezosa: si falla, _pump registra el error y sigue
+        if self._publish_conn is None or self._publish_conn.is_closed():
+            self._publish_conn = await self._connect()
+        await self._publish_conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def stop(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listen_conn = None
+        self._publish_conn = None
+
+class ChangeBroker:
+    """
+    Fan-out de eventos de cambio a los usuarios suscritos
+    publish() no bloquea y se puede llamar desde el event loop o desde el threadpool
+    """
+
+    def __init__(self, backend, queue_size: int, outbox_size: int, max_subscriptions_per_user: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.max_subscriptions_per_user = max_subscriptions_per_user
+        self._subscriptions: Dict[uuid.UUID, Set[Subscription]] = {}
+        self._outbox_size = outbox_size
+        self._outbox: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pump_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue(maxsize=self._outbox_size)
+        await self.backend.start(self._deliver, self._resync_all)
+        self._pump_task = asyncio.create_task(self._pump())
+
+    async def stop(self) -> None:
+        if self._pump_task:
+            self._pump_task.cancel()
+            try:
+                await self._pump_task
+            except asyncio.CancelledError:
+                pass
+        await self.backend.stop()
+        self._loop = None
+
+    def subscribe(self, user_id: uuid.UUID) -> Optional[Subscription]:
+        """Registrar un cliente; retorna None si el usuario ya tiene demasiados"""
+        subscriptions = self._subscriptions.setdefault(user_id, set())
+        if len(subscriptions) >= self.max_subscriptions_per_user:
+            return None
+        subscription = Subscription(user_id, self.queue_size)
+        subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+
+    def publish(self, event: Dict[str, Any], user_ids: Iterable[uuid.UUID]) -> None:
+        if self._loop is None:
+            return
+        payload = json.dumps(
+            {"users": [str(user_id) for user_id in set(user_ids)], "event": event},
+            separators=(",", ":"),
+            default=str
+        )
+        self._loop.call_soon_threadsafe(self._enqueue, payload)
+
+    def _enqueue(self, payload: str) -> None:
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning("Outbox de eventos lleno, evento descartado")
+
+    async def _pump(self) -> None:
+        while True:
+            payload = await self._outbox.get()
+            try:
+                await self.backend.publish(payload)
+            except Exception:
+                logger.exception("Error publicando evento")
+
+    def _deliver(self, payload: str) -> None:
+        message = json.loads(payload)
+        for user_id in message["users"]:
+            user_id = uuid.UUID(user_id)
+            # Escritura hecha en otro worker: lecturas de este usuario al primario
+            sticky_reads.mark(user_id)
+            for subscription in self._subscriptions.get(user_id, ()):
+                subscription.offer(message["event"])
+
+    def _resync_all(self) -> None:
+        """El backend perdió eventos (p. ej. reconexión): todos releen el feed"""
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.resync()
+
+def create_backend():
+    if settings.REALTIME_BACKEND == "postgres":
+        return PostgresNotifyBackend(
+            settings.DATABASE_URL,
+            settings.REALTIME_CHANNEL,
+            health_check_seconds=settings.REALTIME_HEALTH_CHECK_SECONDS,
+            reconnect_min_seconds=settings.REALTIME_RECONNECT_MIN_SECONDS,
+            reconnect_max_seconds=settings.REALTIME_RECONNECT_MAX_SECONDS
+        )
+    return LocalBackend()
+
+broker = ChangeBroker(
+    create_backend(),
+    queue_size=settings.REALTIME_QUEUE_SIZE,
+    outbox_size=settings.REALTIME_OUTBOX_SIZE,
+    max_subscriptions_per_user=settings.REALTIME_MAX_SUBSCRIPTIONS_PER_USER
+)
+
+def publish_change(
+    entity: str,
+    operation: str,
+    entity_id: uuid.UUID,
+    connection,
+    collection_id: Optional[uuid.UUID] = None,
+    version: Optional[int] = None
+) -> None:
+    """
+    Publicar un evento compacto de cambio a los dos miembros de la conexión
+    """
+    sticky_reads.mark(connection.user_id_1, connection.user_id_2)
+    event = {
+        "type": f"{entity}.{operation}",
+        "id": str(entity_id),
+        "connection_id": str(connection.id),
+        "version": version
+    }
+    if collection_id is not None:
+        event["collection_id"] = str(collection_id)
+    broker.publish(event, (connection.user_id_1, connection.user_id_2))
\ No newline at end of file
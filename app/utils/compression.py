@@ -0,0 +1,98 @@
+import gzip
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Tipos que vale la pena comprimir; imágenes y demás ya vienen comprimidos
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack", "application/x-msgpack", "text/")
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """"br" o "gzip" según Accept-Encoding (q > 0), con brotli primero"""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    for encoding in ("br", "gzip"):
+        if encoding in accepted:
+            return encoding
+    return None
+
+class CompressionMiddleware:
+    """
+    Comprime con brotli o gzip las respuestas con Content-Length de al menos
+    `minimum_size` bytes. La decisión se toma con los headers: las respuestas
+    sin Content-Length (streaming, como el SSE de /api/events) y las chicas
+    pasan intactas y sin demora; solo se junta el cuerpo de las que se comprimen
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, gzip_level: int, brotli_quality: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def should_compress(self, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "")
+        if "content-encoding" in headers or content_type.startswith("text/event-stream"):
+            return False
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        length = headers.get("content-length")
+        return length is not None and length.isdigit() and int(length) >= self.minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        chunks = []
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if self.should_compress(Headers(raw=message["headers"])):
+                    start = message  # se envía junto con el cuerpo comprimido
+                else:
+                    await send(message)
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            if encoding == "br":
+                body = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                body = gzip.compress(body, compresslevel=self.gzip_level)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            # Otro cuerpo en bytes: el ETag fuerte pasa a débil (etag_matches compara en débil)
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+from app.config import get_settings
+from app.utils.wire import wire_format
+
+settings = get_settings()
+
+def make_etag(*parts: Any) -> str:
+    """
+    ETag fuerte a partir de los datos que determinan la representación
+    (versión agregada, cursor, límite...), sin tocar las filas
+    """
+    # La versión de la API entra en el hash: un cambio de esquema invalida los ETags
+    # El formato negociado también: JSON y MessagePack son representaciones distintas
+    raw = ":".join("" if part is None else str(part) for part in (settings.API_VERSION, wire_format.get(), *parts))
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match (RFC 9110 13.1.2): ignora el prefijo W/
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    # Los clientes pueden guardar la respuesta, pero deben revalidarla siempre
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        # Las columnas DateTime guardan hora UTC sin zona
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Retorna un 304 si el cliente ya tiene esta versión; si no, agrega los
+    validadores a la respuesta que el handler va a generar
+    Solo se evalúa If-None-Match: Last-Modified no refleja borrados físicos
+    """
+    headers = validator_headers(etag, last_modified)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
\ No newline at end of file
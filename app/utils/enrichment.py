@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import uuid
+
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import Item, Collection, Connection, EnrichmentJob
+from app.utils.metadata_store import metadata_store
+from app.utils.broker import publish_change
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def enqueue_enrichment(db: AsyncSession, item: Item) -> EnrichmentJob:
+    """
+    Registrar el job de enriquecimiento de un item recién creado
+    Se guarda en la misma transacción que el item
+    """
+    item.enrichment_status = "pending"
+    job = EnrichmentJob(
+        item_id=item.id,
+        url=item.url,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.add(job)
+    return job
+
+class EnrichmentWorker:
+    """
+    Pool acotado de tareas que procesa la tabla enrichment_jobs
+    Los jobs se reclaman con FOR UPDATE SKIP LOCKED, así varios workers (y
+    varios procesos) pueden compartir la cola sin pisarse
+    """
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Despertar a los workers cuando se encola un job nuevo"""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Error reclamando job de enriquecimiento")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.ENRICHMENT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, url = job
+            try:
+                metadata_id, metadata = await metadata_store.get(url)
+                await self._complete(job_id, metadata_id, metadata)
+            except Exception:
+                logger.exception("Error guardando metadata del job %s", job_id)
+
+    async def _claim(self) -> Optional[tuple]:
+        """Tomar un job pendiente (o con lease vencido) y marcarlo como running"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(EnrichmentJob)
+                .where(
+                    or_(EnrichmentJob.status == "pending", EnrichmentJob.status == "running"),
+                    EnrichmentJob.next_attempt_at <= now
+                )
+                .order_by(EnrichmentJob.next_attempt_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                return None
+
+            job.status = "running"
+            job.attempts += 1
+            job.next_attempt_at = now + timedelta(seconds=settings.ENRICHMENT_LEASE_SECONDS)
+            await db.commit()
+            return job.id, job.url
+
+    async def _complete(self, job_id: uuid.UUID, metadata_id: Optional[uuid.UUID], metadata: Dict[str, Any]) -> None:
+        """Aplicar la metadata al item, o reprogramar el job con backoff exponencial"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(EnrichmentJob, Item)
+                .join(Item, Item.id == EnrichmentJob.item_id)
+                .where(EnrichmentJob.id == job_id)
+            )
+            row = result.first()
+            if row is None:
+                return
+            job, item = row
+
+            if "error" in metadata:
+                job.last_error = metadata["error"]
+                if job.attempts >= settings.ENRICHMENT_MAX_ATTEMPTS:
+                    job.status = "failed"
+                    item.enrichment_status = "failed"
+                else:
+                    job.status = "pending"
+                    job.next_attempt_at = now + timedelta(
+                        seconds=settings.ENRICHMENT_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+                    )
+                    await db.commit()
+                    return
+            else:
+                job.status = "done"
+                job.last_error = None
+                item.title = item.title or (metadata.get("title") or "")[:255] or None
+                item.description = item.description or metadata.get("description")
+                item.thumbnail_url = metadata.get("thumbnail_url")
+                item.platform = metadata.get("platform")
+                # El blob queda en link_metadata, compartido por todos los items con la misma URL
+                item.link_metadata_id = metadata_id
+                item.own_metadata = None
+                item.enrichment_status = "done"
+
+            # No se sube `version`: es un cambio del servidor y no debe generar
+            # conflictos con ediciones del cliente; change_seq sí avanza
+            item_id, collection_id, version = item.id, item.collection_id, item.version
+
+            connection = (await db.execute(
+                select(Connection)
+                .join(Collection, Collection.connection_id == Connection.id)
+                .where(Collection.id == collection_id)
+            )).scalar_one_or_none()
+            await db.commit()
+
+        if connection:
+            publish_change("item", "update", item_id, connection, collection_id=collection_id, version=version)
+
+enrichment_worker = EnrichmentWorker(settings.ENRICHMENT_WORKERS)
\ No newline at end of file
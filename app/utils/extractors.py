@@ -0,0 +1,107 @@
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit, parse_qs
+import aiohttp
+from app.config import get_settings
+from app.utils.http_client import get_http_session
+
+settings = get_settings()
+
+# Extractores rápidos por plataforma (clave: resultado de detect_platform)
+# Cada uno retorna un dict con title/description/thumbnail_url, o None para
+# que extract_metadata caiga al scraping genérico del HTML
+Extractor = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+EXTRACTORS: Dict[str, Extractor] = {}
+
+def register_extractor(platform: str):
+    def decorator(func: Extractor) -> Extractor:
+        EXTRACTORS[platform] = func
+        return func
+    return decorator
+
+def get_extractor(platform: str) -> Optional[Extractor]:
+    return EXTRACTORS.get(platform)
+
+async def fetch_oembed(endpoint: str, url: str, **params) -> Optional[Dict[str, Any]]:
+    """
+    Consulta un endpoint oEmbed y normaliza la respuesta
+    """
+    session = await get_http_session()
+    async with session.get(endpoint, params={"url": url, "format": "json", **params}) as resp:
+        if resp.status != 200:
+            return None
+        data = await resp.json(content_type=None)
+
+    if not isinstance(data, dict):
+        return None
+    return {
+        "title": data.get("title"),
+        "description": None,
+        "thumbnail_url": data.get("thumbnail_url"),
+        "author_name": data.get("author_name"),
+        "site_name": data.get("provider_name")
+    }
+
+YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+def youtube_video_id(url: str) -> Optional[str]:
+    parts = urlsplit(url if "://" in url else "https://" + url)
+    host = (parts.hostname or "").lower()
+    segments = [segment for segment in parts.path.split("/") if segment]
+
+    if host == "youtu.be" or host.endswith(".youtu.be"):
+        candidate = segments[0] if segments else None
+    elif segments and segments[0] in ("shorts", "embed", "live", "v") and len(segments) > 1:
+        candidate = segments[1]
+    else:
+        candidate = parse_qs(parts.query).get("v", [None])[0]
+
+    if candidate and YOUTUBE_ID.match(candidate):
+        return candidate
+    return None
+
+@register_extractor("youtube")
+async def extract_youtube(url: str) -> Optional[Dict[str, Any]]:
+    """
+    La miniatura sale del ID del video, sin fetch; el título viene de oEmbed
+    Si oEmbed falla se devuelve igual lo que sale del ID
+    """
+    video_id = youtube_video_id(url)
+    if video_id is None:
+        return None
+
+    metadata = {
+        "title": None,
+        "description": None,
+        "thumbnail_url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        "video_id": video_id
+    }
+    try:
+        oembed = await fetch_oembed(settings.YOUTUBE_OEMBED_URL, f"https://www.youtube.com/watch?v={video_id}")
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        oembed = None
+    if oembed:
+        metadata["title"] = oembed["title"]
+        metadata["author_name"] = oembed["author_name"]
+    return metadata
+
+@register_extractor("tiktok")
+async def extract_tiktok(url: str) -> Optional[Dict[str, Any]]:
+    return await fetch_oembed(settings.TIKTOK_OEMBED_URL, url)
+
+@register_extractor("pinterest")
+async def extract_pinterest(url: str) -> Optional[Dict[str, Any]]:
+    return await fetch_oembed(settings.PINTEREST_OEMBED_URL, url)
+
+@register_extractor("instagram")
+async def extract_instagram(url: str) -> Optional[Dict[str, Any]]:
+    # El oEmbed de Instagram requiere token de app de Meta
+    if not settings.INSTAGRAM_OEMBED_TOKEN:
+        return None
+    return await fetch_oembed(
+        settings.INSTAGRAM_OEMBED_URL,
+        url,
+        access_token=settings.INSTAGRAM_OEMBED_TOKEN,
+        fields="title,thumbnail_url,author_name,provider_name"
+    )
\ No newline at end of file
@@ -0,0 +1,115 @@
+import time
+import aiohttp
+from typing import Optional, Dict, Any
+from app.config import get_settings
+
+settings = get_settings()
+
+# Sesión HTTP compartida por todo el proceso; la abre y cierra el lifespan de la app
+_session: Optional[aiohttp.ClientSession] = None
+
+_stats = {
+    "requests": 0,
+    "connections_created": 0,
+    "connections_reused": 0,
+    "queued": 0,
+    "queued_wait_ms_total": 0.0,
+    "queued_wait_ms_max": 0.0,
+    "dns_cache_hits": 0,
+    "dns_cache_misses": 0,
+}
+
+async def _on_request_start(session, ctx, params):
+    _stats["requests"] += 1
+
+async def _on_connection_queued_start(session, ctx, params):
+    ctx.queued_at = time.perf_counter()
+
+async def _on_connection_queued_end(session, ctx, params):
+    waited_ms = (time.perf_counter() - ctx.queued_at) * 1000
+    _stats["queued"] += 1
+    _stats["queued_wait_ms_total"] += waited_ms
+    _stats["queued_wait_ms_max"] = max(_stats["queued_wait_ms_max"], waited_ms)
+
+async def _on_connection_create_end(session, ctx, params):
+    _stats["connections_created"] += 1
+
+async def _on_connection_reuseconn(session, ctx, params):
+    _stats["connections_reused"] += 1
+
+async def _on_dns_cache_hit(session, ctx, params):
+    _stats["dns_cache_hits"] += 1
+
+async def _on_dns_cache_miss(session, ctx, params):
+    _stats["dns_cache_misses"] += 1
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(_on_request_start)
+    trace.on_connection_queued_start.append(_on_connection_queued_start)
+    trace.on_connection_queued_end.append(_on_connection_queued_end)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    trace.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace.on_dns_cache_hit.append(_on_dns_cache_hit)
+    trace.on_dns_cache_miss.append(_on_dns_cache_miss)
+    return trace
+
+async def start_http_client() -> aiohttp.ClientSession:
+    """
+    Crear la sesión compartida: keep-alive, cache de DNS, límite global y por host
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+            use_dns_cache=True,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.HTTP_TIMEOUT_SECONDS),
+            headers={"User-Agent": settings.HTTP_USER_AGENT},
+            trace_configs=[_trace_config()]
+        )
+    return _session
+
+async def close_http_client() -> None:
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """
+    Sesión compartida; se crea bajo demanda si el lifespan no la abrió (scripts, consola)
+    """
+    if _session is None or _session.closed:
+        return await start_http_client()
+    return _session
+
+def http_pool_stats() -> Dict[str, Any]:
+    """
+    Estadísticas del pool para dimensionar HTTP_POOL_LIMIT / HTTP_POOL_LIMIT_PER_HOST
+    """
+    stats: Dict[str, Any] = dict(_stats)
+    stats["limit"] = settings.HTTP_POOL_LIMIT
+    stats["limit_per_host"] = settings.HTTP_POOL_LIMIT_PER_HOST
+    stats["queued_wait_ms_avg"] = (
+        _stats["queued_wait_ms_total"] / _stats["queued"] if _stats["queued"] else 0.0
+    )
+    
+    if _session is not None and not _session.closed:
+        connector = _session.connector
+        # Atributos internos de aiohttp: solo lectura, para observabilidad
+        acquired = getattr(connector, "_acquired", ())
+        idle = getattr(connector, "_conns", {})
+        stats["active"] = len(acquired)
+        stats["idle"] = sum(len(conns) for conns in idle.values())
+        stats["idle_hosts"] = len(idle)
+    else:
+        stats["active"] = 0
+        stats["idle"] = 0
+        stats["idle_hosts"] = 0
+    return stats
\ No newline at end of file
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import uuid
+
+from app.config import get_settings
+
+settings = get_settings()
+
+class ReplayCache:
+    """
+    LRU por worker de respuestas de sync por (user_id, op_id), delante de la
+    tabla sync_operations: un reintento reciente se responde sin ir a la base
+    Las respuestas guardadas no cambian, así que no hace falta TTL ni invalidación
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[uuid.UUID, uuid.UUID], dict]" = OrderedDict()
+
+    def get(self, user_id: uuid.UUID, op_id: uuid.UUID) -> Optional[dict]:
+        response = self._entries.get((user_id, op_id))
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((user_id, op_id))
+        self.hits += 1
+        return response
+
+    def put(self, user_id: uuid.UUID, op_id: uuid.UUID, response: dict) -> None:
+        self._entries[(user_id, op_id)] = response
+        self._entries.move_to_end((user_id, op_id))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+replay_cache = ReplayCache(settings.SYNC_REPLAY_CACHE_SIZE)
@@ -0,0 +1,253 @@
+import csv
+import json
+from html.parser import HTMLParser
+from typing import Dict, List, NamedTuple, Optional
+
+# Claves aceptadas para la URL y el título en JSON y en encabezados CSV
+URL_KEYS = ("url", "href", "link", "uri")
+TITLE_KEYS = ("title", "name")
+
+class ImportedLink(NamedTuple):
+    url: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+
+class BookmarksParser(HTMLParser):
+    """
+    Parser incremental del export de marcadores de los navegadores
+    (formato Netscape: <DT><A HREF=...>título</A> seguido opcionalmente de <DD>descripción)
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._links: List[ImportedLink] = []
+        self._href: Optional[str] = None
+        self._title: List[str] = []
+        self._last: Optional[ImportedLink] = None  # espera un <DD> con la descripción
+        self._description: Optional[List[str]] = None
+        self.invalid = 0
+
+    def feed(self, data: str) -> List[ImportedLink]:
+        super().feed(data)
+        return self._drain()
+
+    def close(self) -> List[ImportedLink]:
+        super().close()
+        self._flush_description()
+        if self._last is not None:
+            self._links.append(self._last)
+            self._last = None
+        return self._drain()
+
+    def _drain(self) -> List[ImportedLink]:
+        links, self._links = self._links, []
+        return links
+
+    def _flush_description(self) -> None:
+        if self._description is not None and self._last is not None:
+            description = " ".join("".join(self._description).split()) or None
+            self._links.append(self._last._replace(description=description))
+            self._last = None
+        self._description = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "dd" and self._last is not None:
+            self._description = []
+            return
+        self._flush_description()
+        if tag == "a":
+            if self._last is not None:
+                self._links.append(self._last)
+                self._last = None
+            self._href = dict(attrs).get("href")
+            self._title = []
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._href is not None:
+            title = " ".join("".join(self._title).split()) or None
+            self._last = ImportedLink(self._href, title)
+            self._href = None
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._title.append(data)
+        elif self._description is not None:
+            self._description.append(data)
+
+class JSONLinksParser:
+    """
+    Parser incremental de un arreglo JSON de links (strings u objetos con
+    url/href/link, title/name, description) o de JSON Lines
+    Cada elemento se decodifica con raw_decode apenas llega completo
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._decoder = json.JSONDecoder()
+        self._mode: Optional[str] = None  # array, lines
+        self._finished = False
+        self.invalid = 0
+
+    def feed(self, data: str) -> List[ImportedLink]:
+        self._buffer += data
+        return self._parse(final=False)
+
+    def close(self) -> List[ImportedLink]:
+        links = self._parse(final=True)
+        if self._mode == "array" and not self._finished:
+            raise ValueError("JSON incompleto: falta cerrar el arreglo")
+        return links
+
+    def _parse(self, final: bool) -> List[ImportedLink]:
+        links = []
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = self._skip(buffer, pos)
+            if pos >= len(buffer) or self._finished:
+                break
+
+            if self._mode is None:
+                if buffer[pos] == "[":
+                    self._mode = "array"
+                    pos += 1
+                    continue
+                self._mode = "lines"
+            if self._mode == "array" and buffer[pos] == ",":
+                # El separador puede llegar en el chunk siguiente al elemento
+                pos += 1
+                continue
+            if self._mode == "array" and buffer[pos] == "]":
+                self._finished = True
+                pos += 1
+                break
+
+            try:
+                value, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError(f"JSON inválido cerca del carácter {pos}")
+                break  # elemento incompleto: esperar el próximo chunk
+            if end == len(buffer) and not final and not isinstance(value, (dict, list, str)):
+                break  # un número o literal podría continuar en el próximo chunk
+
+            link = self._to_link(value)
+            if link is None:
+                self.invalid += 1
+            else:
+                links.append(link)
+            pos = end
+
+        self._buffer = buffer[pos:]
+        return links
+
+    @staticmethod
+    def _skip(buffer: str, pos: int) -> int:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        return pos
+
+    def _to_link(self, value) -> Optional[ImportedLink]:
+        if isinstance(value, str):
+            return ImportedLink(value)
+        if not isinstance(value, dict):
+            return None
+        url = next((value[key] for key in URL_KEYS if isinstance(value.get(key), str)), None)
+        if url is None:
+            return None
+        title = next((value[key] for key in TITLE_KEYS if isinstance(value.get(key), str)), None)
+        description = value.get("description") if isinstance(value.get("description"), str) else None
+        return ImportedLink(url, title, description)
+
+class CSVLinksParser:
+    """
+    Parser incremental de CSV: junta líneas hasta cerrar las comillas y pasa
+    cada registro completo a csv.reader
+    Si la primera fila tiene una columna url/href/link se usa como encabezado;
+    si no, las columnas son url, título y descripción en ese orden
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._record: List[str] = []
+        self._quotes = 0
+        self._columns: Optional[Dict[str, int]] = None
+        self.invalid = 0
+
+    def feed(self, data: str) -> List[ImportedLink]:
+        links = []
+        lines = (self._pending + data).split("\n")
+        # La última línea puede estar cortada por el chunk
+        self._pending = lines.pop()
+        for line in lines:
+            self._add_line(line + "\n", links)
+        return links
+
+    def close(self) -> List[ImportedLink]:
+        links = []
+        if self._pending:
+            self._add_line(self._pending, links)
+            self._pending = ""
+        if self._record:
+            raise ValueError("CSV inválido: comillas sin cerrar")
+        return links
+
+    def _add_line(self, line: str, links: List[ImportedLink]) -> None:
+        self._record.append(line)
+        self._quotes += line.count('"')
+        if self._quotes % 2:
+            return  # campo entre comillas con salto de línea
+
+        record = "".join(self._record)
+        self._record = []
+        self._quotes = 0
+        row = next(csv.reader([record]), None)
+        if not row or not any(field.strip() for field in row):
+            return
+
+        if self._columns is None:
+            header = [field.strip().lower() for field in row]
+            url_column = next((header.index(key) for key in URL_KEYS if key in header), None)
+            if url_column is not None:
+                self._columns = {"url": url_column}
+                for key in TITLE_KEYS:
+                    if key in header:
+                        self._columns["title"] = header.index(key)
+                        break
+                if "description" in header:
+                    self._columns["description"] = header.index("description")
+                return
+            self._columns = {"url": 0, "title": 1, "description": 2}
+
+        def field(name: str) -> Optional[str]:
+            index = self._columns.get(name)
+            if index is None or index >= len(row):
+                return None
+            return row[index].strip() or None
+
+        url = field("url")
+        if url is None:
+            self.invalid += 1
+            return
+        links.append(ImportedLink(url, field("title"), field("description")))
+
+PARSERS = {
+    "html": BookmarksParser,
+    "json": JSONLinksParser,
+    "csv": CSVLinksParser
+}
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Formato del archivo por extensión o, si no, por content type"""
+    name = (filename or "").lower()
+    for extension, import_format in ((".html", "html"), (".htm", "html"), (".json", "json"), (".jsonl", "json"), (".csv", "csv")):
+        if name.endswith(extension):
+            return import_format
+    content_type = (content_type or "").lower()
+    if "html" in content_type:
+        return "html"
+    if "json" in content_type:
+        return "json"
+    if "csv" in content_type:
+        return "csv"
+    return None
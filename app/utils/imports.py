@@ -0,0 +1,237 @@
+import asyncio
+import codecs
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from typing import IO, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+import uuid
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import Item, EnrichmentJob, ImportJob
+from app.repositories import existing_url_hashes
+from app.utils.broker import publish_change
+from app.utils.enrichment import enrichment_worker
+from app.utils.import_parsers import PARSERS, ImportedLink
+from app.utils.metadata import detect_platform, url_hash
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+async def spool_upload(upload: UploadFile) -> IO[bytes]:
+    """
+    Copiar el archivo subido a un temporal propio: FastAPI cierra el
+    UploadFile al terminar la request y la importación sigue en segundo plano
+    """
+    spool = tempfile.TemporaryFile()
+    size = 0
+    while chunk := await upload.read(settings.IMPORT_CHUNK_BYTES):
+        size += len(chunk)
+        if size > settings.IMPORT_MAX_BYTES:
+            spool.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"El archivo supera {settings.IMPORT_MAX_BYTES // (1024 * 1024)} MB"
+            )
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+def clean_link(link: ImportedLink) -> Optional[ImportedLink]:
+    """Link listo para insertar, o None si la URL no es http(s) válida"""
+    url = link.url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None  # p. ej. "http://[abc": cuenta como inválido, no corta la importación
+    if parts.scheme.lower() not in ("http", "https") or not parts.netloc or len(url) > 2048:
+        return None
+    title = link.title[:255] if link.title else None
+    return ImportedLink(url, title, link.description)
+
+class ImportRunner:
+    """
+    Importaciones en segundo plano, con un máximo de importaciones simultáneas
+    El enriquecimiento de los items lo hace el pool acotado de EnrichmentWorker
+    """
+
+    def __init__(self, max_concurrent: int):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, job_id: uuid.UUID, spool: IO[bytes], import_format: str, collection_id: uuid.UUID, user_id: uuid.UUID, connection) -> None:
+        task = asyncio.create_task(self._run(job_id, spool, import_format, collection_id, user_id, connection))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, job_id, spool, import_format, collection_id, user_id, connection) -> None:
+        try:
+            async with self._semaphore:
+                await run_import(job_id, spool, import_format, collection_id, user_id)
+            publish_change("import", "done", job_id, connection, collection_id=collection_id)
+        except asyncio.CancelledError:
+            await fail_import(job_id, "Importación interrumpida")
+            raise
+        except Exception as e:
+            logger.exception("Error en la importación %s", job_id)
+            await fail_import(job_id, str(e))
+        finally:
+            spool.close()
+
+async def run_import(job_id: uuid.UUID, spool: IO[bytes], import_format: str, collection_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    """
+    Leer el archivo por chunks, parsear incrementalmente e insertar en lotes
+    Cada lote es un INSERT multi-fila de items y otro de sus jobs de
+    enriquecimiento, y actualiza el progreso de la importación
+    """
+    parser = PARSERS[import_format]()
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    stats = {"total": 0, "inserted": 0, "duplicates": 0, "invalid": 0}
+    seen: Set[str] = set()
+    pending: List[Tuple[str, ImportedLink]] = []
+    truncated = False
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(ImportJob).where(ImportJob.id == job_id).values(status="running"))
+        await db.commit()
+
+        finished = False
+        while not finished and not truncated:
+            chunk = await asyncio.to_thread(spool.read, settings.IMPORT_CHUNK_BYTES)
+            if chunk:
+                links = parser.feed(decoder.decode(chunk))
+            else:
+                links = parser.feed(decoder.decode(b"", final=True)) + parser.close()
+                finished = True
+
+            for link in links:
+                if stats["total"] >= settings.IMPORT_MAX_LINKS:
+                    truncated = True
+                    break
+                stats["total"] += 1
+
+                link = clean_link(link)
+                if link is None:
+                    stats["invalid"] += 1
+                    continue
+                key = url_hash(link.url)
+                if key in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(key)
+                pending.append((key, link))
+
+                if len(pending) >= settings.IMPORT_BATCH_SIZE:
+                    await insert_batch(db, job_id, pending, collection_id, user_id, stats)
+                    pending = []
+
+        if pending:
+            await insert_batch(db, job_id, pending, collection_id, user_id, stats)
+
+        stats["invalid"] += parser.invalid
+        await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(
+                status="done",
+                finished_at=datetime.utcnow(),
+                error=f"Se importaron solo los primeros {settings.IMPORT_MAX_LINKS} links" if truncated else None,
+                **stats
+            )
+        )
+        await db.commit()
+
+async def insert_batch(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    pending: List[Tuple[str, ImportedLink]],
+    collection_id: uuid.UUID,
+    user_id: uuid.UUID,
+    stats: Dict[str, int]
+) -> None:
+    existing = await existing_url_hashes(db, collection_id, [key for key, _ in pending])
+    now = datetime.utcnow()
+    items = []
+    jobs = []
+    for key, link in pending:
+        if key in existing:
+            stats["duplicates"] += 1
+            continue
+        item_id = uuid.uuid4()
+        items.append({
+            "id": item_id,
+            "collection_id": collection_id,
+            "url": link.url,
+            "url_hash": key,
+            "title": link.title,
+            "description": link.description,
+            "platform": detect_platform(link.url),
+            "created_by": user_id,
+            "created_at": now,
+            "updated_at": now,
+            "version": 0,
+            "enrichment_status": "pending"
+        })
+        jobs.append({
+            "id": uuid.uuid4(),
+            "item_id": item_id,
+            "url": link.url,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "import_job_id": job_id,
+            "created_at": now,
+            "updated_at": now
+        })
+
+    if items:
+        await db.execute(insert(Item).values(items))
+        await db.execute(insert(EnrichmentJob).values(jobs))
+    stats["inserted"] += len(items)
+    await db.execute(update(ImportJob).where(ImportJob.id == job_id).values(**stats))
+    await db.commit()
+
+    if items:
+        enrichment_worker.notify()
+
+async def fail_import(job_id: uuid.UUID, error: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(status="failed", error=error, finished_at=datetime.utcnow())
+        )
+        await db.commit()
+
+async def fail_stale_imports() -> int:
+    """
+    Al arrancar: las importaciones que quedaron pending/running sin progreso
+    son de un proceso que murió (deploy, OOM). El archivo vivía en un temporal
+    de ese proceso, así que no se pueden retomar: se marcan como fallidas
+    Cada lote actualiza updated_at, así que un job de otro worker vivo no entra
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.status.in_(("pending", "running")),
+                ImportJob.updated_at < func.now() - timedelta(minutes=settings.IMPORT_STALE_MINUTES)
+            )
+            .values(status="failed", error="Importación interrumpida", finished_at=datetime.utcnow())
+        )
+        await db.commit()
+    if result.rowcount:
+        logger.warning("%s importaciones interrumpidas marcadas como fallidas", result.rowcount)
+    return result.rowcount
+
+import_runner = ImportRunner(settings.IMPORT_MAX_CONCURRENT)
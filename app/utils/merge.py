@@ -0,0 +1,78 @@
+from typing import Any, Dict, Iterable, List, NamedTuple
+
+# Campos editables por sync y qué hacer cuando el cliente y el servidor
+# cambiaron el mismo campo desde la versión que vio el cliente:
+# - "conflict": se conserva el valor del servidor y el campo se informa como conflicto
+# - "lww": gana la última escritura que llega al servidor
+ITEM_MERGE_FIELDS = {
+    "title": "conflict",
+    "description": "conflict"
+}
+
+COLLECTION_MERGE_FIELDS = {
+    "name": "conflict",
+    "icon": "lww"
+}
+
+class FieldMerge(NamedTuple):
+    changed: List[str]  # campos aplicados
+    conflicts: List[str]  # campos con cambios concurrentes distintos, sin aplicar
+
+def field_version(entity, field: str) -> int:
+    """
+    Versión de la entidad en la que cambió el campo por última vez
+    Sin historial por campo (filas anteriores, o nunca editadas) se asume la
+    versión actual: el mismo criterio conservador que la comparación por entidad
+    """
+    if entity.field_versions is None:
+        return entity.version
+    return entity.field_versions.get(field, 0)
+
+def record_changes(entity, fields: Iterable[str], tracked: Dict[str, str]) -> None:
+    """
+    Registrar en field_versions los campos cambiados en la versión actual
+    (llamar después de subir `version`)
+    """
+    if entity.field_versions is None:
+        # Primer cambio con historial: los demás campos quedan en la versión anterior
+        versions = {field: entity.version - 1 for field in tracked}
+    else:
+        versions = dict(entity.field_versions)
+    for field in fields:
+        versions[field] = entity.version
+    # Dict nuevo: el ORM no detecta cambios dentro del JSONB
+    entity.field_versions = versions
+
+def merge_fields(entity, data: Dict[str, Any], tracked: Dict[str, str]) -> FieldMerge:
+    """
+    Aplicar los campos de `data` que no chocan con cambios del servidor
+    posteriores a data["version"]; sube `version` solo si algo cambió
+    El cliente manda solo los campos que editó, o la entidad entera junto con
+    data["base"] (los valores que vio en esa versión): un campo igual a su
+    valor base no se editó y no se aplica ni genera conflicto
+    Una entidad borrada no se edita: gana el borrado y cada campo editado
+    queda como conflicto, sea cual sea su política
+    """
+    base = data.get("version", 0)
+    base_values = data.get("base") or {}
+    deleted = getattr(entity, "deleted_at", None) is not None
+    changed = []
+    conflicts = []
+    for field, policy in tracked.items():
+        if field not in data:
+            continue
+        value = data[field]
+        if value == getattr(entity, field):
+            continue  # mismo valor: no hay nada que aplicar ni conflicto
+        if field in base_values and base_values[field] == value:
+            continue  # sin editar en el cliente: vale el valor del servidor
+        if deleted or (policy == "conflict" and field_version(entity, field) > base):
+            conflicts.append(field)
+            continue
+        setattr(entity, field, value)
+        changed.append(field)
+
+    if changed:
+        entity.version += 1
+        record_changes(entity, changed, tracked)
+    return FieldMerge(changed, conflicts)
@@ -1,51 +1,229 @@
-import aiohttp
-from bs4 import BeautifulSoup
+import codecs
+import hashlib
+from html.parser import HTMLParser
 from typing import Optional, Dict, Any
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from app.config import get_settings
+from app.utils.http_client import get_http_session
+from app.utils.extractors import get_extractor, youtube_video_id
+
+settings = get_settings()
+
+class HeadMetadataParser(HTMLParser):
+    """
+    Parser incremental que solo mira el <head>: meta OpenGraph/Twitter,
+    <title> y <link rel=icon>. Marca `done` al llegar a </head> o <body>
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+        self.title_parts = []
+        self.icon_href: Optional[str] = None
+        self.done = False
+        self._in_title = False
+    
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "body":
+            self.done = True
+            return
+        
+        attrs = dict(attrs)
+        if tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            content = attrs.get("content")
+            if key and content and key not in self.meta:
+                self.meta[key] = content.strip()
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "link" and self.icon_href is None:
+            rel = (attrs.get("rel") or "").lower().split()
+            if "icon" in rel and attrs.get("href"):
+                self.icon_href = attrs["href"]
+    
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag == "head":
+            self.done = True
+    
+    def handle_data(self, data):
+        if self._in_title and not self.done:
+            self.title_parts.append(data)
+    
+    def result(self, base_url: str) -> Dict[str, Any]:
+        meta = self.meta
+        title = "".join(self.title_parts).strip() or None
+        image = meta.get("og:image") or meta.get("twitter:image") or meta.get("twitter:image:src")
+        return {
+            "title": meta.get("og:title") or meta.get("twitter:title") or title,
+            "description": meta.get("og:description") or meta.get("twitter:description") or meta.get("description"),
+            "thumbnail_url": urljoin(base_url, image) if image else None,
+            "site_name": meta.get("og:site_name"),
+            "icon_url": urljoin(base_url, self.icon_href) if self.icon_href else None
+        }
 
 async def extract_metadata(url: str) -> Dict[str, Any]:
     """
     Extrae metadata básica de una URL
+    Usa el extractor rápido de la plataforma si hay uno registrado y, si no
+    sirve (None o una excepción), cae al scraping del HTML
+    """
+    platform = detect_platform(url)
+    extractor = get_extractor(platform)
+    if extractor is not None:
+        try:
+            metadata = await extractor(url)
+        except Exception:
+            metadata = None
+        if metadata is not None:
+            return {"platform": platform, "url": url, **metadata}
+    
+    return await extract_html_metadata(url)
+
+async def extract_html_metadata(url: str) -> Dict[str, Any]:
+    """
+    Scraping genérico del HTML
+    Lee por chunks y corta al terminar el <head> o al llegar a METADATA_MAX_BYTES
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status != 200:
-                    return {"platform": "generic", "url": url}
-                
-                html = await resp.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Detectar plataforma
-                platform = detect_platform(url)
-                
-                # Extraer metadata
-                og_title = soup.find("meta", property="og:title")
-                og_description = soup.find("meta", property="og:description")
-                og_image = soup.find("meta", property="og:image")
-                
-                return {
-                    "platform": platform,
-                    "url": url,
-                    "title": og_title["content"] if og_title else None,
-                    "description": og_description["content"] if og_description else None,
-                    "thumbnail_url": og_image["content"] if og_image else None
-                }
+        session = await get_http_session()
+        async with session.get(url) as resp:
+            if not 200 <= resp.status < 300:
+                # Es un fallo (403, 429, 503...): sin "error" se guardaría como
+                # metadata buena con el TTL completo
+                return {"platform": "generic", "url": url, "error": f"HTTP {resp.status}"}
+            
+            try:
+                decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            
+            parser = HeadMetadataParser()
+            read = 0
+            async for chunk in resp.content.iter_chunked(settings.METADATA_CHUNK_BYTES):
+                read += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if parser.done or read >= settings.METADATA_MAX_BYTES:
+                    break
+            
+            if not parser.done and read < settings.METADATA_MAX_BYTES:
+                parser.feed(decoder.decode(b"", final=True))
+            else:
+                # No hace falta el resto del body: cerrar en vez de drenarlo
+                resp.close()
+            
+            return {
+                "platform": detect_platform(url),
+                "url": url,
+                **parser.result(str(resp.url))
+            }
     except Exception as e:
         return {"platform": "generic", "url": url, "error": str(e)}
 
+PLATFORM_DOMAINS = {
+    "instagram": ("instagram.com", "instagr.am"),
+    "tiktok": ("tiktok.com",),
+    "youtube": ("youtube.com", "youtu.be", "youtube-nocookie.com"),
+    "pinterest": ("pinterest.com", "pin.it"),
+    "twitter": ("twitter.com", "x.com"),
+}
+
+# Plataformas donde el contenido lo identifica el path: la query es solo tracking
+PATH_ONLY_PLATFORMS = {"instagram", "tiktok", "pinterest", "twitter"}
+
+# Tracking en cualquier host (además de utm_*); nombres genéricos como "ref"
+# o "si" pueden ser parte del contenido (ramas de GitHub, búsquedas...)
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid", "igsh",
+    "mc_cid", "mc_eid", "_ga", "_gl",
+}
+
+# Tracking propio de plataformas cuya query sí importa (listas y canales de YouTube)
+PLATFORM_TRACKING_PARAMS = {
+    "youtube": {"si", "feature", "pp"},
+}
+
+MOBILE_PREFIXES = ("www.", "m.", "mobile.")
+
+def host_matches(host: str, domain: str) -> bool:
+    """
+    True si host es el dominio o un subdominio (no basta con contener el texto)
+    """
+    return host == domain or host.endswith("." + domain)
+
+def _split_url(url: str):
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    return urlsplit(url)
+
+def _platform_for_host(host: str) -> str:
+    for platform, domains in PLATFORM_DOMAINS.items():
+        if any(host_matches(host, domain) for domain in domains):
+            return platform
+    return "generic"
+
 def detect_platform(url: str) -> str:
     """
     Detecta la plataforma del URL
     """
-    if "instagram.com" in url:
-        return "instagram"
-    elif "tiktok.com" in url:
-        return "tiktok"
-    elif "youtube.com" in url or "youtu.be" in url:
-        return "youtube"
-    elif "pinterest.com" in url:
-        return "pinterest"
-    elif "twitter.com" in url or "x.com" in url:
-        return "twitter"
+    try:
+        host = (_split_url(url).hostname or "").lower()
+    except ValueError:
+        return "generic"
+    return _platform_for_host(host)
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normaliza la URL para usarla como clave de duplicados y de metadata:
+    https, host en minúsculas sin www./m., sin puerto por defecto, fragmento
+    ni parámetros de tracking; youtu.be y /shorts/ pasan a watch?v=
+    Una URL que no se puede parsear (p. ej. "http://[abc") queda tal cual
+    """
+    try:
+        parts = _split_url(url)
+    except ValueError:
+        return url.strip()
+    host = (parts.hostname or "").lower().rstrip(".")
+    for prefix in MOBILE_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    
+    platform = _platform_for_host(host)
+    if platform == "youtube":
+        video_id = youtube_video_id(url)
+        if video_id:
+            return f"https://youtube.com/watch?v={video_id}"
+    
+    if platform in PATH_ONLY_PLATFORMS:
+        query = ""
     else:
-        return "generic"
\ No newline at end of file
+        platform_tracking = PLATFORM_TRACKING_PARAMS.get(platform, ())
+        params = [
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in TRACKING_PARAMS
+            and key.lower() not in platform_tracking
+            and not key.lower().startswith("utm_")
+        ]
+        query = urlencode(sorted(params))
+    
+    return urlunsplit(("https", netloc, path, query, ""))
+
+def url_hash(url: str) -> str:
+    """
+    Hash estable de la URL canónica
+    """
+    return hashlib.sha256(canonicalize_url(url).encode()).hexdigest()
\ No newline at end of file
@@ -0,0 +1,198 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import uuid
+
+from sqlalchemy import select, case
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import LinkMetadata
+from app.utils.metadata import extract_metadata, canonicalize_url, url_hash
+
+settings = get_settings()
+
+class MetadataStore:
+    """
+    Metadata de links compartida entre todos los items, por URL canónica
+    - Tabla link_metadata como fuente durable, con expiración (TTL)
+    - LRU en memoria delante de la tabla
+    - Negative caching: los fallos se guardan por URL con TTL corto; un fallo
+      al refrescar una entrada buena no pisa sus datos (se siguen sirviendo)
+    - Un host se bloquea recién tras varios fallos seguidos de URLs distintas
+    - Single-flight: pedidos concurrentes de la misma URL esperan un único fetch
+    """
+
+    def __init__(self, max_size: int, ttl: int, negative_ttl: int, host_failure_threshold: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.host_failure_threshold = host_failure_threshold
+        self._lru: "OrderedDict[str, Tuple[float, uuid.UUID, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # host -> (fallos seguidos, último fallo, bloqueado hasta)
+        self._host_failures: Dict[str, Tuple[int, float, float]] = {}
+
+    async def get(self, url: str) -> Tuple[Optional[uuid.UUID], Dict[str, Any]]:
+        """
+        Retorna (id de link_metadata, metadata); si hubo error la metadata
+        trae la clave "error"
+        """
+        key = url_hash(url)
+
+        cached = self._lru_get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._load(key, url)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+            if not future.done():
+                future.cancel()
+            elif not future.cancelled():
+                # Evitar el warning de excepción no recuperada si nadie esperaba
+                future.exception()
+
+    def _lru_get(self, key: str) -> Optional[Tuple[uuid.UUID, Dict[str, Any]]]:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        expires, entry_id, data = entry
+        if expires < time.monotonic():
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return entry_id, data
+
+    def _lru_put(self, key: str, entry_id: uuid.UUID, data: Dict[str, Any], ttl: float) -> None:
+        self._lru[key] = (time.monotonic() + ttl, entry_id, data)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    def _host_blocked(self, host: str) -> bool:
+        entry = self._host_failures.get(host)
+        return entry is not None and entry[2] > time.monotonic()
+
+    def _record_failure(self, host: str) -> None:
+        """
+        Contar un fallo del host; fallos separados por más del TTL negativo no
+        se acumulan. Con host_failure_threshold seguidos se bloquea el host
+        """
+        now = time.monotonic()
+        if len(self._host_failures) >= self.max_size:
+            self._host_failures = {
+                h: entry for h, entry in self._host_failures.items()
+                if max(entry[1] + self.negative_ttl, entry[2]) > now
+            }
+        count, last, _ = self._host_failures.get(host, (0, now, 0.0))
+        count = count + 1 if now - last <= self.negative_ttl else 1
+        blocked_until = now + self.negative_ttl if count >= self.host_failure_threshold else 0.0
+        self._host_failures[host] = (count, now, blocked_until)
+
+    async def _load(self, key: str, url: str) -> Tuple[Optional[uuid.UUID], Dict[str, Any]]:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(LinkMetadata).where(LinkMetadata.url_hash == key)
+            )
+            row = result.scalar_one_or_none()
+
+        if row is not None and row.expires_at > now:
+            ttl = (row.expires_at - now).total_seconds()
+            self._lru_put(key, row.id, row.data, ttl)
+            return row.id, row.data
+
+        canonical_url = canonicalize_url(url)
+        try:
+            host = urlsplit(canonical_url).hostname or ""
+        except ValueError:
+            host = ""
+        if self._host_blocked(host):
+            if row is not None and row.ok:
+                # Entrada vencida pero buena: se sirve hasta poder refrescarla
+                self._lru_put(key, row.id, row.data, self.negative_ttl)
+                return row.id, row.data
+            return None, {"platform": "generic", "url": url, "error": "Host con fallos recientes"}
+
+        data = await extract_metadata(url)
+        if "error" not in data:
+            self._host_failures.pop(host, None)
+            values = {
+                "url_hash": key,
+                "canonical_url": canonical_url,
+                "data": data,
+                "ok": True,
+                "fetched_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl)
+            }
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    insert(LinkMetadata)
+                    .values(id=uuid.uuid4(), **values)
+                    .on_conflict_do_update(index_elements=[LinkMetadata.url_hash], set_=values)
+                    .returning(LinkMetadata.id)
+                )
+                entry_id = result.scalar_one()
+                await db.commit()
+            self._lru_put(key, entry_id, data, self.ttl)
+            return entry_id, data
+
+        self._record_failure(host)
+        # Fallo: una fila nueva queda como negativa (ok=False); si la fila ya
+        # tenía datos buenos (acá o en otro worker) solo se corre expires_at,
+        # así los items que la comparten siguen viendo la metadata buena
+        insert_stmt = insert(LinkMetadata).values(
+            id=uuid.uuid4(),
+            url_hash=key,
+            canonical_url=canonical_url,
+            data=data,
+            ok=False,
+            fetched_at=now,
+            expires_at=now + timedelta(seconds=self.negative_ttl)
+        )
+        excluded = insert_stmt.excluded
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                insert_stmt
+                .on_conflict_do_update(
+                    index_elements=[LinkMetadata.url_hash],
+                    set_={
+                        "data": case((LinkMetadata.ok, LinkMetadata.data), else_=excluded.data),
+                        "fetched_at": case((LinkMetadata.ok, LinkMetadata.fetched_at), else_=excluded.fetched_at),
+                        "expires_at": excluded.expires_at
+                    }
+                )
+                .returning(LinkMetadata.id, LinkMetadata.data, LinkMetadata.ok)
+            )
+            entry_id, stored, ok = result.one()
+            await db.commit()
+
+        if ok:
+            self._lru_put(key, entry_id, stored, self.negative_ttl)
+            return entry_id, stored
+        self._lru_put(key, entry_id, data, self.negative_ttl)
+        return entry_id, data
+
+metadata_store = MetadataStore(
+    max_size=settings.METADATA_CACHE_SIZE,
+    ttl=settings.METADATA_TTL_SECONDS,
+    negative_ttl=settings.METADATA_NEGATIVE_TTL_SECONDS,
+    host_failure_threshold=settings.METADATA_HOST_FAILURE_THRESHOLD
+)
\ No newline at end of file
@@ -0,0 +1,93 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, List, Tuple
+import uuid
+
+MAX_BIGINT = 2 ** 63 - 1
+
+def _cursor_uuid(value: Any) -> uuid.UUID:
+    # uuid.UUID con algo que no es str lanza AttributeError, no ValueError
+    if not isinstance(value, str):
+        raise ValueError("Cursor inválido")
+    return uuid.UUID(value)
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica la posición de paginación como un cursor opaco para el cliente
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Decodifica un cursor generado por encode_cursor
+    Lanza ValueError si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    
+    if not isinstance(values, list):
+        raise ValueError("Cursor inválido")
+    return values
+
+def encode_keyset_cursor(created_at: datetime, entity_id: uuid.UUID) -> str:
+    """
+    Cursor de listados ordenados por (created_at, id)
+    """
+    return encode_cursor([created_at.isoformat(), str(entity_id)])
+
+def decode_keyset_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decodifica un cursor de encode_keyset_cursor
+    Lanza ValueError si el cursor no es válido
+    """
+    values = decode_cursor(cursor)
+    try:
+        created_at, entity_id = values
+        created_at, entity_id = datetime.fromisoformat(created_at), _cursor_uuid(entity_id)
+    except (TypeError, ValueError):
+        raise ValueError("Cursor inválido")
+    if created_at.tzinfo is not None:
+        # Las columnas son timestamp sin zona: asyncpg rechaza comparar con una fecha con zona
+        raise ValueError("Cursor inválido")
+    return created_at, entity_id
+
+def encode_score_cursor(score: float, entity_id: uuid.UUID) -> str:
+    """
+    Cursor de resultados ordenados por (relevancia, id)
+    """
+    return encode_cursor([score, str(entity_id)])
+
+def decode_score_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    """
+    Decodifica un cursor de encode_score_cursor
+    Lanza ValueError si el cursor no es válido
+    """
+    values = decode_cursor(cursor)
+    try:
+        score, entity_id = values
+        if type(score) not in (int, float) or not math.isfinite(score):
+            raise ValueError("Cursor inválido")
+        return float(score), _cursor_uuid(entity_id)
+    except (TypeError, ValueError):
+        raise ValueError("Cursor inválido")
+
+def decode_change_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Decodifica el cursor (change_txid, change_seq) del feed de sync; los
+    cursores anteriores a change_txid solo traen change_seq (filas con txid 0)
+    Lanza ValueError si el cursor no es válido
+    """
+    values = decode_cursor(cursor)
+    if len(values) == 1:
+        values = [0, *values]
+    if len(values) != 2 or not all(
+        type(value) is int and 0 <= value <= MAX_BIGINT for value in values
+    ):
+        raise ValueError("Cursor inválido")
+    return values[0], values[1]
\ No newline at end of file
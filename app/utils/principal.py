@@ -0,0 +1,73 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+import uuid
+
+from sqlalchemy import event
+
+from app.config import get_settings
+from app.models import User
+
+settings = get_settings()
+
+class Principal(NamedTuple):
+    """Usuario autenticado sin cargar el modelo ORM completo"""
+    id: uuid.UUID
+    username: str
+    email: str
+
+class PrincipalCache:
+    """
+    Cache por worker (LRU + TTL) de principals, por subject del JWT
+    El TTL es menor que la vida del token; los cambios hechos con el ORM
+    invalidan la entrada al instante (ver listeners al final del módulo)
+    """
+
+    def __init__(self, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+
+    def get(self, subject: str) -> Optional[Principal]:
+        entry = self._entries.get(subject)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[subject]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, subject: str, principal: Principal) -> None:
+        self._entries[subject] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        self._entries.pop(subject, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE
+)
+
+def invalidate_principal(user_id: uuid.UUID) -> None:
+    principal_cache.invalidate(str(user_id))
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
\ No newline at end of file
@@ -0,0 +1,116 @@
+from typing import Any, Iterable, Mapping, Optional, Sequence
+import uuid
+
+import orjson
+from fastapi import Response
+from sqlalchemy import Select, func, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models import Item, Collection, LinkMetadata
+from app.utils.wire import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, pack, wire_format
+
+class RowLayout:
+    """
+    Disposición precompilada de columnas -> claves JSON para el camino de lectura
+    Se seleccionan solo esas columnas como filas Core (sin hidratar el ORM ni
+    validar con Pydantic) y cada fila se convierte en dict con un zip
+    orjson codifica UUID y datetime de forma nativa, con el mismo formato ISO
+    que las respuestas de Pydantic; MessagePack, en su forma binaria compacta
+    """
+
+    def __init__(self, columns: Mapping[str, ColumnElement]):
+        self.keys = tuple(columns)
+        self.columns = tuple(column.label(key) for key, column in columns.items())
+
+    def select(self, *extra: ColumnElement) -> Select:
+        # Las columnas extra (por ejemplo change_seq) van al final; zip las
+        # descarta al serializar
+        return select(*self.columns, *extra)
+
+    def to_dict(self, row: Sequence[Any]) -> dict:
+        return dict(zip(self.keys, row))
+
+    def to_dicts(self, rows: Iterable[Sequence[Any]]) -> list:
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in rows]
+
+# Mismos campos que ItemResponse
+ITEM_LAYOUT = RowLayout({
+    "id": Item.id,
+    "collection_id": Item.collection_id,
+    "url": Item.url,
+    "title": Item.title,
+    "description": Item.description,
+    "thumbnail_url": Item.thumbnail_url,
+    "platform": Item.platform,
+    "created_by": Item.created_by,
+    "version": Item.version,
+    "created_at": Item.created_at,
+    "updated_at": Item.updated_at,
+    "deleted_at": Item.deleted_at,
+    "item_metadata": func.coalesce(LinkMetadata.data, Item.own_metadata),
+    "enrichment_status": Item.enrichment_status
+})
+
+# Mismos campos que CollectionResponse
+COLLECTION_LAYOUT = RowLayout({
+    "id": Collection.id,
+    "connection_id": Collection.connection_id,
+    "name": Collection.name,
+    "icon": Collection.icon,
+    "created_by": Collection.created_by,
+    "version": Collection.version,
+    "created_at": Collection.created_at,
+    "updated_at": Collection.updated_at,
+    "deleted_at": Collection.deleted_at
+})
+
+# Mismos campos que serialize_item del feed de sync (las carpetas usan COLLECTION_LAYOUT)
+ITEM_SYNC_LAYOUT = RowLayout({
+    "id": Item.id,
+    "collection_id": Item.collection_id,
+    "url": Item.url,
+    "title": Item.title,
+    "description": Item.description,
+    "thumbnail_url": Item.thumbnail_url,
+    "platform": Item.platform,
+    "created_by": Item.created_by,
+    "version": Item.version,
+    "created_at": Item.created_at,
+    "updated_at": Item.updated_at,
+    "deleted_at": Item.deleted_at
+})
+
+def _json_default(value: Any) -> Any:
+    # asyncpg devuelve su propio UUID (subclase de uuid.UUID) y orjson solo
+    # serializa el tipo exacto
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Tipo no serializable en JSON: {type(value).__name__}")
+
+class EncodedResponse(Response):
+    """
+    Respuesta codificada con orjson, sin pasar por jsonable_encoder, o con
+    MessagePack si la ruta (MsgPackRoute) lo negoció con el cliente
+    """
+    media_type = JSON_MEDIA_TYPE
+
+    def __init__(self, content: Any, *args: Any, **kwargs: Any):
+        self.media_type = wire_format.get()
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if self.media_type == MSGPACK_MEDIA_TYPE:
+            return pack(content)
+        return orjson.dumps(content, default=_json_default)
+
+def encoded_response(content: Any, response: Optional[Response] = None) -> EncodedResponse:
+    """
+    Respuesta ya codificada en el formato negociado; conserva los headers
+    que el handler puso en `response` (ETag, Last-Modified...), que FastAPI
+    no copia al devolver una Response directamente
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return EncodedResponse(content, headers=headers)
\ No newline at end of file
@@ -0,0 +1,298 @@
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import uuid
+
+from sqlalchemy import select, delete, update, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models import SyncLog, SyncLogCursor, SyncOperation
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock: con varios workers, un solo proceso hace el mantenimiento a la vez
+MAINTENANCE_LOCK_KEY = 0x73796E63
+
+# Nombre del cursor de la compactación en sync_log_cursors
+COMPACTION_CURSOR = "compaction"
+
+BOUND_PATTERN = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+def month_start(moment: datetime, offset: int = 0) -> datetime:
+    """Primer instante del mes de `moment`, corrido `offset` meses"""
+    months = moment.year * 12 + moment.month - 1 + offset
+    return datetime(months // 12, months % 12 + 1, 1)
+
+def partition_name(month: datetime) -> str:
+    return f"sync_log_p{month:%Y%m}"
+
+def parse_bound(value: str) -> Optional[datetime]:
+    """Límite de una partición ('2026-10-01 00:00:00'), o None para MINVALUE/MAXVALUE"""
+    value = value.strip("'")
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value)
+
+async def list_partitions(db: AsyncSession) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """(nombre, desde, hasta) de cada partición de rango; la DEFAULT no se incluye"""
+    result = await db.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'sync_log'::regclass"
+    ))
+    partitions = []
+    for name, bound in result:
+        match = BOUND_PATTERN.search(bound or "")
+        if match:
+            partitions.append((name, parse_bound(match.group(1)), parse_bound(match.group(2))))
+    return partitions
+
+async def try_lock(db: AsyncSession) -> bool:
+    """Advisory lock de la transacción actual; False si otro proceso lo tiene"""
+    return bool(await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}))
+
+class SyncLogMaintenance:
+    """
+    Tarea periódica sobre sync_log:
+    - crea por adelantado las particiones mensuales de los próximos meses
+    - borra (o separa para archivar) las particiones fuera de la retención
+    - compacta las operaciones reemplazadas de cada entidad
+    - borra los resultados guardados para reintentos (sync_operations) vencidos
+
+    La compactación avanza por lotes en orden de (server_timestamp, id), con
+    una transacción corta por lote; los writers solo insertan filas nuevas y
+    no compiten por las filas que se compactan. El cursor se guarda en
+    sync_log_cursors en la misma transacción que cada lote
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.partitions_created = 0
+        self.partitions_removed = 0
+        self.compacted = 0
+        self.operations_pruned = 0
+        self.last_run: Optional[datetime] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "partitions_created": self.partitions_created,
+            "partitions_removed": self.partitions_removed,
+            "compacted": self.compacted,
+            "operations_pruned": self.operations_pruned,
+            "last_run": self.last_run.isoformat() if self.last_run else None
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Error en el mantenimiento de sync_log")
+            await asyncio.sleep(settings.SYNC_LOG_MAINTENANCE_SECONDS)
+
+    async def run_once(self) -> None:
+        now = datetime.utcnow()
+        await self.ensure_partitions(now)
+        await self.expire_partitions(now)
+        await self.compact(now)
+        await self.prune_operations(now)
+        self.last_run = now
+
+    async def ensure_partitions(self, now: datetime) -> None:
+        """Particiones del mes actual y de los SYNC_LOG_PARTITIONS_AHEAD siguientes"""
+        async with AsyncSessionLocal() as db:
+            partitions = await list_partitions(db)
+        covered_until = max((upper for _, _, upper in partitions if upper is not None), default=None)
+
+        for offset in range(settings.SYNC_LOG_PARTITIONS_AHEAD + 1):
+            start = month_start(now, offset)
+            end = month_start(now, offset + 1)
+            if covered_until is not None and start < covered_until:
+                continue  # ya cubierto (p. ej. por la partición heredada de la migración)
+            created = await self._ddl(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF sync_log "
+                f"FOR VALUES FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+            )
+            self.partitions_created += created
+
+    async def expire_partitions(self, now: datetime) -> None:
+        """Particiones que terminan antes del inicio de la retención"""
+        cutoff = now - timedelta(days=settings.SYNC_LOG_RETENTION_DAYS)
+        async with AsyncSessionLocal() as db:
+            partitions = await list_partitions(db)
+
+        for name, _, upper in partitions:
+            if upper is None or upper > cutoff:
+                continue
+            if settings.SYNC_LOG_RETENTION_MODE == "detach":
+                # Queda como tabla suelta: se archiva (pg_dump) y se borra aparte
+                removed = await self._ddl(f"ALTER TABLE sync_log DETACH PARTITION {name}")
+            else:
+                removed = await self._ddl(f"DROP TABLE {name}")
+            if removed:
+                logger.info("Partición %s de sync_log retirada (%s)", name, settings.SYNC_LOG_RETENTION_MODE)
+            self.partitions_removed += removed
+
+    async def _ddl(self, statement: str) -> bool:
+        """
+        DDL de particiones con lock_timeout: toma un lock exclusivo sobre
+        sync_log, así que si hay que esperar a otras transacciones se abandona
+        y se reintenta en la próxima vuelta en lugar de frenar a los writers
+        """
+        async with AsyncSessionLocal() as db:
+            if not await try_lock(db):
+                return False
+            await db.execute(text(f"SET LOCAL lock_timeout = {int(settings.SYNC_LOG_LOCK_TIMEOUT_MS)}"))
+            try:
+                await db.execute(text(statement))
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.warning("No se pudo ejecutar %r: %s", statement, e)
+                return False
+        return True
+
+    async def compact(self, now: datetime) -> None:
+        """Compactar por lotes hasta alcanzar el límite de antigüedad"""
+        cutoff = now - timedelta(hours=settings.SYNC_LOG_COMPACT_AFTER_HOURS)
+        while True:
+            async with AsyncSessionLocal() as db:
+                if not await try_lock(db):
+                    return
+                cursor = await load_cursor(db, COMPACTION_CURSOR)
+                processed, removed, cursor = await compact_batch(db, cursor, cutoff)
+                if cursor is not None:
+                    await save_cursor(db, COMPACTION_CURSOR, cursor)
+                await db.commit()
+            self.compacted += removed
+            if processed < settings.SYNC_LOG_COMPACTION_BATCH_SIZE:
+                return
+            await asyncio.sleep(settings.SYNC_LOG_COMPACTION_PAUSE_SECONDS)
+
+    async def prune_operations(self, now: datetime) -> None:
+        """Resultados de operaciones fuera de la ventana de reintentos, por lotes"""
+        cutoff = now - timedelta(days=settings.SYNC_OPERATION_RETENTION_DAYS)
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    delete(SyncOperation)
+                    .where(SyncOperation.id.in_(
+                        select(SyncOperation.id)
+                        .where(SyncOperation.created_at < cutoff)
+                        .limit(settings.SYNC_LOG_COMPACTION_BATCH_SIZE)
+                    ))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            self.operations_pruned += result.rowcount
+            if result.rowcount < settings.SYNC_LOG_COMPACTION_BATCH_SIZE:
+                return
+            await asyncio.sleep(settings.SYNC_LOG_COMPACTION_PAUSE_SECONDS)
+
+async def load_cursor(db: AsyncSession, name: str) -> Optional[Tuple[datetime, uuid.UUID]]:
+    row = (await db.execute(
+        select(SyncLogCursor.server_timestamp, SyncLogCursor.row_id).where(SyncLogCursor.name == name)
+    )).first()
+    return (row.server_timestamp, row.row_id) if row else None
+
+async def save_cursor(db: AsyncSession, name: str, cursor: Tuple[datetime, uuid.UUID]) -> None:
+    statement = pg_insert(SyncLogCursor).values(name=name, server_timestamp=cursor[0], row_id=cursor[1], updated_at=datetime.utcnow())
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[SyncLogCursor.name],
+        set_={
+            "server_timestamp": statement.excluded.server_timestamp,
+            "row_id": statement.excluded.row_id,
+            "updated_at": statement.excluded.updated_at
+        }
+    ))
+
+async def compact_batch(
+    db: AsyncSession,
+    cursor: Optional[Tuple[datetime, uuid.UUID]],
+    cutoff: datetime
+) -> Tuple[int, int, Optional[Tuple[datetime, uuid.UUID]]]:
+    """
+    Un lote de compactación: para cada entidad tocada por las filas del lote,
+    la última operación hasta el final del lote absorbe los datos de las
+    anteriores (que se borran), así queda el estado final de la entidad
+    La fila que queda es un "create" si la cadena empezó con uno, o solo el
+    "delete" (con sus datos) si la cadena termina borrando la entidad
+    Devuelve (filas recorridas, filas borradas, nuevo cursor)
+    """
+    query = (
+        select(SyncLog.server_timestamp, SyncLog.id, SyncLog.entity_id)
+        .where(SyncLog.server_timestamp < cutoff)
+        .order_by(SyncLog.server_timestamp, SyncLog.id)
+        .limit(settings.SYNC_LOG_COMPACTION_BATCH_SIZE)
+    )
+    if cursor is not None:
+        query = query.where(tuple_(SyncLog.server_timestamp, SyncLog.id) > cursor)
+    candidates = (await db.execute(query)).all()
+    if not candidates:
+        return 0, 0, None
+    last = (candidates[-1].server_timestamp, candidates[-1].id)
+
+    # Historial de esas entidades hasta el final del lote, incluidas filas
+    # anteriores al cursor que quedaron reemplazadas por operaciones nuevas
+    result = await db.execute(
+        select(SyncLog.server_timestamp, SyncLog.id, SyncLog.entity_id, SyncLog.operation, SyncLog.data)
+        .where(
+            SyncLog.entity_id.in_({row.entity_id for row in candidates}),
+            tuple_(SyncLog.server_timestamp, SyncLog.id) <= last
+        )
+        .order_by(SyncLog.server_timestamp, SyncLog.id)
+    )
+    history: Dict[uuid.UUID, list] = {}
+    for row in result:
+        history.setdefault(row.entity_id, []).append(row)
+
+    superseded = []
+    merged_rows = []
+    for rows in history.values():
+        if len(rows) < 2:
+            continue
+        keeper = rows[-1]
+        if keeper.operation == "delete":
+            operation, merged = "delete", keeper.data
+        else:
+            operation = "create" if rows[0].operation == "create" else keeper.operation
+            merged = {}
+            for row in rows:
+                if isinstance(row.data, dict):
+                    merged.update(row.data)
+        if merged != keeper.data or operation != keeper.operation:
+            merged_rows.append({
+                "server_timestamp": keeper.server_timestamp,
+                "id": keeper.id,
+                "operation": operation,
+                "data": merged
+            })
+        superseded.extend((row.server_timestamp, row.id) for row in rows[:-1])
+
+    if merged_rows:
+        # UPDATE por clave primaria, uno por entidad en un solo executemany
+        await db.execute(update(SyncLog), merged_rows)
+    if superseded:
+        await db.execute(
+            delete(SyncLog)
+            .where(tuple_(SyncLog.server_timestamp, SyncLog.id).in_(superseded))
+            .execution_options(synchronize_session=False)
+        )
+    return len(candidates), len(superseded), last
+
+sync_log_maintenance = SyncLogMaintenance()
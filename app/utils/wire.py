@@ -0,0 +1,115 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+import uuid
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# Tipo ext de MessagePack para UUID: 16 bytes crudos (18 en total contra 38 del texto)
+# Los datetime van como Timestamp estándar (ext -1): 6 a 15 bytes contra ~28 del ISO
+UUID_EXT_TYPE = 1
+
+# Formato de respuesta negociado para la request en curso (lo fija MsgPackRoute)
+wire_format: ContextVar[str] = ContextVar("wire_format", default=JSON_MEDIA_TYPE)
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, value.bytes)
+    if isinstance(value, datetime):
+        # Las columnas DateTime guardan hora UTC sin zona
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return msgpack.Timestamp.from_datetime(value)
+    raise TypeError(f"Tipo no serializable en MessagePack: {type(value).__name__}")
+
+def pack(content: Any) -> bytes:
+    return msgpack.packb(content, default=_encode_default, use_bin_type=True)
+
+def _decode_ext(code: int, data: bytes) -> Any:
+    if code == UUID_EXT_TYPE:
+        return str(uuid.UUID(bytes=data))
+    return msgpack.ExtType(code, data)
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, msgpack.Timestamp):
+        return value.to_datetime().replace(tzinfo=None).isoformat()
+    return value
+
+def unpack(body: bytes) -> Any:
+    """
+    Cuerpo MessagePack con los mismos tipos que daría el JSON equivalente
+    (UUID y timestamps como texto): `data` de sync termina en columnas JSONB
+    """
+    return msgpack.unpackb(
+        body,
+        ext_hook=_decode_ext,
+        object_hook=lambda obj: {key: _plain(value) for key, value in obj.items()},
+        list_hook=lambda items: [_plain(value) for value in items],
+        raw=False
+    )
+
+def is_msgpack(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";", 1)[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+def accepts_msgpack(accept: Optional[str]) -> bool:
+    """Accept pide MessagePack con q > 0 (JSON sigue siendo el formato por defecto)"""
+    if not accept:
+        return False
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if media_type.lower() not in MSGPACK_MEDIA_TYPES:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+class MsgPackRequest(Request):
+    """Request con cuerpo MessagePack que FastAPI recibe como JSON ya decodificado"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = unpack(await self.body())
+        return self._json
+
+class MsgPackRoute(APIRoute):
+    """
+    Rutas que además de JSON aceptan cuerpos MessagePack (Content-Type) y
+    responden en MessagePack si el cliente lo pide (Accept); las respuestas
+    de encoded_response y EncodedResponse siguen el formato negociado
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type")):
+                # FastAPI solo decodifica cuerpos JSON: se presenta como tal
+                scope = dict(request.scope)
+                scope["headers"] = [
+                    (name, value) for name, value in request.scope["headers"] if name != b"content-type"
+                ] + [(b"content-type", JSON_MEDIA_TYPE.encode())]
+                request = MsgPackRequest(scope, request.receive)
+
+            media_type = MSGPACK_MEDIA_TYPE if accepts_msgpack(request.headers.get("accept")) else JSON_MEDIA_TYPE
+            token = wire_format.set(media_type)
+            try:
+                response = await handler(request)
+            finally:
+                wire_format.reset(token)
+            response.headers.add_vary_header("Accept")
+            return response
+
+        return route_handler
@@ -0,0 +1,158 @@
+"""
+Verifica con EXPLAIN que las queries de las rutas usan índices, contra una
+base migrada (alembic upgrade head)
+
+Uso:
+    python -m benchmarks.explain_queries [--url postgresql+asyncpg://...]
+
+Las queries se capturan llamando a los repositorios con una sesión que solo
+registra las sentencias, así el chequeo sigue al código y no a una copia
+Se explican con enable_seqscan = off: en tablas chicas Postgres prefiere un
+Seq Scan aunque haya índice, y así solo aparece uno cuando no hay índice
+utilizable. Sale con código 1 si alguna query recorre una tabla completa
+El mismo chequeo corre en pytest (tests/test_explain_queries.py) cuando se
+define TEST_DATABASE_URL
+"""
+import argparse
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import or_, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import repositories
+from app.config import get_settings
+from app.models import Collection, Connection, Item
+from app.utils.access import get_memberships, resolve_item
+from app.utils.serialization import COLLECTION_LAYOUT, ITEM_SYNC_LAYOUT
+
+class RecordingSession:
+    """Sesión falsa: guarda cada sentencia y devuelve un resultado vacío"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return EmptyResult()
+
+    async def scalar(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return None
+
+class EmptyResult:
+    def __iter__(self):
+        return iter(())
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+def route_queries():
+    """(nombre, corrutina que recibe la sesión) de las queries de las rutas"""
+    user_id, other_id = sorted((uuid.uuid4(), uuid.uuid4()))
+    some_id = uuid.uuid4()
+    keyset = (datetime(2024, 1, 1), some_id)
+    url_hash = "0" * 64
+
+    async def sync_changes(db):
+        # Mismas sentencias que GET /api/sync/changes
+        is_member = or_(Connection.user_id_1 == user_id, Connection.user_id_2 == user_id)
+        await db.execute(
+            COLLECTION_LAYOUT.select(Collection.change_txid, Collection.change_seq)
+            .join(Connection, Connection.id == Collection.connection_id)
+            .where(is_member, tuple_(Collection.change_txid, Collection.change_seq) > (0, 0), Collection.change_txid < 1000)
+            .order_by(Collection.change_txid, Collection.change_seq)
+            .limit(501)
+        )
+        await db.execute(
+            ITEM_SYNC_LAYOUT.select(Item.change_txid, Item.change_seq)
+            .join(Collection, Collection.id == Item.collection_id)
+            .join(Connection, Connection.id == Collection.connection_id)
+            .where(is_member, tuple_(Item.change_txid, Item.change_seq) > (0, 0), Item.change_txid < 1000)
+            .order_by(Item.change_txid, Item.change_seq)
+            .limit(501)
+        )
+
+    return [
+        ("get_user_by_id", lambda db: repositories.get_user_by_id(db, user_id)),
+        ("get_user_by_email", lambda db: repositories.get_user_by_email(db, "a@example.com")),
+        ("get_user_by_username", lambda db: repositories.get_user_by_username(db, "a")),
+        ("get_connection_between", lambda db: repositories.get_connection_between(db, user_id, other_id)),
+        ("list_connections_for_user", lambda db: repositories.list_connections_for_user(db, user_id)),
+        ("get_memberships", lambda db: get_memberships(db, user_id)),
+        ("resolve_item", lambda db: resolve_item(db, user_id, some_id)),
+        ("list_collections_by_connection", lambda db: repositories.list_collections_by_connection(db, some_id, 51, keyset)),
+        ("get_collection_state", lambda db: repositories.get_collection_state(db, some_id)),
+        ("get_connection_collections_state", lambda db: repositories.get_connection_collections_state(db, some_id)),
+        ("list_items_by_collection", lambda db: repositories.list_items_by_collection(db, some_id, 51, keyset)),
+        ("find_duplicate_item", lambda db: repositories.find_duplicate_item(db, some_id, url_hash)),
+        ("find_duplicate_items", lambda db: repositories.find_duplicate_items(db, [(some_id, url_hash)])),
+        ("get_item_state", lambda db: repositories.get_item_state(db, some_id)),
+        ("get_collection_items_state", lambda db: repositories.get_collection_items_state(db, some_id)),
+        ("existing_url_hashes", lambda db: repositories.existing_url_hashes(db, some_id, [url_hash])),
+        ("search_items fts", lambda db: repositories.search_items(db, [some_id], "video gatos", 21, None, None)),
+        ("search_items trgm", lambda db: repositories.search_items(db, [some_id], "vdeo", 21, None, None)),
+        ("get_import_job", lambda db: repositories.get_import_job(db, some_id)),
+        ("count_import_enrichment", lambda db: repositories.count_import_enrichment(db, some_id)),
+        ("get_refresh_token_for_update", lambda db: repositories.get_refresh_token_for_update(db, url_hash)),
+        ("revoke_refresh_family", lambda db: repositories.revoke_refresh_family(db, some_id, datetime.utcnow())),
+        ("get_sync_operation", lambda db: repositories.get_sync_operation(db, user_id, some_id)),
+        ("get_sync_operations", lambda db: repositories.get_sync_operations(db, user_id, [some_id, other_id])),
+        ("sync_changes", sync_changes),
+    ]
+
+def seq_scans(plan: dict) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", ()):
+        found.extend(seq_scans(child))
+    return found
+
+async def explain_route_queries(url: str) -> list:
+    """(nombre, tablas recorridas con Seq Scan) por cada sentencia de las rutas"""
+    engine = create_async_engine(url)
+    dialect = engine.dialect
+    results = []
+    try:
+        async with engine.connect() as conn:
+            # Conexión asyncpg directa: EXPLAIN con los mismos parámetros posicionales
+            # que usa la aplicación
+            raw = (await conn.get_raw_connection()).driver_connection
+            await raw.execute("SET enable_seqscan = off")
+            for name, call in route_queries():
+                db = RecordingSession()
+                try:
+                    await call(db)
+                except Exception:
+                    pass  # el resultado vacío puede romper al handler; la sentencia ya quedó registrada
+                for statement in db.statements:
+                    compiled = statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+                    params = [compiled.params[key] for key in compiled.positiontup]
+                    plan = await raw.fetchval(f"EXPLAIN (FORMAT JSON) {compiled.string}", *params)
+                    if isinstance(plan, str):
+                        # Sin el codec json que registra el dialecto de SQLAlchemy llega como texto
+                        plan = json.loads(plan)
+                    results.append((name, seq_scans(plan[0]["Plan"])))
+    finally:
+        await engine.dispose()
+    return results
+
+async def run(url: str) -> int:
+    failures = 0
+    for name, tables in await explain_route_queries(url):
+        failures += bool(tables)
+        print(f"{'SEQ SCAN' if tables else 'ok':<9} {name:<34} {', '.join(tables)}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=get_settings().DATABASE_URL)
+    args = parser.parse_args()
+    failures = asyncio.run(run(args.url))
+    raise SystemExit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
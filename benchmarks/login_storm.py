@@ -0,0 +1,86 @@
+"""
+Tormenta de logins contra un servidor corriendo: mide el throughput de login
+y la latencia de un endpoint sin relación (/health por defecto) mientras tanto
+
+Uso:
+    python -m benchmarks.login_storm --email user@example.com --password secreto \\
+        [--url http://localhost:8000] [--concurrency 50] [--seconds 20] [--probe /health]
+
+El usuario debe existir. Conviene correrlo dos veces (antes y después del
+cambio, o variando PASSWORD_HASH_WORKERS / PASSWORD_BCRYPT_ROUNDS)
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import aiohttp
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def login_loop(session, url: str, payload: dict, deadline: float, statuses: Counter, timings: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with session.post(f"{url}/api/auth/login", json=payload) as resp:
+            await resp.read()
+            statuses[resp.status] += 1
+        timings.append((time.perf_counter() - start) * 1000)
+
+async def probe_loop(session, url: str, deadline: float, interval: float, timings: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        async with session.get(url) as resp:
+            await resp.read()
+        timings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+async def run(args) -> None:
+    payload = {"email": args.email, "password": args.password}
+    connector = aiohttp.TCPConnector(limit=args.concurrency + 1)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Latencia base del probe sin carga
+        baseline = []
+        await probe_loop(session, args.url + args.probe, time.perf_counter() + 2, args.interval, baseline)
+
+        statuses = Counter()
+        login_timings = []
+        probe_timings = []
+        deadline = time.perf_counter() + args.seconds
+        started = time.perf_counter()
+        await asyncio.gather(
+            probe_loop(session, args.url + args.probe, deadline, args.interval, probe_timings),
+            *(
+                login_loop(session, args.url, payload, deadline, statuses, login_timings)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    ok = statuses.get(200, 0)
+    print(f"logins: {sum(statuses.values())} en {elapsed:.1f}s, {ok / elapsed:.1f} ok/s, códigos {dict(statuses)}")
+    if login_timings:
+        print(f"login ms  p50 {percentile(login_timings, 0.5):8.1f}  p99 {percentile(login_timings, 0.99):8.1f}")
+    for name, timings in (("probe sin carga", baseline), ("probe en tormenta", probe_timings)):
+        if timings:
+            print(
+                f"{name:<18} n={len(timings):<5} p50 {statistics.median(timings):8.1f}  "
+                f"p99 {percentile(timings, 0.99):8.1f}  max {max(timings):8.1f} ms"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--probe", default="/health")
+    parser.add_argument("--interval", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Compara el parser anterior (BeautifulSoup sobre el HTML completo) con el
+parser incremental de app/utils/metadata.py sobre un corpus de páginas guardadas
+
+Uso:
+    python -m benchmarks.metadata_parser ruta/al/corpus [--repeat 5]
+
+El corpus es un directorio con archivos .html (por ejemplo guardados con
+`curl -L -o pagina.html URL`)
+"""
+import argparse
+import codecs
+import pathlib
+import statistics
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from app.config import get_settings
+from app.utils.metadata import HeadMetadataParser
+
+settings = get_settings()
+
+def parse_soup(raw: bytes) -> dict:
+    # Camino anterior: resp.text() + árbol completo de BeautifulSoup
+    soup = BeautifulSoup(raw.decode("utf-8", errors="replace"), "html.parser")
+    og_title = soup.find("meta", property="og:title")
+    og_description = soup.find("meta", property="og:description")
+    og_image = soup.find("meta", property="og:image")
+    return {
+        "title": og_title["content"] if og_title else None,
+        "description": og_description["content"] if og_description else None,
+        "thumbnail_url": og_image["content"] if og_image else None
+    }
+
+def parse_stream(raw: bytes) -> dict:
+    # Camino nuevo: mismos chunks y presupuesto de bytes que extract_metadata
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parser = HeadMetadataParser()
+    chunk_size = settings.METADATA_CHUNK_BYTES
+    read = 0
+    for start in range(0, len(raw), chunk_size):
+        chunk = raw[start:start + chunk_size]
+        read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.done or read >= settings.METADATA_MAX_BYTES:
+            break
+    return parser.result("https://example.com/")
+
+def measure(parse, pages: list, repeat: int) -> dict:
+    timings = []
+    peaks = []
+    for raw in pages:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(raw)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best * 1000)
+
+        tracemalloc.start()
+        parse(raw)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    ordered = sorted(timings)
+    return {
+        "ms_median": statistics.median(timings),
+        "ms_p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "ms_total": sum(timings),
+        "peak_kb_median": statistics.median(peaks),
+        "peak_kb_max": max(peaks)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", type=pathlib.Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [path.read_bytes() for path in sorted(args.corpus.glob("*.html"))]
+    if not pages:
+        raise SystemExit(f"No hay archivos .html en {args.corpus}")
+
+    total_kb = sum(len(raw) for raw in pages) / 1024
+    print(f"{len(pages)} páginas, {total_kb:.0f} KB en total\n")
+    print(f"{'parser':<12}{'ms med':>10}{'ms p95':>10}{'ms total':>12}{'KB pico med':>14}{'KB pico max':>14}")
+    for name, parse in (("soup", parse_soup), ("stream", parse_stream)):
+        result = measure(parse, pages, args.repeat)
+        print(
+            f"{name:<12}{result['ms_median']:>10.2f}{result['ms_p95']:>10.2f}{result['ms_total']:>12.1f}"
+            f"{result['peak_kb_median']:>14.0f}{result['peak_kb_max']:>14.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
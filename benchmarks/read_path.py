@@ -0,0 +1,97 @@
+"""
+Compara el camino de lectura anterior (objetos ORM -> ItemResponse con
+from_attributes -> jsonable_encoder + json) con el camino liviano de
+app/utils/serialization.py (filas Core -> dicts con RowLayout -> orjson)
+para listados de 1k/10k/100k items
+
+Uso:
+    python -m benchmarks.read_path [--sizes 1000 10000 100000] [--repeat 3]
+
+No usa base de datos: las filas se generan en memoria con la misma forma que
+devuelve la query. En el camino ORM la hidratación se aproxima construyendo
+instancias de Item, que pasan por la misma instrumentación de atributos
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models import Item
+from app.schemas import ItemResponse
+from app.utils.serialization import ITEM_LAYOUT
+
+def make_rows(count: int) -> list:
+    collection_id = uuid.uuid4()
+    created_by = uuid.uuid4()
+    start = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    rows = []
+    for n in range(count):
+        created_at = start + timedelta(seconds=n)
+        rows.append((
+            uuid.uuid4(),
+            collection_id,
+            f"https://www.youtube.com/watch?v={n:011d}",
+            f"Video {n}",
+            "Descripción de prueba con algo de texto",
+            f"https://i.ytimg.com/vi/{n:011d}/hqdefault.jpg",
+            "youtube",
+            created_by,
+            n % 5,
+            created_at,
+            created_at,
+            None,
+            {"platform": "youtube", "title": f"Video {n}", "site_name": "YouTube"},
+            "done"
+        ))
+    return rows
+
+def orm_path(rows: list) -> bytes:
+    keys = ITEM_LAYOUT.keys
+    items = []
+    for row in rows:
+        values = dict(zip(keys, row))
+        values["own_metadata"] = values.pop("item_metadata")
+        items.append(Item(**values))
+    models = [ItemResponse.model_validate(item) for item in items]
+    return JSONResponse(jsonable_encoder({"items": models, "next_cursor": None, "has_more": False})).body
+
+def lean_path(rows: list) -> bytes:
+    return orjson.dumps({"items": ITEM_LAYOUT.to_dicts(rows), "next_cursor": None, "has_more": False})
+
+def measure(path, rows: list, repeat: int) -> tuple:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = path(rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings), len(body), body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'items':>8}  {'camino':<6}{'ms med':>12}{'ms min':>12}{'KB':>10}{'x':>8}")
+    for size in args.sizes:
+        rows = make_rows(size)
+        orm = measure(orm_path, rows, args.repeat)
+        lean = measure(lean_path, rows, args.repeat)
+
+        # Misma forma de respuesta en ambos caminos
+        if json.loads(orm[3]) != json.loads(lean[3]):
+            raise SystemExit(f"Las respuestas difieren con {size} items")
+
+        for name, result in (("orm", orm), ("lean", lean)):
+            speedup = orm[0] / result[0]
+            print(f"{size:>8}  {name:<6}{result[0]:>12.1f}{result[1]:>12.1f}{result[2] / 1024:>10.0f}{speedup:>8.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
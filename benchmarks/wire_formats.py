@@ -0,0 +1,70 @@
+"""
+Bytes en el cable y CPU de codificación de una página de items en cada
+formato de respuesta: JSON (orjson) y MessagePack, sin comprimir y con gzip
+y brotli a los niveles configurados en Settings
+
+Uso:
+    python -m benchmarks.wire_formats [--sizes 50 200 1000] [--repeat 20]
+
+Las filas son las mismas que genera benchmarks.read_path (forma de
+ITEM_LAYOUT). La CPU se mide con process_time y se reporta en µs por
+respuesta: codificación + compresión, que es lo que paga el servidor
+"""
+import argparse
+import gzip
+import statistics
+import time
+
+import brotli
+import orjson
+
+from app.config import get_settings
+from app.utils.serialization import ITEM_LAYOUT
+from app.utils.wire import pack, unpack
+from benchmarks.read_path import make_rows
+
+settings = get_settings()
+
+ENCODERS = {
+    "json": orjson.dumps,
+    "msgpack": pack,
+}
+
+COMPRESSORS = {
+    "none": lambda body: body,
+    "gzip": lambda body: gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL),
+    "br": lambda body: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY),
+}
+
+def measure(encode, compress, page: dict, repeat: int) -> tuple:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        start = time.process_time()
+        body = compress(encode(page))
+        timings.append((time.process_time() - start) * 1_000_000)
+    return statistics.median(timings), len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'items':>8}  {'formato':<10}{'compresión':<12}{'bytes':>10}{'% json':>8}{'µs cpu':>10}")
+    for size in args.sizes:
+        page = {"items": ITEM_LAYOUT.to_dicts(make_rows(size)), "next_cursor": None, "has_more": False}
+
+        # Mismo contenido en ambos formatos (UUID y fechas vuelven como texto)
+        if unpack(pack(page)) != orjson.loads(orjson.dumps(page)):
+            raise SystemExit(f"MessagePack y JSON difieren con {size} items")
+
+        baseline = None
+        for format_name, encode in ENCODERS.items():
+            for compression, compress in COMPRESSORS.items():
+                cpu, length = measure(encode, compress, page, args.repeat)
+                baseline = baseline or length
+                print(f"{size:>8}  {format_name:<10}{compression:<12}{length:>10}{length / baseline * 100:>7.0f}%{cpu:>10.0f}")
+
+if __name__ == "__main__":
+    main()
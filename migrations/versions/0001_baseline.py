@@ -0,0 +1,98 @@
+"""Esquema base: el que creaba create_all antes de las migraciones
+
+Solo las tablas y columnas de los modelos originales. Todo lo agregado
+después (change_seq, metadata compartida, importaciones, búsqueda, refresh
+tokens...) va en las revisiones siguientes, así una base creada por el
+create_all original se marca y se pone al día:
+    alembic stamp 0001 && alembic upgrade head
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("username", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("avatar_url", sa.String(2048), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime())
+    )
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "connections",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id_1", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id_2", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.CheckConstraint("user_id_1 < user_id_2", name="different_users"),
+        sa.UniqueConstraint("user_id_1", "user_id_2", name="unique_connection")
+    )
+
+    op.create_table(
+        "collections",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("connection_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("connections.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("icon", sa.String(50), nullable=True),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("version", sa.Integer())
+    )
+    op.create_index("ix_collections_connection_id", "collections", ["connection_id"])
+
+    op.create_table(
+        "items",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("collection_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("collections.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("url", sa.String(2048), nullable=False),
+        sa.Column("title", sa.String(255), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("thumbnail_url", sa.String(2048), nullable=True),
+        sa.Column("platform", sa.String(100), nullable=True),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.Column("version", sa.Integer()),
+        sa.Column("item_metadata", postgresql.JSONB(), nullable=True)
+    )
+    op.create_index("ix_items_collection_id", "items", ["collection_id"])
+
+    op.create_table(
+        "sync_log",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("entity_type", sa.String(100), nullable=False),
+        sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("operation", sa.String(50), nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=False),
+        sa.Column("timestamp", sa.BigInteger(), nullable=False),
+        sa.Column("server_timestamp", sa.DateTime()),
+        sa.Column("synced", sa.Boolean()),
+        sa.Column("conflict_resolved", sa.Boolean())
+    )
+    op.create_index("ix_sync_log_user_id", "sync_log", ["user_id"])
+    op.create_index("ix_sync_log_timestamp", "sync_log", ["timestamp"])
+    op.create_index("ix_sync_log_synced", "sync_log", ["synced"])
+
+def downgrade() -> None:
+    for table in ("sync_log", "items", "collections", "connections", "users"):
+        op.drop_table(table)
@@ -0,0 +1,29 @@
+"""Secuencia global change_seq para el feed incremental de cambios
+
+En una base existente ADD COLUMN con nextval() como default reescribe la
+tabla y numera las filas actuales: el primer pull las trae todas
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("change_seq")))
+    change_seq = sa.text("nextval('change_seq')")
+    op.add_column("collections", sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default=change_seq))
+    op.add_column("items", sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default=change_seq))
+    op.create_index("ix_collections_change_seq", "collections", ["change_seq"])
+    op.create_index("ix_items_change_seq", "items", ["change_seq"])
+
+def downgrade() -> None:
+    op.drop_column("items", "change_seq")
+    op.drop_column("collections", "change_seq")
+    op.execute(sa.schema.DropSequence(sa.Sequence("change_seq")))
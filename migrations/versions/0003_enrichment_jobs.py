@@ -0,0 +1,37 @@
+"""Cola de enriquecimiento de metadata en segundo plano
+
+Los items existentes quedan con enrichment_status NULL: ya tienen (o no)
+su metadata y no se encolan
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "enrichment_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("items.id", ondelete="CASCADE"), nullable=False, unique=True),
+        sa.Column("url", sa.String(2048), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime())
+    )
+    op.create_index("ix_enrichment_jobs_status_next_attempt", "enrichment_jobs", ["status", "next_attempt_at"])
+    op.add_column("items", sa.Column("enrichment_status", sa.String(50), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column("items", "enrichment_status")
+    op.drop_table("enrichment_jobs")
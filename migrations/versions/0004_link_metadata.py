@@ -0,0 +1,39 @@
+"""Store compartido de metadata por URL canónica
+
+Los items existentes conservan su copia en item_metadata (link_metadata_id
+NULL) y las lecturas usan COALESCE(link_metadata.data, item_metadata)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "link_metadata",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("url_hash", sa.String(64), nullable=False, unique=True),
+        sa.Column("canonical_url", sa.String(2048), nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=False),
+        sa.Column("ok", sa.Boolean(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime()),
+        sa.Column("expires_at", sa.DateTime(), nullable=False)
+    )
+    op.create_index("ix_link_metadata_expires_at", "link_metadata", ["expires_at"])
+    op.add_column(
+        "items",
+        sa.Column("link_metadata_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("link_metadata.id", ondelete="SET NULL"), nullable=True)
+    )
+    op.create_index("ix_items_link_metadata_id", "items", ["link_metadata_id"])
+
+def downgrade() -> None:
+    op.drop_column("items", "link_metadata_id")
+    op.drop_table("link_metadata")
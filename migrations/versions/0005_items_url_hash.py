@@ -0,0 +1,53 @@
+"""Hash de la URL canónica de cada item, para detectar duplicados por carpeta
+
+Los items existentes se completan por lotes con la misma canonicalización
+que usa la aplicación (app.utils.metadata.url_hash); el índice se construye
+después, CONCURRENTLY, para no bloquear escrituras en items
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+def create_index() -> None:
+    # Un build concurrente fallido deja el índice INVALID: se borra y se crea de nuevo
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_items_collection_url_hash", table_name="items", if_exists=True, postgresql_concurrently=True)
+        op.create_index("ix_items_collection_url_hash", "items", ["collection_id", "url_hash"], postgresql_concurrently=True)
+
+def upgrade() -> None:
+    from app.utils.metadata import url_hash
+
+    op.add_column("items", sa.Column("url_hash", sa.String(64), nullable=True))
+
+    if op.get_context().as_sql:
+        # Sin conexión (--sql) no se puede calcular el hash en Python: correr el relleno online
+        create_index()
+        return
+
+    items = sa.table("items", sa.column("id"), sa.column("url"), sa.column("url_hash"))
+    bind = op.get_bind()
+    while True:
+        rows = bind.execute(
+            sa.select(items.c.id, items.c.url).where(items.c.url_hash.is_(None)).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            items.update().where(items.c.id == sa.bindparam("item_id")).values(url_hash=sa.bindparam("hash")),
+            [{"item_id": row.id, "hash": url_hash(row.url)} for row in rows]
+        )
+
+    create_index()
+
+def downgrade() -> None:
+    op.drop_column("items", "url_hash")
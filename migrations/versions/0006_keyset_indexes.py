@@ -0,0 +1,38 @@
+"""Índices para la paginación keyset de carpetas e items
+
+Se construyen con CREATE INDEX CONCURRENTLY (fuera de la transacción de la
+migración) para no bloquear escrituras; un build fallido deja un índice
+INVALID que se borra y se crea de nuevo al reintentar
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# nombre, tabla, columnas, predicado parcial
+INDEXES = (
+    ("ix_collections_connection_created", "collections", ["connection_id", "created_at", "id"], None),
+    ("ix_items_collection_created", "items", ["collection_id", "created_at", "id"], "deleted_at IS NULL"),
+)
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+            op.create_index(
+                name, table, columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True
+            )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
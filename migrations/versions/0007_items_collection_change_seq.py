@@ -0,0 +1,25 @@
+"""Último change_seq por carpeta (ETag de los listados de items)
+
+Índice CONCURRENTLY, sin bloquear escrituras en items; si un build anterior
+falló y dejó el índice INVALID se borra y se crea de nuevo
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_items_collection_change_seq", table_name="items", if_exists=True, postgresql_concurrently=True)
+        op.create_index("ix_items_collection_change_seq", "items", ["collection_id", "change_seq"], postgresql_concurrently=True)
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_items_collection_change_seq", table_name="items", if_exists=True, postgresql_concurrently=True)
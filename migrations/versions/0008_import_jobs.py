@@ -0,0 +1,43 @@
+"""Importaciones masivas de links y su vínculo con la cola de enriquecimiento
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("collection_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("collections.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("format", sa.String(10), nullable=False),
+        sa.Column("filename", sa.String(255), nullable=True),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("inserted", sa.Integer(), nullable=False),
+        sa.Column("duplicates", sa.Integer(), nullable=False),
+        sa.Column("invalid", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index("ix_import_jobs_user_id", "import_jobs", ["user_id"])
+    op.add_column(
+        "enrichment_jobs",
+        sa.Column("import_job_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("import_jobs.id", ondelete="SET NULL"), nullable=True)
+    )
+    op.create_index("ix_enrichment_jobs_import_job_id", "enrichment_jobs", ["import_job_id"])
+
+def downgrade() -> None:
+    op.drop_column("enrichment_jobs", "import_job_id")
+    op.drop_table("import_jobs")
@@ -0,0 +1,51 @@
+"""Búsqueda de items: columna generada search_vector e índices GIN
+
+La columna generada (STORED) reescribe la tabla items al agregarse y se
+calcula para las filas existentes, con ACCESS EXCLUSIVE sobre items (ni
+lecturas ni escrituras) mientras dura: correrla en una ventana de
+mantenimiento, como 0002. Los índices GIN se construyen después,
+CONCURRENTLY; un build fallido deja el índice INVALID y se recrea al
+reintentar. Los trigramas necesitan pg_trgm
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(platform, '') || ' ' || url), 'C')"
+)
+
+# nombre, columna, opclass
+INDEXES = (
+    ("ix_items_search_vector", "search_vector", None),
+    ("ix_items_title_trgm", "title", "gin_trgm_ops"),
+)
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column("items", sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)))
+    with op.get_context().autocommit_block():
+        for name, column, ops in INDEXES:
+            op.drop_index(name, table_name="items", if_exists=True, postgresql_concurrently=True)
+            op.create_index(
+                name, "items", [column],
+                postgresql_using="gin",
+                postgresql_ops={column: ops} if ops else {},
+                postgresql_concurrently=True
+            )
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_items_title_trgm", table_name="items", if_exists=True, postgresql_concurrently=True)
+    op.drop_column("items", "search_vector")
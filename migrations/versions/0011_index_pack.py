@@ -0,0 +1,61 @@
+"""Índices compuestos y parciales para las queries de las rutas
+
+Se construyen con CREATE INDEX CONCURRENTLY (fuera de la transacción de la
+migración) para no bloquear escrituras en tablas grandes
+Si un build concurrente falla deja un índice INVALID: se borra y se crea de
+nuevo al reintentar
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+# nombre, tabla, columnas, predicado parcial
+NEW_INDEXES = (
+    # get_connections / memberships: user_id_2 solo era la segunda columna de unique_connection
+    ("ix_connections_user_id_2", "connections", ["user_id_2"], None),
+    # Duplicados por URL: siempre sobre items activos
+    ("ix_items_active_url_hash", "items", ["collection_id", "url_hash"], "deleted_at IS NULL"),
+    # Historial por usuario y por entidad, en orden de llegada al servidor
+    ("ix_sync_log_user_server_ts", "sync_log", ["user_id", "server_timestamp"], None),
+    ("ix_sync_log_entity_server_ts", "sync_log", ["entity_id", "server_timestamp"], None),
+)
+
+# Reemplazados por los de arriba o por un compuesto con la misma columna inicial
+OLD_INDEXES = (
+    ("ix_items_collection_url_hash", "items", ["collection_id", "url_hash"], None),
+    ("ix_items_collection_id", "items", ["collection_id"], None),  # prefijo de ix_items_collection_change_seq
+    ("ix_sync_log_user_id", "sync_log", ["user_id"], None),
+    ("ix_sync_log_timestamp", "sync_log", ["timestamp"], None),  # ninguna query filtra por el timestamp del cliente
+    ("ix_sync_log_synced", "sync_log", ["synced"], None),
+)
+
+def create_indexes(indexes) -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in indexes:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+            op.create_index(
+                name, table, columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True
+            )
+
+def drop_indexes(indexes) -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in indexes:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+def upgrade() -> None:
+    create_indexes(NEW_INDEXES)
+    drop_indexes(OLD_INDEXES)
+
+def downgrade() -> None:
+    create_indexes(OLD_INDEXES)
+    drop_indexes(NEW_INDEXES)
@@ -0,0 +1,117 @@
+"""sync_log particionada por rango de server_timestamp (una partición por mes)
+
+La tabla existente no se copia: se convierte en la partición sync_log_legacy
+(desde MINVALUE hasta el inicio del mes subsiguiente) y queda a cargo de la
+retención como cualquier otra partición
+Los pasos largos (índice único y validación del CHECK) corren antes y sin
+bloquear escrituras; el intercambio final solo toma locks breves
+Requiere Postgres 12+ (SET NOT NULL apoyado en un CHECK validado)
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD = 2
+
+def month_start(moment: datetime, offset: int = 0) -> datetime:
+    months = moment.year * 12 + moment.month - 1 + offset
+    return datetime(months // 12, months % 12 + 1, 1)
+
+def upgrade() -> None:
+    # Margen de un mes completo: las filas que sigan llegando antes del
+    # intercambio todavía cumplen el CHECK de la partición heredada
+    boundary = month_start(datetime.utcnow(), 2)
+    bound = f"'{boundary.isoformat(' ')}'"
+
+    with op.get_context().autocommit_block():
+        op.execute("UPDATE sync_log SET server_timestamp = now() WHERE server_timestamp IS NULL")
+        op.create_index(
+            "sync_log_legacy_pkey", "sync_log", ["server_timestamp", "id"],
+            unique=True, postgresql_concurrently=True
+        )
+        op.execute(
+            "ALTER TABLE sync_log ADD CONSTRAINT sync_log_legacy_bounds "
+            f"CHECK (server_timestamp IS NOT NULL AND server_timestamp < {bound}) NOT VALID"
+        )
+        # SHARE UPDATE EXCLUSIVE: no bloquea inserts mientras recorre la tabla
+        op.execute("ALTER TABLE sync_log VALIDATE CONSTRAINT sync_log_legacy_bounds")
+
+    # Intercambio: la tabla vieja pasa a ser la primera partición
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute(
+        "ALTER TABLE sync_log "
+        "ALTER COLUMN server_timestamp SET NOT NULL, "
+        "DROP CONSTRAINT sync_log_pkey, "
+        "ADD CONSTRAINT sync_log_legacy_pkey PRIMARY KEY USING INDEX sync_log_legacy_pkey"
+    )
+    op.execute("ALTER TABLE sync_log RENAME TO sync_log_legacy")
+    op.execute("ALTER INDEX ix_sync_log_user_server_ts RENAME TO sync_log_legacy_user_server_ts")
+    op.execute("ALTER INDEX ix_sync_log_entity_server_ts RENAME TO sync_log_legacy_entity_server_ts")
+
+    op.create_table(
+        "sync_log",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("entity_type", sa.String(100), nullable=False),
+        sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("operation", sa.String(50), nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=False),
+        sa.Column("timestamp", sa.BigInteger(), nullable=False),
+        sa.Column("server_timestamp", sa.DateTime(), nullable=False),
+        sa.Column("synced", sa.Boolean()),
+        sa.Column("conflict_resolved", sa.Boolean()),
+        sa.PrimaryKeyConstraint("server_timestamp", "id", name="sync_log_pkey"),
+        postgresql_partition_by="RANGE (server_timestamp)"
+    )
+    # Índices del padre: al adjuntar, Postgres reutiliza los equivalentes de la partición
+    op.create_index("ix_sync_log_user_server_ts", "sync_log", ["user_id", "server_timestamp"])
+    op.create_index("ix_sync_log_entity_server_ts", "sync_log", ["entity_id", "server_timestamp"])
+
+    # El CHECK validado evita recorrer la tabla al adjuntarla
+    op.execute(f"ALTER TABLE sync_log ATTACH PARTITION sync_log_legacy FOR VALUES FROM (MINVALUE) TO ({bound})")
+    op.execute("ALTER TABLE sync_log_legacy DROP CONSTRAINT sync_log_legacy_bounds")
+
+    for offset in range(PARTITIONS_AHEAD):
+        start = month_start(boundary, offset)
+        end = month_start(boundary, offset + 1)
+        op.execute(
+            f"CREATE TABLE sync_log_p{start:%Y%m} PARTITION OF sync_log "
+            f"FOR VALUES FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+        )
+    # Red de seguridad si el mantenimiento no creó a tiempo la partición del mes
+    op.execute("CREATE TABLE sync_log_default PARTITION OF sync_log DEFAULT")
+
+def downgrade() -> None:
+    # Vuelve a una tabla simple copiando las filas que queden
+    op.execute("ALTER TABLE sync_log RENAME TO sync_log_partitioned")
+    op.execute("ALTER INDEX sync_log_pkey RENAME TO sync_log_partitioned_pkey")
+    op.execute("ALTER INDEX ix_sync_log_user_server_ts RENAME TO sync_log_partitioned_user_server_ts")
+    op.execute("ALTER INDEX ix_sync_log_entity_server_ts RENAME TO sync_log_partitioned_entity_server_ts")
+    op.create_table(
+        "sync_log",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("entity_type", sa.String(100), nullable=False),
+        sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("operation", sa.String(50), nullable=False),
+        sa.Column("data", postgresql.JSONB(), nullable=False),
+        sa.Column("timestamp", sa.BigInteger(), nullable=False),
+        sa.Column("server_timestamp", sa.DateTime()),
+        sa.Column("synced", sa.Boolean()),
+        sa.Column("conflict_resolved", sa.Boolean())
+    )
+    op.execute("INSERT INTO sync_log SELECT * FROM sync_log_partitioned")
+    op.execute("DROP TABLE sync_log_partitioned")
+    op.create_index("ix_sync_log_user_server_ts", "sync_log", ["user_id", "server_timestamp"])
+    op.create_index("ix_sync_log_entity_server_ts", "sync_log", ["entity_id", "server_timestamp"])
@@ -0,0 +1,32 @@
+"""Resultados de operaciones de sync por (user_id, op_id) para reintentos idempotentes
+
+Tabla aparte y no una columna de sync_log: en la tabla particionada un índice
+único tendría que incluir server_timestamp, y un reintento llega con otra hora
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_operations",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("op_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("response", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("user_id", "op_id", name="unique_sync_operation")
+    )
+    op.create_index("ix_sync_operations_created_at", "sync_operations", ["created_at"])
+
+def downgrade() -> None:
+    op.drop_table("sync_operations")
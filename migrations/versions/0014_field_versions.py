@@ -0,0 +1,26 @@
+"""Versión por campo de items y collections (merge de sync por campo)
+
+Columnas nullable sin default: en Postgres es un cambio solo de catálogo, sin
+reescribir la tabla. NULL significa sin historial por campo y el merge lo
+trata como si todos los campos hubieran cambiado en la versión actual
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("items", sa.Column("field_versions", postgresql.JSONB(), nullable=True))
+    op.add_column("collections", sa.Column("field_versions", postgresql.JSONB(), nullable=True))
+
+def downgrade() -> None:
+    op.drop_column("collections", "field_versions")
+    op.drop_column("items", "field_versions")
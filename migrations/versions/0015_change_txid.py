@@ -0,0 +1,44 @@
+"""Transacción que escribió cada fila, marca de visibilidad del feed de sync
+
+change_seq se toma al escribir y la transacción confirma después: una fila
+con un change_seq menor puede hacerse visible después que otra mayor, y un
+cursor por change_seq se la salteaba. El feed pagina por (change_txid,
+change_seq) y solo entrega filas de transacciones anteriores al xmin del
+snapshot, que ya terminaron todas. Requiere Postgres 13+ (pg_current_xact_id)
+
+Las filas existentes quedan con 0 (default constante, sin reescribir la
+tabla): sus transacciones ya terminaron. Los índices por change_seq solo los
+usaba el feed y se reemplazan
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+CURRENT_TXID = "pg_current_xact_id()::text::bigint"
+
+TABLES = ("collections", "items")
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("change_txid", sa.BigInteger(), nullable=False, server_default="0"))
+        op.alter_column(table, "change_txid", server_default=sa.text(CURRENT_TXID))
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(f"ix_{table}_change_txid_seq", table, ["change_txid", "change_seq"], postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(f"ix_{table}_change_seq", table_name=table, postgresql_concurrently=True, if_exists=True)
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(f"ix_{table}_change_seq", table, ["change_seq"], postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index(f"ix_{table}_change_txid_seq", table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table in TABLES:
+        op.drop_column(table, "change_txid")
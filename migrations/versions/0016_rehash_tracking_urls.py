@@ -0,0 +1,55 @@
+"""Recalcular url_hash de items con ref, si o feature en la query
+
+La canonicalización ya no quita esos parámetros fuera de las plataformas que
+los usan como tracking: en el resto de los hosts son parte de la URL (ramas
+de GitHub, por ejemplo) y el hash guardado ya no coincide con el nuevo
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Parámetros que antes se quitaban en cualquier host
+PATTERN = r"[?&](ref|ref_src|ref_url|si|feature)="
+
+def rehash() -> None:
+    from app.utils.metadata import url_hash
+
+    if op.get_context().as_sql:
+        return  # sin conexión no se puede calcular el hash en Python
+
+    items = sa.table("items", sa.column("id"), sa.column("url"), sa.column("url_hash"))
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(items.c.id, items.c.url, items.c.url_hash).where(items.c.url.op("~*")(PATTERN))
+        if last_id is not None:
+            query = query.where(items.c.id > last_id)
+        rows = bind.execute(query.order_by(items.c.id).limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        changed = [
+            {"item_id": row.id, "hash": url_hash(row.url)}
+            for row in rows if url_hash(row.url) != row.url_hash
+        ]
+        if changed:
+            bind.execute(
+                items.update().where(items.c.id == sa.bindparam("item_id")).values(url_hash=sa.bindparam("hash")),
+                changed
+            )
+
+def upgrade() -> None:
+    rehash()
+
+def downgrade() -> None:
+    pass  # solo datos derivados: el esquema no cambia
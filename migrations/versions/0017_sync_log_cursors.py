@@ -0,0 +1,28 @@
+"""Cursor persistente de la compactación de sync_log
+
+Sin él, cada reinicio volvía a recorrer sync_log desde el principio
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_log_cursors",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("server_timestamp", sa.DateTime(), nullable=False),
+        sa.Column("row_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime())
+    )
+
+def downgrade() -> None:
+    op.drop_table("sync_log_cursors")
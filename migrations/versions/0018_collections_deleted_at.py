@@ -0,0 +1,25 @@
+"""Soft delete de carpetas: tombstones para el feed de sync
+
+Borrar una carpeta (y sus items por el ON DELETE CASCADE) la sacaba del
+feed sin dejar rastro y los clientes la conservaban para siempre. Columna
+nullable sin default: no reescribe la tabla
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0018"
+down_revision = "0017"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("collections", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+
+def downgrade() -> None:
+    # Las carpetas borradas se eliminan de verdad antes de perder la marca
+    op.execute("DELETE FROM collections WHERE deleted_at IS NOT NULL")
+    op.drop_column("collections", "deleted_at")
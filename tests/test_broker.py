@@ -0,0 +1,129 @@
+"""
+Broker de eventos: resync de las suscripciones y reconexión de LISTEN contra
+Postgres (TEST_DATABASE_URL; sin la variable esos tests se saltan)
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from app.utils.broker import ChangeBroker, LocalBackend, PostgresNotifyBackend
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+needs_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL no definida")
+
+USER_ID = uuid.UUID("8d4f1c1e-3a52-4b8e-9d9e-4c3f2a1b0c9d")
+
+def make_broker(backend) -> ChangeBroker:
+    return ChangeBroker(backend, queue_size=3, outbox_size=100, max_subscriptions_per_user=5)
+
+async def next_event(subscription):
+    return await asyncio.wait_for(subscription.get(), timeout=5)
+
+def test_full_queue_collapses_into_resync():
+    async def scenario():
+        broker = make_broker(LocalBackend())
+        await broker.start()
+        subscription = broker.subscribe(USER_ID)
+        for i in range(4):
+            broker.publish({"type": "item.update", "id": str(i)}, [USER_ID])
+        await asyncio.sleep(0.05)
+        await broker.stop()
+        return subscription
+
+    subscription = asyncio.run(scenario())
+    assert subscription.queue.get_nowait() == {"type": "resync"}
+    assert subscription.queue.empty() and subscription.dropped == 3
+
+def test_resync_all_reaches_every_subscription():
+    broker = make_broker(LocalBackend())
+    first, second = broker.subscribe(USER_ID), broker.subscribe(uuid.uuid4())
+    first.offer({"type": "item.update"})
+
+    broker._resync_all()
+
+    assert first.queue.get_nowait() == {"type": "resync"} and first.queue.empty()
+    assert second.queue.get_nowait() == {"type": "resync"}
+
+def postgres_backend(**kwargs) -> PostgresNotifyBackend:
+    options = {"health_check_seconds": 1, "reconnect_min_seconds": 0.05, "reconnect_max_seconds": 0.2}
+    return PostgresNotifyBackend(TEST_DATABASE_URL, f"test_{uuid.uuid4().hex}", **{**options, **kwargs})
+
+@needs_db
+def test_listen_reconnects_and_resyncs_after_termination():
+    async def scenario():
+        backend = postgres_backend()
+        broker = make_broker(backend)
+        await broker.start()
+        try:
+            subscription = broker.subscribe(USER_ID)
+            broker.publish({"type": "item.create"}, [USER_ID])
+            assert (await next_event(subscription))["type"] == "item.create"
+
+            # El servidor corta la conexión de LISTEN (failover, reinicio, idle timeout)
+            listen_pid = backend._listen_conn.get_server_pid()
+            await backend._publish_conn.execute("SELECT pg_terminate_backend($1)", listen_pid)
+            assert await next_event(subscription) == {"type": "resync"}
+            assert backend.reconnects == 1
+            assert backend._listen_conn.get_server_pid() != listen_pid
+
+            broker.publish({"type": "item.update"}, [USER_ID])
+            assert (await next_event(subscription))["type"] == "item.update"
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
+
+@needs_db
+def test_listen_retries_with_backoff_until_postgres_is_back():
+    async def scenario():
+        backend = postgres_backend()
+        broker = make_broker(backend)
+        await broker.start()
+        try:
+            subscription = broker.subscribe(USER_ID)
+            connect = backend._connect
+            attempts = []
+
+            async def flaky_connect():
+                attempts.append(asyncio.get_running_loop().time())
+                if len(attempts) <= 3:
+                    raise ConnectionRefusedError("postgres caído")
+                return await connect()
+
+            backend._connect = flaky_connect
+            listen_pid = backend._listen_conn.get_server_pid()
+            await backend._publish_conn.execute("SELECT pg_terminate_backend($1)", listen_pid)
+
+            assert await next_event(subscription) == {"type": "resync"}
+            assert len(attempts) == 4
+            gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+            assert gaps[0] >= 0.05 and gaps[1] >= 0.1 and gaps[2] >= 0.2
+        finally:
+            await broker.stop()
+
+    asyncio.run(scenario())
+
+@needs_db
+def test_publish_reconnects_lazily():
+    async def scenario():
+        backend = postgres_backend()
+        broker = make_broker(backend)
+        await broker.start()
+        try:
+            subscription = broker.subscribe(USER_ID)
+            await backend._listen_conn.execute(
+                "SELECT pg_terminate_backend($1)", backend._publish_conn.get_server_pid()
+            )
+            # El primer publish descubre la conexión caída; el siguiente reconecta
+            await asyncio.sleep(0.1)
+            broker.publish({"type": "item.delete"}, [USER_ID])
+            await asyncio.sleep(0.1)
+            broker.publish({"type": "item.delete"}, [USER_ID])
+            return await next_event(subscription)
+        finally:
+            await broker.stop()
+
+    assert asyncio.run(scenario())["type"] == "item.delete"
@@ -0,0 +1,20 @@
+"""Canonicalización de URLs: solo se quita el tracking, no parámetros con significado"""
+import pytest
+
+from app.utils.metadata import canonicalize_url, url_hash
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://example.com/a?utm_source=x&fbclid=y&b=2", "https://example.com/a?b=2"),
+    # "ref", "si" y "feature" son contenido fuera de las plataformas que los usan como tracking
+    ("https://github.com/org/repo?ref=main", "https://github.com/org/repo?ref=main"),
+    ("https://example.com/search?si=1&feature=maps", "https://example.com/search?feature=maps&si=1"),
+    ("https://www.youtube.com/playlist?list=PL1&si=abc&feature=share", "https://youtube.com/playlist?list=PL1"),
+    ("https://youtu.be/dQw4w9WgXcQ?si=abc", "https://youtube.com/watch?v=dQw4w9WgXcQ"),
+])
+def test_canonicalize_strips_only_tracking(url, expected):
+    assert canonicalize_url(url) == expected
+
+@pytest.mark.parametrize("url", ["http://[abc", "  https://[::1/x  "])
+def test_unparseable_url_falls_back_to_raw_string(url):
+    assert canonicalize_url(url) == url.strip()
+    assert url_hash(url) == url_hash(url.strip())
@@ -0,0 +1,160 @@
+"""
+Negociación de formato (JSON o MessagePack) y de compresión (brotli o gzip)
+contra una app mínima con MsgPackRoute y CompressionMiddleware, sin base
+"""
+import asyncio
+import gzip
+import uuid
+from datetime import datetime
+
+import brotli
+import pytest
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.compression import CompressionMiddleware, choose_encoding
+from app.utils.serialization import encoded_response
+from app.utils.wire import MSGPACK_MEDIA_TYPE, MsgPackRoute, accepts_msgpack, pack, unpack
+
+MINIMUM_SIZE = 1024
+ENTITY_ID = uuid.UUID("8d4f1c1e-3a52-4b8e-9d9e-4c3f2a1b0c9d")
+CREATED_AT = datetime(2026, 10, 18, 12, 30, 5)
+
+def rows(count):
+    return [{"id": ENTITY_ID, "title": f"link {i}", "created_at": CREATED_AT} for i in range(count)]
+
+def make_client() -> TestClient:
+    router = APIRouter(route_class=MsgPackRoute)
+
+    @router.get("/big")
+    async def big(response: Response):
+        response.headers["ETag"] = '"v1"'
+        return encoded_response({"items": rows(100)}, response)
+
+    @router.get("/small")
+    async def small():
+        return encoded_response({"items": rows(1)})
+
+    @router.post("/echo")
+    async def echo(body: dict):
+        return encoded_response(body)
+
+    @router.get("/stream")
+    async def stream():
+        async def events():
+            for i in range(3):
+                yield f"data: {'x' * MINIMUM_SIZE} {i}\n\n".encode()
+                await asyncio.sleep(0)
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(CompressionMiddleware, minimum_size=MINIMUM_SIZE, gzip_level=6, brotli_quality=4)
+    return TestClient(app)
+
+@pytest.fixture(scope="module")
+def client():
+    with make_client() as client:
+        yield client
+
+def raw_body(client, path, headers):
+    """Cuerpo tal como sale del servidor, sin la descompresión automática de httpx"""
+    with client.stream("GET", path, headers=headers) as response:
+        return response, b"".join(response.iter_raw())
+
+def vary(response):
+    return {value.strip().lower() for value in response.headers.get("vary", "").split(",") if value.strip()}
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("BR", "br"),
+    ("gzip;q=0", None),
+    ("gzip;q=abc", None),
+    ("deflate", None),
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, False),
+    ("application/json", False),
+    ("application/msgpack", True),
+    ("application/x-msgpack", True),
+    ("application/json, application/msgpack;q=0.9", True),
+    ("application/msgpack;q=0", False),
+    ("application/msgpack;q=nope", False),
+    ("*/*", False),
+])
+def test_accepts_msgpack(accept, expected):
+    assert accepts_msgpack(accept) is expected
+
+@pytest.mark.parametrize("encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)])
+@pytest.mark.parametrize("accept", ["application/json", MSGPACK_MEDIA_TYPE])
+def test_large_response_is_compressed_in_the_negotiated_format(client, encoding, decompress, accept):
+    response, body = raw_body(client, "/big", {"Accept-Encoding": encoding, "Accept": accept})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["content-length"] == str(len(body))
+    assert response.headers["content-type"].startswith(accept)
+    assert vary(response) == {"accept", "accept-encoding"}
+    # Otro cuerpo en bytes: el ETag pasa a débil
+    assert response.headers["etag"] == 'W/"v1"'
+
+    content = decompress(body)
+    if accept == MSGPACK_MEDIA_TYPE:
+        data = unpack(content)
+        assert data["items"][0] == {"id": str(ENTITY_ID), "title": "link 0", "created_at": CREATED_AT.isoformat()}
+    else:
+        assert content.startswith(b'{"items":[{"id":"8d4f1c1e')
+    assert len(body) < len(content)
+
+def test_identity_encoding_is_not_compressed(client):
+    # httpx manda su propio Accept-Encoding por defecto: se pide identity explícito
+    response, body = raw_body(client, "/big", {"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-length"] == str(len(body))
+    assert len(body) >= MINIMUM_SIZE
+    assert vary(response) == {"accept"}
+    assert response.headers["etag"] == '"v1"'
+
+@pytest.mark.parametrize("accept", ["application/json", MSGPACK_MEDIA_TYPE])
+def test_response_below_threshold_is_not_compressed(client, accept):
+    response, body = raw_body(client, "/small", {"Accept-Encoding": "br, gzip", "Accept": accept})
+
+    assert len(body) < MINIMUM_SIZE
+    assert "content-encoding" not in response.headers
+    assert "accept-encoding" not in vary(response)
+    assert response.headers["content-type"].startswith(accept)
+
+def test_streaming_response_passes_through(client):
+    response, body = raw_body(client, "/stream", {"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert body.count(b"data: ") == 3
+
+def test_msgpack_request_body(client):
+    payload = {"id": ENTITY_ID, "created_at": CREATED_AT, "tags": ["a", "b"]}
+
+    response = client.post(
+        "/echo",
+        content=pack(payload),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(MSGPACK_MEDIA_TYPE)
+    # UUID y fechas llegan al handler como texto, igual que desde JSON
+    assert unpack(response.content) == {"id": str(ENTITY_ID), "created_at": CREATED_AT.isoformat(), "tags": ["a", "b"]}
+
+def test_json_request_body_gets_json_by_default(client):
+    response = client.post("/echo", json={"a": 1})
+
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json() == {"a": 1}
@@ -0,0 +1,21 @@
+"""
+Las queries de las rutas usan índices (benchmarks/explain_queries.py)
+Necesita un Postgres migrado (alembic upgrade head) en TEST_DATABASE_URL;
+sin esa variable el test se salta
+"""
+import asyncio
+import os
+
+import pytest
+
+from benchmarks.explain_queries import explain_route_queries
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL no definida")
+def test_route_queries_use_indexes():
+    results = asyncio.run(explain_route_queries(TEST_DATABASE_URL))
+
+    assert results
+    seq_scans = [f"{name}: {', '.join(tables)}" for name, tables in results if tables]
+    assert not seq_scans, "Queries con Seq Scan:\n" + "\n".join(seq_scans)
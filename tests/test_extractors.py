@@ -0,0 +1,105 @@
+"""
+Extractores de metadata contra un servidor HTTP local que hace de oEmbed y
+de página: sin red, cada caso levanta su servidor en un puerto libre
+"""
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.utils import extractors
+from app.utils.http_client import close_http_client
+from app.utils.metadata import extract_metadata
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+PAGE = """<html><head>
+<title>Título del documento</title>
+<meta property="og:title" content="Título OG">
+<meta property="og:image" content="/cover.jpg">
+</head><body>contenido</body></html>"""
+
+async def oembed_ok(request: web.Request) -> web.Response:
+    return web.json_response({"title": "Video", "author_name": "Canal", "provider_name": "YouTube"})
+
+async def oembed_invalid_json(request: web.Request) -> web.Response:
+    return web.Response(text="<html>no es json</html>", content_type="text/html")
+
+async def page(request: web.Request) -> web.Response:
+    return web.Response(text=PAGE, content_type="text/html")
+
+async def unavailable(request: web.Request) -> web.Response:
+    return web.Response(text=PAGE, content_type="text/html", status=503)
+
+def run(scenario):
+    """Corre un escenario con el servidor local y cierra la sesión HTTP compartida del loop"""
+    async def main():
+        app = web.Application()
+        app.router.add_get("/oembed", oembed_ok)
+        app.router.add_get("/oembed-invalid", oembed_invalid_json)
+        app.router.add_get("/page", page)
+        app.router.add_get("/unavailable", unavailable)
+        server = TestServer(app)
+        await server.start_server()
+        try:
+            return await scenario(server)
+        finally:
+            await close_http_client()
+            await server.close()
+    return asyncio.run(main())
+
+def test_youtube_with_oembed(monkeypatch):
+    async def scenario(server):
+        monkeypatch.setattr(extractors.settings, "YOUTUBE_OEMBED_URL", str(server.make_url("/oembed")))
+        return await extractors.extract_youtube(f"https://youtu.be/{VIDEO_ID}")
+
+    metadata = run(scenario)
+    assert metadata["title"] == "Video"
+    assert metadata["author_name"] == "Canal"
+    assert metadata["thumbnail_url"] == f"https://i.ytimg.com/vi/{VIDEO_ID}/hqdefault.jpg"
+
+def test_youtube_invalid_oembed_keeps_fields_from_id(monkeypatch):
+    async def scenario(server):
+        monkeypatch.setattr(extractors.settings, "YOUTUBE_OEMBED_URL", str(server.make_url("/oembed-invalid")))
+        return await extractors.extract_youtube(f"https://www.youtube.com/watch?v={VIDEO_ID}")
+
+    metadata = run(scenario)
+    assert metadata["title"] is None
+    assert metadata["video_id"] == VIDEO_ID
+    assert metadata["thumbnail_url"] == f"https://i.ytimg.com/vi/{VIDEO_ID}/hqdefault.jpg"
+
+def test_youtube_unreachable_oembed_keeps_fields_from_id(monkeypatch):
+    async def scenario(server):
+        # Puerto del servidor ya cerrado: conexión rechazada
+        url = str(server.make_url("/oembed"))
+        await server.close()
+        monkeypatch.setattr(extractors.settings, "YOUTUBE_OEMBED_URL", url)
+        return await extract_metadata(f"https://youtu.be/{VIDEO_ID}")
+
+    metadata = run(scenario)
+    assert metadata["platform"] == "youtube"
+    assert "error" not in metadata
+    assert metadata["thumbnail_url"] == f"https://i.ytimg.com/vi/{VIDEO_ID}/hqdefault.jpg"
+
+def test_failing_extractor_falls_back_to_html(monkeypatch):
+    async def broken(url):
+        raise RuntimeError("extractor roto")
+
+    # La URL del servidor local es "generic": se registra ahí un extractor que falla
+    monkeypatch.setitem(extractors.EXTRACTORS, "generic", broken)
+
+    async def scenario(server):
+        return await extract_metadata(str(server.make_url("/page")))
+
+    metadata = run(scenario)
+    assert "error" not in metadata
+    assert metadata["title"] == "Título OG"
+    assert metadata["thumbnail_url"].endswith("/cover.jpg")
+
+def test_non_2xx_page_is_an_error():
+    async def scenario(server):
+        return await extract_metadata(str(server.make_url("/unavailable")))
+
+    metadata = run(scenario)
+    assert metadata["error"] == "HTTP 503"
+    assert "title" not in metadata
@@ -0,0 +1,105 @@
+"""
+Parsers incrementales de importación: el resultado no depende de dónde
+corten los chunks (cada caso se prueba con varios tamaños de chunk)
+"""
+import pytest
+
+from app.utils.import_parsers import BookmarksParser, CSVLinksParser, ImportedLink, JSONLinksParser
+from app.utils.imports import clean_link
+
+CHUNK_SIZES = [1, 3, 16, 10_000]
+
+def parse(parser_class, text, chunk_size):
+    parser = parser_class()
+    links = []
+    for start in range(0, len(text), chunk_size):
+        links += parser.feed(text[start:start + chunk_size])
+    links += parser.close()
+    return links, parser.invalid
+
+BOOKMARKS = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<DL><p>
+    <DT><A HREF="https://example.com/a" ADD_DATE="1">Primer   link</A>
+    <DD>Descripción
+    en dos líneas
+    <DT><A HREF="https://example.com/b">Segundo</A>
+    <DT><H3>Carpeta</H3>
+    <DL><p>
+        <DT><A HREF="https://example.com/c">Tercero &amp; último</A>
+        <DD>Al final
+    </DL><p>
+</DL><p>
+"""
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_bookmarks_with_descriptions(chunk_size):
+    links, invalid = parse(BookmarksParser, BOOKMARKS, chunk_size)
+    assert links == [
+        ImportedLink("https://example.com/a", "Primer link", "Descripción en dos líneas"),
+        ImportedLink("https://example.com/b", "Segundo"),
+        ImportedLink("https://example.com/c", "Tercero & último", "Al final"),
+    ]
+    assert invalid == 0
+
+JSON_ARRAY = """[
+  "https://example.com/a",
+  {"url": "https://example.com/b", "title": "B", "description": "con \\"comillas\\", comas y ]"},
+  {"href": "https://example.com/c", "name": "C"},
+  {"title": "sin url"},
+  42
+]"""
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_json_array_split_across_chunks(chunk_size):
+    links, invalid = parse(JSONLinksParser, JSON_ARRAY, chunk_size)
+    assert links == [
+        ImportedLink("https://example.com/a"),
+        ImportedLink("https://example.com/b", "B", 'con "comillas", comas y ]'),
+        ImportedLink("https://example.com/c", "C"),
+    ]
+    assert invalid == 2
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_json_lines(chunk_size):
+    text = '{"link": "https://example.com/a"}\n"https://example.com/b"\n'
+    links, _ = parse(JSONLinksParser, text, chunk_size)
+    assert [link.url for link in links] == ["https://example.com/a", "https://example.com/b"]
+
+def test_json_unclosed_array_fails():
+    with pytest.raises(ValueError):
+        parse(JSONLinksParser, '["https://example.com/a"', 10_000)
+
+CSV_WITH_HEADER = (
+    "Title,URL,Description\n"
+    "A,https://example.com/a,\"primera línea\nsegunda, con coma\"\n"
+    "\n"
+    "B,,sin url\n"
+    "\"C \"\"citado\"\"\",https://example.com/c,\n"
+)
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_csv_quoted_newlines_and_header(chunk_size):
+    links, invalid = parse(CSVLinksParser, CSV_WITH_HEADER, chunk_size)
+    assert links == [
+        ImportedLink("https://example.com/a", "A", "primera línea\nsegunda, con coma"),
+        ImportedLink("https://example.com/c", 'C "citado"'),
+    ]
+    assert invalid == 1
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_csv_without_header_uses_column_order(chunk_size):
+    links, _ = parse(CSVLinksParser, "https://example.com/a,A\nhttps://example.com/b", chunk_size)
+    assert links == [ImportedLink("https://example.com/a", "A"), ImportedLink("https://example.com/b")]
+
+def test_csv_unclosed_quotes_fail():
+    with pytest.raises(ValueError):
+        parse(CSVLinksParser, 'url\n"https://example.com/a\n', 10_000)
+
+@pytest.mark.parametrize("url", ["http://[abc", "ftp://example.com/a", "javascript:alert(1)", "https://"])
+def test_clean_link_rejects_invalid_urls(url):
+    assert clean_link(ImportedLink(url)) is None
+
+def test_clean_link_strips_and_truncates():
+    link = clean_link(ImportedLink("  https://example.com/a  ", "t" * 300))
+    assert link.url == "https://example.com/a"
+    assert len(link.title) == 255
@@ -0,0 +1,98 @@
+"""Merge por campo de los updates de sync, sobre entidades en memoria (sin base)"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.utils.merge import COLLECTION_MERGE_FIELDS, ITEM_MERGE_FIELDS, merge_fields, record_changes
+
+def item(version=0, field_versions=None, deleted_at=None, **fields):
+    values = {"title": "título", "description": "descripción", **fields}
+    return SimpleNamespace(version=version, field_versions=field_versions, deleted_at=deleted_at, **values)
+
+def test_concurrent_edits_to_different_fields_merge():
+    # El servidor cambió el título en la versión 1; el cliente, que vio la 0, edita la descripción
+    entity = item(version=1, field_versions={"title": 1, "description": 0}, title="título nuevo")
+
+    merge = merge_fields(entity, {"version": 0, "description": "otra"}, ITEM_MERGE_FIELDS)
+
+    assert merge.changed == ["description"] and merge.conflicts == []
+    assert (entity.title, entity.description) == ("título nuevo", "otra")
+    assert entity.version == 2
+    assert entity.field_versions == {"title": 1, "description": 2}
+
+def test_same_field_edited_on_both_sides_is_a_conflict():
+    entity = item(version=1, field_versions={"title": 1, "description": 0}, title="del servidor")
+
+    merge = merge_fields(entity, {"version": 0, "title": "del cliente", "description": "otra"}, ITEM_MERGE_FIELDS)
+
+    assert merge.conflicts == ["title"]
+    assert merge.changed == ["description"]
+    assert entity.title == "del servidor"
+
+def test_same_value_on_both_sides_is_not_a_conflict():
+    entity = item(version=1, field_versions={"title": 1, "description": 0}, title="igual")
+
+    merge = merge_fields(entity, {"version": 0, "title": "igual"}, ITEM_MERGE_FIELDS)
+
+    assert merge == ([], [])
+    assert entity.version == 1
+
+def test_edit_from_current_version_applies():
+    entity = item(version=1, field_versions={"title": 1, "description": 0})
+
+    merge = merge_fields(entity, {"version": 1, "title": "nuevo"}, ITEM_MERGE_FIELDS)
+
+    assert merge.changed == ["title"]
+    assert entity.field_versions["title"] == 2
+
+def test_unedited_base_fields_do_not_conflict():
+    # Entidad completa con "base": solo la descripción cambió respecto de lo que vio el cliente
+    entity = item(version=1, field_versions={"title": 1, "description": 0}, title="del servidor")
+    data = {
+        "version": 0,
+        "title": "título",
+        "description": "otra",
+        "base": {"title": "título", "description": "descripción"},
+    }
+
+    merge = merge_fields(entity, data, ITEM_MERGE_FIELDS)
+
+    assert merge.changed == ["description"] and merge.conflicts == []
+    assert entity.title == "del servidor"
+
+def test_legacy_rows_without_field_versions_use_the_entity_version():
+    # Sin historial por campo cualquier cambio posterior a la versión del cliente es conflicto
+    stale = item(version=3)
+    merge = merge_fields(stale, {"version": 2, "description": "otra"}, ITEM_MERGE_FIELDS)
+    assert merge.conflicts == ["description"] and stale.version == 3
+
+    # Desde la versión actual se aplica y empieza el historial: lo demás queda en la anterior
+    current = item(version=3)
+    merge = merge_fields(current, {"version": 3, "description": "otra"}, ITEM_MERGE_FIELDS)
+    assert merge.changed == ["description"]
+    assert current.field_versions == {"title": 3, "description": 4}
+
+def test_last_writer_wins_fields_never_conflict():
+    collection = SimpleNamespace(
+        name="carpeta", icon="📁", version=2, field_versions={"name": 0, "icon": 2}, deleted_at=None
+    )
+
+    merge = merge_fields(collection, {"version": 0, "icon": "⭐", "name": "otra"}, COLLECTION_MERGE_FIELDS)
+
+    assert merge.changed == ["name", "icon"] and merge.conflicts == []
+    assert collection.icon == "⭐"
+
+def test_update_of_a_deleted_entity_is_a_conflict():
+    # Borrado en el servidor (versión 2) mientras el cliente editaba offline desde la 1
+    entity = item(version=2, field_versions={"title": 1, "description": 0}, deleted_at=datetime(2026, 10, 18))
+
+    merge = merge_fields(entity, {"version": 1, "title": "nuevo"}, ITEM_MERGE_FIELDS)
+
+    assert merge.conflicts == ["title"] and merge.changed == []
+    assert (entity.title, entity.version) == ("título", 2)
+
+def test_record_changes_starts_history_at_previous_version():
+    entity = item(version=5)
+
+    record_changes(entity, ["title"], ITEM_MERGE_FIELDS)
+
+    assert entity.field_versions == {"title": 5, "description": 4}
@@ -0,0 +1,102 @@
+"""
+Store compartido de metadata contra un Postgres migrado (TEST_DATABASE_URL)
+y una página servida por un servidor HTTP local; sin la variable se saltan
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import LinkMetadata
+from app.utils import metadata_store as store_module
+from app.utils.http_client import close_http_client
+from app.utils.metadata import url_hash
+from app.utils.metadata_store import MetadataStore
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL no definida")
+
+PAGE = "<html><head><title>Título bueno</title></head><body></body></html>"
+
+def run(scenario, monkeypatch):
+    """
+    Corre un escenario con una página local cuyo status se cambia con
+    status["code"], y la sesión del store apuntando a TEST_DATABASE_URL
+    """
+    status = {"code": 200}
+
+    async def page(request: web.Request) -> web.Response:
+        return web.Response(text=PAGE, content_type="text/html", status=status["code"])
+
+    async def main():
+        engine = create_async_engine(TEST_DATABASE_URL)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        monkeypatch.setattr(store_module, "AsyncSessionLocal", session_factory)
+        app = web.Application()
+        app.router.add_get("/page", page)
+        server = TestServer(app)
+        await server.start_server()
+        url = str(server.make_url("/page"))
+        try:
+            return await scenario(MetadataStore(max_size=10, ttl=3600, negative_ttl=60, host_failure_threshold=3), url, status, session_factory)
+        finally:
+            async with session_factory() as db:
+                await db.execute(delete(LinkMetadata).where(LinkMetadata.url_hash == url_hash(url)))
+                await db.commit()
+            await close_http_client()
+            await server.close()
+            await engine.dispose()
+    return asyncio.run(main())
+
+async def load_row(session_factory, url):
+    async with session_factory() as db:
+        return (await db.execute(select(LinkMetadata).where(LinkMetadata.url_hash == url_hash(url)))).scalar_one()
+
+async def expire(store, session_factory, url):
+    """Vencer la entrada en la tabla y sacarla del LRU, como al pasar el TTL"""
+    async with session_factory() as db:
+        await db.execute(
+            update(LinkMetadata)
+            .where(LinkMetadata.url_hash == url_hash(url))
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await db.commit()
+    store._lru.clear()
+
+def test_failed_refresh_keeps_good_metadata(monkeypatch):
+    async def scenario(store, url, status, session_factory):
+        entry_id, data = await store.get(url)
+        assert data["title"] == "Título bueno"
+        good = await load_row(session_factory, url)
+
+        await expire(store, session_factory, url)
+        status["code"] = 503
+        refreshed_id, refreshed = await store.get(url)
+        row = await load_row(session_factory, url)
+        return entry_id, good, refreshed_id, refreshed, row, store._host_failures
+
+    entry_id, good, refreshed_id, refreshed, row, host_failures = run(scenario, monkeypatch)
+    # Se sigue sirviendo la metadata buena y la fila no pasa a negativa
+    assert refreshed_id == entry_id
+    assert refreshed["title"] == "Título bueno"
+    assert row.ok and row.data == good.data and row.fetched_at == good.fetched_at
+    # Solo se reintenta tras el TTL negativo, y el fallo cuenta para el host
+    assert row.expires_at < good.expires_at
+    assert [count for count, _, _ in host_failures.values()] == [1]
+
+def test_non_2xx_page_is_cached_as_negative(monkeypatch):
+    async def scenario(store, url, status, session_factory):
+        status["code"] = 429
+        _, data = await store.get(url)
+        return data, await load_row(session_factory, url)
+
+    data, row = run(scenario, monkeypatch)
+    assert data["error"] == "HTTP 429"
+    assert not row.ok
+    assert row.expires_at < datetime.utcnow() + timedelta(seconds=61)
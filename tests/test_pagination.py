@@ -0,0 +1,93 @@
+"""Cursores de paginación: ida y vuelta, y cursores adulterados o basura (ValueError -> 400)"""
+import base64
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.utils.pagination import (
+    decode_change_cursor, decode_cursor, decode_keyset_cursor, decode_score_cursor,
+    encode_cursor, encode_keyset_cursor, encode_score_cursor
+)
+
+ENTITY_ID = uuid.UUID("8d4f1c1e-3a52-4b8e-9d9e-4c3f2a1b0c9d")
+
+def raw_cursor(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
+
+def test_cursor_round_trip():
+    values = [1, "dos", None, 3.5]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == values
+
+def test_keyset_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 12, 30, 5, 123456)
+    assert decode_keyset_cursor(encode_keyset_cursor(created_at, ENTITY_ID)) == (created_at, ENTITY_ID)
+
+def test_score_cursor_round_trip():
+    assert decode_score_cursor(encode_score_cursor(0.0625, ENTITY_ID)) == (0.0625, ENTITY_ID)
+
+def test_change_cursor_round_trip():
+    assert decode_change_cursor(encode_cursor([123456, 789])) == (123456, 789)
+
+def test_legacy_change_cursor_has_only_change_seq():
+    assert decode_change_cursor(encode_cursor([789])) == (0, 789)
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "!!!",
+    "no es base64",
+    raw_cursor("no es json"),
+    raw_cursor('{"a": 1}'),
+    raw_cursor('"texto"'),
+])
+def test_garbage_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+@pytest.mark.parametrize("values", [
+    [],
+    ["2026-10-18T12:30:05"],
+    ["2026-10-18T12:30:05", str(ENTITY_ID), "extra"],
+    ["ayer", str(ENTITY_ID)],
+    [20261018, str(ENTITY_ID)],
+    ["2026-10-18T12:30:05", "no-es-uuid"],
+    ["2026-10-18T12:30:05", 42],
+    ["2026-10-18T12:30:05", {"id": str(ENTITY_ID)}],
+    # Con zona horaria: las columnas son timestamp sin zona
+    ["2026-10-18T12:30:05+00:00", str(ENTITY_ID)],
+])
+def test_tampered_keyset_cursor(values):
+    with pytest.raises(ValueError):
+        decode_keyset_cursor(encode_cursor(values))
+
+@pytest.mark.parametrize("values", [
+    [],
+    [1, 2, 3],
+    ["1", "2"],
+    [1.5, 2],
+    [True, 2],
+    [-1, 2],
+    [2 ** 63, 1],
+    [[1], 2],
+])
+def test_tampered_change_cursor(values):
+    with pytest.raises(ValueError):
+        decode_change_cursor(encode_cursor(values))
+
+@pytest.mark.parametrize("values", [
+    [0.5],
+    ["0.5", str(ENTITY_ID)],
+    [True, str(ENTITY_ID)],
+    [0.5, 42],
+    [0.5, "no-es-uuid"],
+])
+def test_tampered_score_cursor(values):
+    with pytest.raises(ValueError):
+        decode_score_cursor(encode_cursor(values))
+
+def test_non_finite_score_cursor():
+    # json acepta NaN e Infinity aunque no sean JSON estándar
+    with pytest.raises(ValueError):
+        decode_score_cursor(raw_cursor(f'[NaN, "{ENTITY_ID}"]'))
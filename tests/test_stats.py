@@ -0,0 +1,38 @@
+"""/stats solo con STATS_TOKEN configurado y presentado como Bearer"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import deps
+from app.main import app
+
+@pytest.fixture
+def client():
+    # Sin "with": no corre el lifespan (broker, workers), /stats no lo necesita
+    return TestClient(app)
+
+def test_stats_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(deps.settings, "STATS_TOKEN", "")
+
+    assert client.get("/stats").status_code == 404
+    assert client.get("/stats", headers={"Authorization": "Bearer "}).status_code == 404
+
+@pytest.mark.parametrize("headers", [
+    {},
+    {"Authorization": "Bearer otro"},
+    {"Authorization": "Basic c2VjcmV0bw=="},
+])
+def test_stats_rejects_missing_or_wrong_token(client, monkeypatch, headers):
+    monkeypatch.setattr(deps.settings, "STATS_TOKEN", "secreto")
+
+    response = client.get("/stats", headers=headers)
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+def test_stats_with_token(client, monkeypatch):
+    monkeypatch.setattr(deps.settings, "STATS_TOKEN", "secreto")
+
+    response = client.get("/stats", headers={"Authorization": "Bearer secreto"})
+
+    assert response.status_code == 200
+    assert {"db_pool", "principal_cache", "sync_log"} <= response.json().keys()